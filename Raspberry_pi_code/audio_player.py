@@ -1,7 +1,8 @@
-import subprocess
+import time
 import random
-from playsound import playsound
 import threading
+from hardware import play_sound, start_music
+from metrics import instrument
 
 class AudioPlayer:
     """배경 음악과 효과음을 총괄 관리하는 클래스"""
@@ -33,6 +34,7 @@ class AudioPlayer:
         else:
             self.play_effect(sound_key)
 
+    @instrument("audio_start")
     def play_effect(self, sound_key):
         """
         효과음 재생 (비동기 실행으로 메인 프로그램 멈추지 않음)
@@ -43,13 +45,14 @@ class AudioPlayer:
             
             # 🔹 playsound()를 별도 스레드에서 실행 (메인 프로그램 지연 방지)
             def play():
-                playsound(self.audio_files[sound_key])
+                play_sound(self.audio_files[sound_key])
 
             self.effect_thread = threading.Thread(target=play)
             self.effect_thread.start()
         else:
             print(f"⚠️ Warning: No audio file mapped for '{sound_key}'")
 
+    @instrument("audio_start")
     def play_background_music(self, sound_key):
         """
         배경 음악을 백그라운드에서 실행 (이미 실행 중이면 중복 실행 방지)
@@ -61,7 +64,7 @@ class AudioPlayer:
                 self.stop_background_music()
 
             # print(f"🎵 Playing background music: {self.audio_files[sound_key]}")
-            self.music_process = subprocess.Popen(["mpg123", self.audio_files[sound_key]], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            self.music_process = start_music(self.audio_files[sound_key])  # mpg123 프로세스 (시뮬레이션이면 가짜 프로세스)
         else:
             print(f"⚠️ Warning: No background music file mapped for '{sound_key}'")
 
@@ -83,3 +86,62 @@ class AudioPlayer:
         if self.music_process and self.music_process.poll() is None:
             self.music_process.terminate()
             # print("🛑 Background music stopped.")
+
+class AudioTimeline:
+    """라운드 시작 기준 시각에 맞춰 효과음/배경 음악을 재생하는 비차단 타임라인 (스캔 루프에서 update() 호출)"""
+
+    EFFECT = "effect"
+    MUSIC = "music"
+
+    def __init__(self, player, cues, clock=time.time):
+        """
+        초기화
+        :param player: AudioPlayer 인스턴스
+        :param cues: (시작 후 초, 사운드 키, EFFECT 또는 MUSIC) 리스트
+        :param clock: 현재 시각 함수 (초)
+        """
+        self.player = player
+        self.cues = sorted(cues, key=lambda cue: cue[0])
+        self.clock = clock
+        self.started_at = None
+        self.next_cue = 0
+
+    def start(self):
+        """타임라인 시작 (0초 위치의 큐는 바로 재생)"""
+        self.started_at = self.clock()
+        self.next_cue = 0
+        self.update()
+
+    def elapsed(self):
+        """
+        타임라인 시작 후 경과 시간
+        :return: 경과 시간 (초)
+        """
+        return self.clock() - self.started_at
+
+    def offset_of(self, sound_key):
+        """
+        사운드 키의 타임라인 위치
+        :param sound_key: 사운드 키
+        :return: 시작 후 초 (타임라인에 없으면 None)
+        """
+        for offset, key, _ in self.cues:
+            if key == sound_key:
+                return offset
+        return None
+
+    def update(self):
+        """재생 시각이 지난 큐 재생 (재생은 비동기이므로 바로 반환)"""
+        elapsed = self.elapsed()
+        while self.next_cue < len(self.cues) and self.cues[self.next_cue][0] <= elapsed:
+            _, sound_key, kind = self.cues[self.next_cue]
+            if kind == self.MUSIC:
+                self.player.play_background_music(sound_key)
+            else:
+                self.player.play_audio(sound_key)
+            self.next_cue += 1
+
+    @property
+    def finished(self):
+        """모든 큐를 재생했는지 여부"""
+        return self.next_cue >= len(self.cues)
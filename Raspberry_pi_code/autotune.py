@@ -0,0 +1,161 @@
+# autotune.py
+# 사용법: python autotune.py <녹화 프레임 경로> [--trials 120] [--workers 4] [--min-recall 0.8] [--save]
+#   - 녹화 프레임 경로: 이미지 폴더, .npy 파일 또는 영상 파일 (정답 라벨 형식은 benchmark.py와 동일)
+#   - 전처리 설정 후보를 모든 코어에 나눠 평가하고, CPU 1ms당 재현율이 가장 높은 설정을 추천
+#   - --save를 주면 추천 설정을 스캐너 프로파일에 저장 (QRScanner가 시작할 때 불러옴)
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from benchmark import DEFAULT_SETTINGS, load_frames, load_labels
+from preprocessor import Preprocessor
+from qr_decoders import create_decoder
+from scanner_profile import load_profile, save_profile
+
+# 탐색 범위
+SEARCH_SPACE = {
+    "brightness": (0.0, 1.6),                   # 연속 값 (최소, 최대)
+    "contrast": (0.6, 2.0),                     # 연속 값 (최소, 최대)
+    "blur_kernel": [(1, 1), (3, 3), (5, 5)],
+    "adaptive_block_size": list(range(31, 152, 10)),
+    "adaptive_C": list(range(0, 16)),
+    "threshold_method": ["gaussian", "box", "downsampled"],
+}
+
+# 워커 프로세스별 상태 (프로세스마다 한 번만 프레임을 불러옴)
+_frames = None
+_labels = None
+_decoder = None
+
+def _init_worker(path, labels, decoder_name):
+    """워커 프로세스 초기화 (프레임 로드, 디코더 생성)"""
+    global _frames, _labels, _decoder
+    _frames = load_frames(path)
+    _labels = labels
+    _decoder = create_decoder(decoder_name)
+
+def _evaluate(settings):
+    """
+    전처리 설정 하나를 전체 프레임에 적용해서 평가 (워커 프로세스에서 실행)
+    :param settings: 전처리 설정 딕셔너리
+    :return: (설정, 재현율, 프레임당 CPU 시간 ms)
+    """
+    preprocessor = Preprocessor(settings)
+    preprocessor.process(_frames[0])  # 버퍼 할당은 측정에서 제외
+
+    hits = 0
+    total = 0
+    start = time.process_time()
+    for frame, label in zip(_frames, _labels):
+        found = {obj.text for obj in _decoder.decode(preprocessor.process(frame))}
+        hits += len(found & label)
+        total += len(label)
+    cpu_ms = (time.process_time() - start) / len(_frames) * 1000
+
+    return settings, (hits / total if total else 0.0), cpu_ms
+
+def _score(recall, cpu_ms, min_recall):
+    """CPU 1ms당 재현율 (재현율 기준 미달이면 기준을 넘는 후보보다 항상 낮게)"""
+    score = recall / max(cpu_ms, 1e-3)
+    return score if recall >= min_recall else score - 1e6
+
+def sample_settings(rng, base=None, spread=1.0):
+    """
+    탐색 범위에서 전처리 설정 후보 하나 뽑기
+    :param rng: numpy 난수 생성기
+    :param base: 주변을 탐색할 기준 설정 (None이면 전체 범위에서 무작위)
+    :param spread: 기준 설정 주변 탐색 폭 (0-1, 전체 범위 대비 비율)
+    :return: 전처리 설정 딕셔너리
+    """
+    settings = {}
+    for key, space in SEARCH_SPACE.items():
+        if isinstance(space, tuple):
+            low, high = space
+            if base is None:
+                value = rng.uniform(low, high)
+            else:
+                value = np.clip(base[key] + rng.normal(0, (high - low) * spread / 2), low, high)
+            settings[key] = round(float(value), 2)
+        elif base is None or rng.random() < spread:
+            settings[key] = space[rng.integers(len(space))]
+        else:
+            settings[key] = base[key]
+    return settings
+
+def tune(path, labels, decoder_name, trials=120, workers=None, min_recall=0.8, seed=0):
+    """
+    전처리 설정 탐색 (무작위 탐색 후 상위 후보 주변을 한 번 더 탐색)
+    :param path: 녹화 프레임 경로
+    :param labels: 프레임별 정답 QR 문자열 집합 리스트
+    :param decoder_name: 평가에 사용할 디코더 이름
+    :param trials: 평가할 후보 수 (절반은 무작위, 절반은 상위 후보 주변)
+    :param workers: 프로세스 수 (None이면 CPU 코어 수)
+    :param min_recall: 추천에 필요한 최소 재현율
+    :param seed: 난수 시드
+    :return: (설정, 재현율, 프레임당 CPU ms) 리스트 (점수 높은 순)
+    """
+    rng = np.random.default_rng(seed)
+    explore = max(1, trials // 2)
+    candidates = [dict(DEFAULT_SETTINGS)] + [sample_settings(rng) for _ in range(explore - 1)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(path, labels, decoder_name)) as pool:
+        results = list(pool.map(_evaluate, candidates))
+        results.sort(key=lambda r: _score(r[1], r[2], min_recall), reverse=True)
+        print(f"🔎 무작위 탐색 {len(results)}개 완료 - 현재 최고: 재현율 {results[0][1]:.1%}, {results[0][2]:.2f}ms")
+
+        top = [r[0] for r in results[:4]]
+        refine = [sample_settings(rng, base=top[i % len(top)], spread=0.25) for i in range(trials - explore)]
+        results.extend(pool.map(_evaluate, refine))
+
+    results.sort(key=lambda r: _score(r[1], r[2], min_recall), reverse=True)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="QR 스캐너 전처리 설정 자동 튜닝")
+    parser.add_argument("frames", help="이미지 폴더, .npy 파일 또는 영상 파일")
+    parser.add_argument("--trials", type=int, default=120, help="평가할 설정 후보 수")
+    parser.add_argument("--workers", type=int, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--min-recall", type=float, default=0.8, help="추천에 필요한 최소 재현율")
+    parser.add_argument("--decoder", help="평가에 사용할 디코더 (기본: 스캐너 프로파일 값)")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    parser.add_argument("--save", action="store_true", help="추천 설정을 스캐너 프로파일에 저장")
+    args = parser.parse_args(argv)
+
+    decoder_name = args.decoder or load_profile().get("decoder", "pyzbar")
+    labels = load_labels(args.frames)
+    if labels is None:
+        # 정답 라벨이 없으면 기본 설정과 원본 프레임에서 찾은 코드의 합집합을 정답으로 사용
+        decoder = create_decoder(decoder_name)
+        preprocessor = Preprocessor(dict(DEFAULT_SETTINGS))
+        labels = [{obj.text for obj in decoder.decode(frame)} |
+                  {obj.text for obj in decoder.decode(preprocessor.process(frame))}
+                  for frame in load_frames(args.frames)]
+        print("⚠️ 정답 라벨 없음 - 기본 설정과 원본 프레임 결과의 합집합 기준")
+    if not labels:
+        print(f"⚠️ 프레임을 찾을 수 없습니다: {args.frames}")
+        return 1
+
+    print(f"📂 프레임 {len(labels)}장, 후보 {args.trials}개로 전처리 설정 탐색 (디코더: {decoder_name})")
+    start = time.perf_counter()
+    results = tune(args.frames, labels, decoder_name, trials=args.trials, workers=args.workers,
+                   min_recall=args.min_recall, seed=args.seed)
+    print(f"⏱️ 탐색 시간: {time.perf_counter() - start:.1f}초")
+
+    print(f"{'재현율':>8} {'CPU(ms)':>8}  설정")
+    for settings, recall, cpu_ms in results[:5]:
+        print(f"{recall:>8.1%} {cpu_ms:>8.2f}  {settings}")
+
+    best, recall, cpu_ms = results[0]
+    if recall < args.min_recall:
+        print(f"⚠️ 재현율 {args.min_recall:.0%} 이상인 설정이 없습니다.")
+        return 1
+
+    print(f"🏆 추천 설정: {best}")
+    if args.save:
+        save_profile({"preprocess_settings": best})
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+# benchmark.py
+# 사용법: python benchmark.py threshold <녹화 프레임 경로> [--decoder NAME]
+#         python benchmark.py decoders <녹화 프레임 경로> [--min-recall 0.9] [--save]
+#         python benchmark.py wifi [--host 192.168.4.1] [--count 200] [--delay-ms 0]
+#   - 녹화 프레임 경로: 이미지 폴더(.png/.jpg), (N, H, W[, 3]) 형태의 .npy 파일 또는 영상 파일
+#   - 정답 라벨(선택): 이미지마다 같은 이름의 .json, .npy 파일은 같은 이름의 .json (프레임별 리스트)
+#     형식: {"codes": [{"text": "Player_Number_001", "polygon": [[x, y], ...]}, ...]}
+#   - wifi: 명령 전송 지연 비교 (매번 새 연결 + 연결 확인 vs 연결 재사용 세션), --host가 없으면 로컬 테스트 서버 사용
+import os
+import json
+import sys
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from frame_source import IMAGE_EXTENSIONS, open_source
+from preprocessor import Preprocessor
+from qr_decoders import available_decoders, create_decoder
+from scanner_profile import load_profile, save_profile
+
+# 기본 전처리 설정 (QRScanner.preprocess_settings와 동일)
+DEFAULT_SETTINGS = {
+    "brightness": 0.6,
+    "contrast": 1.0,
+    "blur_kernel": (3, 3),
+    "adaptive_block_size": 101,
+    "adaptive_C": 6,
+    "threshold_method": "gaussian"
+}
+
+def load_frames(path):
+    """
+    녹화된 프레임 불러오기
+    :param path: 이미지 폴더, .npy 파일(메모리 매핑) 또는 영상 파일 경로
+    :return: 프레임 리스트
+    """
+    source = open_source(path)
+    frames = []
+    try:
+        frame = source.read()
+        while frame is not None:
+            frames.append(frame)
+            frame = source.read()
+    finally:
+        source.release()
+    return frames
+
+def _label_texts(label):
+    """정답 라벨에서 QR 문자열 집합 추출"""
+    return {code["text"] for code in label.get("codes", [])}
+
+def load_labels(path):
+    """
+    녹화된 프레임의 정답 라벨 불러오기
+    :param path: 이미지 폴더 또는 .npy 파일 경로
+    :return: 프레임별 QR 문자열 집합 리스트 (라벨이 하나라도 없거나 영상 파일이면 None)
+    """
+    if path.endswith(".npy"):
+        label_path = path[:-4] + ".json"
+        if not os.path.exists(label_path):
+            return None
+        with open(label_path, "r", encoding="utf-8") as f:
+            return [_label_texts(label) for label in json.load(f)["frames"]]
+    if not os.path.isdir(path):
+        return None
+
+    labels = []
+    for name in sorted(os.listdir(path)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        label_path = os.path.join(path, os.path.splitext(name)[0] + ".json")
+        if not os.path.exists(label_path):
+            return None
+        with open(label_path, "r", encoding="utf-8") as f:
+            labels.append(_label_texts(json.load(f)))
+    return labels
+
+def run_threshold_benchmark(frames, methods, decoder_name="pyzbar"):
+    """
+    이진화 방식별 전처리 시간과 디코딩 성공률 비교
+    :param frames: 프레임 리스트
+    :param methods: 비교할 이진화 방식 리스트
+    :param decoder_name: 디코딩에 사용할 QR 디코더 백엔드 이름
+    :return: 방식별 결과 딕셔너리 리스트
+    """
+    decoder = create_decoder(decoder_name)
+    results = []
+    for method in methods:
+        settings = dict(DEFAULT_SETTINGS, threshold_method=method)
+        preprocessor = Preprocessor(settings)
+        preprocessor.process(frames[0])  # 버퍼 할당은 측정에서 제외
+
+        preprocess_time = 0.0
+        decode_time = 0.0
+        decoded_frames = 0
+        decoded_codes = 0
+
+        for frame in frames:
+            start = time.perf_counter()
+            thresh = preprocessor.process(frame)
+            middle = time.perf_counter()
+            decoded_objects = decoder.decode(thresh)
+            end = time.perf_counter()
+
+            preprocess_time += middle - start
+            decode_time += end - middle
+            decoded_codes += len(decoded_objects)
+            if decoded_objects:
+                decoded_frames += 1
+
+        count = len(frames)
+        results.append({
+            "method": method,
+            "preprocess_ms": preprocess_time / count * 1000,
+            "total_ms": (preprocess_time + decode_time) / count * 1000,
+            "decode_rate": decoded_frames / count,
+            "codes": decoded_codes,
+        })
+    return results
+
+def threshold_command(args):
+    """threshold 명령: 이진화 방식 비교 결과 출력"""
+    frames = load_frames(args.frames)
+    if not frames:
+        print(f"⚠️ 프레임을 찾을 수 없습니다: {args.frames}")
+        return 1
+
+    decoder_name = args.decoder or load_profile().get("decoder", "pyzbar")
+    print(f"📂 프레임 {len(frames)}장으로 이진화 방식 비교 (디코더: {decoder_name})")
+    results = run_threshold_benchmark(frames, args.methods, decoder_name)
+
+    print(f"{'방식':<12} {'전처리(ms)':>10} {'전체(ms)':>10} {'인식률':>8} {'코드 수':>8}")
+    for r in results:
+        print(f"{r['method']:<12} {r['preprocess_ms']:>10.2f} {r['total_ms']:>10.2f} "
+              f"{r['decode_rate']:>8.1%} {r['codes']:>8}")
+    return 0
+
+def run_decoder_benchmark(frames, labels, decoders):
+    """
+    디코더 백엔드별 속도(초당 디코딩 프레임 수)와 재현율 비교
+    정답 라벨이 없으면 모든 백엔드가 찾은 코드의 합집합을 정답으로 사용
+    :param frames: 프레임 리스트
+    :param labels: 프레임별 정답 QR 문자열 집합 리스트 (없으면 None)
+    :param decoders: 비교할 디코더 이름 리스트
+    :return: 백엔드별 결과 딕셔너리 리스트
+    """
+    preprocessor = Preprocessor(dict(DEFAULT_SETTINGS))
+    processed = [preprocessor.process(frame).copy() for frame in frames]
+
+    found = {}
+    elapsed = {}
+    for name in decoders:
+        decoder = create_decoder(name)
+        decoder.decode(processed[0])  # 초기화 비용은 측정에서 제외
+
+        start = time.perf_counter()
+        found[name] = [{obj.text for obj in decoder.decode(image)} for image in processed]
+        elapsed[name] = time.perf_counter() - start
+
+    if labels is None:
+        labels = [set().union(*(found[name][i] for name in decoders)) for i in range(len(frames))]
+    total = sum(len(label) for label in labels)
+
+    results = []
+    for name in decoders:
+        hits = sum(len(codes & label) for codes, label in zip(found[name], labels))
+        results.append({
+            "decoder": name,
+            "fps": len(frames) / elapsed[name] if elapsed[name] else 0.0,
+            "ms": elapsed[name] / len(frames) * 1000,
+            "recall": hits / total if total else 0.0,
+        })
+    return results
+
+def decoders_command(args):
+    """decoders 명령: 디코더 백엔드 비교 후 가장 빠르면서 재현율 기준을 넘는 백엔드 추천"""
+    frames = load_frames(args.frames)
+    if not frames:
+        print(f"⚠️ 프레임을 찾을 수 없습니다: {args.frames}")
+        return 1
+
+    labels = load_labels(args.frames)
+    decoders = args.decoders or available_decoders()
+    print(f"📂 프레임 {len(frames)}장으로 디코더 비교 "
+          f"({'정답 라벨 사용' if labels else '정답 라벨 없음 - 전체 백엔드 결과의 합집합 기준'})")
+    results = run_decoder_benchmark(frames, labels, decoders)
+
+    print(f"{'디코더':<10} {'초당 프레임':>10} {'프레임당(ms)':>12} {'재현율':>8}")
+    for r in results:
+        print(f"{r['decoder']:<10} {r['fps']:>10.1f} {r['ms']:>12.2f} {r['recall']:>8.1%}")
+
+    accurate = [r for r in results if r["recall"] >= args.min_recall]
+    if not accurate:
+        print(f"⚠️ 재현율 {args.min_recall:.0%} 이상인 디코더가 없습니다.")
+        return 1
+
+    best = max(accurate, key=lambda r: r["fps"])
+    print(f"🏆 추천 디코더: {best['decoder']}")
+    if args.save:
+        save_profile({"decoder": best["decoder"]})
+    return 0
+
+class _StubESP32Handler(BaseHTTPRequestHandler):
+    """ESP32 웹 서버 흉내 (/ 연결 확인, /motor 명령에 200 응답, keep-alive 지원)"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # 헤더/본문을 따로 쓰므로 keep-alive 연결에서 지연 ACK 대기 방지
+    delay = 0.0  # 응답 지연 (초, ESP32 처리 시간 흉내)
+
+    def do_GET(self):
+        if self.delay:
+            time.sleep(self.delay)
+        body = b"OK"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_esp32(delay=0.0):
+    """
+    로컬 ESP32 테스트 서버 시작
+    :param delay: 응답 지연 (초)
+    :return: HTTP 서버 (server_address로 포트 확인)
+    """
+    handler = type("StubESP32Handler", (_StubESP32Handler,), {"delay": delay})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+def _send_legacy(host, command):
+    """기존 전송 방식: 연결 확인 요청 + 명령 요청, 매번 새 TCP 연결"""
+    import requests
+    try:
+        requests.get(f"http://{host}", timeout=2)
+        requests.get(f"http://{host}/motor?cup={command}", timeout=3)
+        return True
+    except requests.exceptions.RequestException:
+        return False
+
+def run_wifi_benchmark(host, count):
+    """
+    명령 전송 지연 비교
+    :param host: ESP32 주소
+    :param count: 방식별 전송 횟수
+    :return: 방식별 결과 딕셔너리 리스트
+    """
+    from wifi_processor import WiFiProcessor
+    wifi = WiFiProcessor(host=host)
+
+    senders = [
+        ("legacy", lambda command: _send_legacy(host, command)),
+        ("pooled", wifi.send_command),
+    ]
+    results = []
+    for name, send in senders:
+        send("STOP")  # 연결/모듈 초기화 비용은 측정에서 제외
+        latencies = []
+        failures = 0
+        for i in range(count):
+            start = time.perf_counter()
+            if not send("ABC"[i % 3]):
+                failures += 1
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        results.append({
+            "method": name,
+            "mean_ms": sum(latencies) / count * 1000,
+            "p50_ms": latencies[count // 2] * 1000,
+            "p95_ms": latencies[min(count - 1, int(count * 0.95))] * 1000,
+            "failures": failures,
+        })
+
+    print(f"📊 세션 통계: {wifi.get_stats()}")
+    wifi.close()
+    return results
+
+def wifi_command(args):
+    """wifi 명령: ESP32 명령 전송 방식별 지연 비교"""
+    server = None
+    host = args.host
+    if host is None:
+        server = start_stub_esp32(args.delay_ms / 1000)
+        host = f"127.0.0.1:{server.server_address[1]}"
+        print(f"🧪 로컬 ESP32 테스트 서버: {host} (응답 지연 {args.delay_ms}ms)")
+
+    try:
+        print(f"📡 {host}에 방식별 명령 {args.count}회 전송")
+        results = run_wifi_benchmark(host, args.count)
+    finally:
+        if server:
+            server.shutdown()
+
+    print(f"{'방식':<8} {'평균(ms)':>10} {'p50(ms)':>10} {'p95(ms)':>10} {'실패':>6}")
+    for r in results:
+        print(f"{r['method']:<8} {r['mean_ms']:>10.2f} {r['p50_ms']:>10.2f} {r['p95_ms']:>10.2f} {r['failures']:>6}")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="QR 스캐너 성능 비교 도구")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    threshold = commands.add_parser("threshold", help="이진화 방식별 속도/인식률 비교")
+    threshold.add_argument("frames", help="이미지 폴더, .npy 파일 또는 영상 파일")
+    threshold.add_argument("--methods", nargs="+", default=["gaussian", "box", "downsampled"],
+                           help="비교할 이진화 방식")
+    threshold.add_argument("--decoder", help="QR 디코더 백엔드 (기본: 스캐너 프로파일 값)")
+    threshold.set_defaults(func=threshold_command)
+
+    decoders = commands.add_parser("decoders", help="디코더 백엔드별 속도/재현율 비교")
+    decoders.add_argument("frames", help="이미지 폴더, .npy 파일 또는 영상 파일")
+    decoders.add_argument("--decoders", nargs="+", help="비교할 디코더 (기본: 사용 가능한 전체)")
+    decoders.add_argument("--min-recall", type=float, default=0.9, help="추천에 필요한 최소 재현율")
+    decoders.add_argument("--save", action="store_true", help="추천 디코더를 스캐너 프로파일에 저장")
+    decoders.set_defaults(func=decoders_command)
+
+    wifi = commands.add_parser("wifi", help="ESP32 명령 전송 지연 비교 (기존 방식 vs 연결 재사용)")
+    wifi.add_argument("--host", help="ESP32 주소 (기본: 로컬 테스트 서버)")
+    wifi.add_argument("--count", type=int, default=200, help="방식별 전송 횟수")
+    wifi.add_argument("--delay-ms", type=float, default=0.0, help="로컬 테스트 서버 응답 지연 (ms)")
+    wifi.set_defaults(func=wifi_command)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
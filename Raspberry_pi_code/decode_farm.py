@@ -0,0 +1,320 @@
+# decode_farm.py
+import os
+import time
+import multiprocessing as mp
+from collections import deque
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait as wait_connections
+import numpy as np
+from preprocessor import Preprocessor
+from qr_decoders import decode_pyramid, create_decoder
+
+def _decode_worker(task_queue, result_pipe, settings, pyramid_scale, decoder_name):
+    """
+    디코딩 워커 프로세스 함수
+    공유 메모리 슬롯의 프레임을 전처리 + 디코딩한 뒤 결과만 돌려보냄 (배열은 피클링하지 않음)
+    :param task_queue: 이 워커 전용 작업 큐 ((프레임 번호, 슬롯 번호, 공유 메모리 이름, shape, dtype) 또는 새 전처리 설정 딕셔너리)
+    :param result_pipe: 이 워커 전용 결과 파이프 쓰기 끝 ((프레임 번호, 슬롯 번호, 디코딩 결과, 오류 메시지) 전송)
+    :param settings: 전처리 설정 딕셔너리
+    :param pyramid_scale: 피라미드 디코딩 축소 배율 (0 = 원본 해상도만 디코딩)
+    :param decoder_name: QR 디코더 백엔드 이름
+    """
+    attached = {}  # 공유 메모리 이름 → SharedMemory
+    preprocessor = Preprocessor(settings)  # 워커별 작업 버퍼 재사용
+    decoder = create_decoder(decoder_name)
+
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break  # 종료 신호
+            if isinstance(task, dict):
+                preprocessor.settings = task  # 설정 변경 (이후 작업부터 적용, LUT는 다음 프레임에서 재생성)
+                continue
+
+            seq, slot, shm_name, shape, dtype = task
+            try:
+                shm = attached.get(shm_name)
+                if shm is None:
+                    shm = shared_memory.SharedMemory(name=shm_name)
+                    attached[shm_name] = shm
+
+                frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+                thresh = preprocessor.process(frame)
+                if pyramid_scale > 1:
+                    decoded_objects = decode_pyramid(thresh, decoder.decode, pyramid_scale)
+                else:
+                    decoded_objects = decoder.decode(thresh)
+                del frame
+                result_pipe.send((seq, slot, decoded_objects, None))
+            except Exception as e:
+                result_pipe.send((seq, slot, [], str(e)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for shm in attached.values():
+            shm.close()
+
+class DecodeFarm:
+    """공유 메모리 프레임 슬롯과 워커 프로세스 풀을 이용한 병렬 QR 디코딩 엔진"""
+
+    def __init__(self, settings, workers=None, slots=None, pyramid_scale=0, decoder="pyzbar",
+                 task_timeout=5.0, health_interval=0.5):
+        """
+        초기화 (공유 메모리와 워커는 첫 프레임이 들어올 때 생성)
+        :param settings: 전처리 설정 딕셔너리 (QRScanner.preprocess_settings, 변경하면 다음 제출부터 워커에 전달)
+        :param workers: 워커 프로세스 수 (기본값: CPU 코어 수 - 1)
+        :param slots: 공유 메모리 프레임 슬롯 수 (기본값: 워커 수 x 2)
+        :param pyramid_scale: 피라미드 디코딩 축소 배율 (0 = 원본 해상도만 디코딩)
+        :param decoder: QR 디코더 백엔드 이름
+        :param task_timeout: 워커가 프레임 하나를 이 시간(초) 넘게 붙잡고 있으면 멈춘 것으로 보고 재시작
+        :param health_interval: 워커 생존 확인 간격 (초)
+        """
+        self.settings = settings
+        self.sent_settings = dict(settings)  # 워커에 마지막으로 보낸 설정
+        self.pyramid_scale = pyramid_scale
+        self.decoder = decoder
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.slot_count = slots or self.workers * 2
+        self.task_timeout = task_timeout
+        self.health_interval = health_interval
+
+        self.context = mp.get_context("spawn")  # 캡처 스레드가 있는 프로세스에서 fork 방지
+        self.task_queues = []   # 워커별 작업 큐 (어느 워커가 어느 슬롯을 가졌는지 알 수 있도록)
+        self.result_pipes = []  # 워커별 결과 파이프 읽기 끝 (워커를 강제 종료해도 다른 워커의 결과 통로는 손상되지 않음, 끊기면 None)
+        self.processes = []
+        self.shms = []
+        self.views = []
+        self.frame_shape = None
+        self.frame_dtype = None
+
+        self.free_slots = deque()
+        self.in_flight = {}    # 프레임 번호 → (슬롯 번호, 워커 번호, 제출 시각)
+        self.worker_load = []  # 워커별 처리 중인 프레임 수
+        self.tags = {}         # 프레임 번호 → 호출자가 넘긴 태그 (예: 원본 프레임)
+        self.completed = {}    # 프레임 번호 → (태그, 디코딩 결과)
+        self.next_seq = 0      # 다음에 부여할 프레임 번호
+        self.next_output = 0   # 다음에 내보낼 프레임 번호 (캡처 순서 보장)
+        self.last_health_check = 0.0
+
+        # 통계 카운터
+        self.frames_submitted = 0
+        self.frames_dropped = 0
+        self.frames_decoded = 0
+        self.frames_lost = 0       # 워커가 죽거나 멈춰서 결과 없이 회수한 프레임 수
+        self.decode_errors = 0
+        self.worker_restarts = 0
+        self.settings_updates = 0
+
+    def _start(self, frame):
+        """첫 프레임 크기에 맞춰 공유 메모리 슬롯 생성 및 워커 프로세스 시작"""
+        self.frame_shape = frame.shape
+        self.frame_dtype = frame.dtype
+
+        for slot in range(self.slot_count):
+            shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+            self.shms.append(shm)
+            self.views.append(np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf))
+            self.free_slots.append(slot)
+
+        for index in range(self.workers):
+            self.task_queues.append(None)
+            self.result_pipes.append(None)
+            self.processes.append(None)
+            self.worker_load.append(0)
+            self._spawn_worker(index)
+
+        self.last_health_check = time.monotonic()
+        print(f"🧵 디코딩 워커 {self.workers}개 시작 (슬롯 {self.slot_count}개)")
+
+    def _spawn_worker(self, index):
+        """
+        워커 프로세스 하나를 새 작업 큐, 결과 파이프와 함께 시작 (현재 전처리 설정 사용)
+        :param index: 워커 번호
+        """
+        task_queue = self.context.Queue()
+        reader, writer = self.context.Pipe(duplex=False)
+        process = self.context.Process(
+            target=_decode_worker,
+            args=(task_queue, writer, self.sent_settings,
+                  self.pyramid_scale, self.decoder)
+        )
+        process.daemon = True
+        process.start()
+        writer.close()  # 부모 쪽 쓰기 끝을 닫아야 워커가 죽으면 읽기 끝에서 EOF를 받음
+        self.task_queues[index] = task_queue
+        self.result_pipes[index] = reader
+        self.processes[index] = process
+
+    def _sync_settings(self):
+        """전처리 설정이 바뀌었으면 모든 워커 작업 큐에 새 설정을 넣음 (큐 순서상 이후 프레임부터 적용)"""
+        if self.settings == self.sent_settings:
+            return
+        self.sent_settings = dict(self.settings)
+        for task_queue in self.task_queues:
+            task_queue.put(self.sent_settings)
+        self.settings_updates += 1
+
+    def submit(self, frame, tag=None, block=False):
+        """
+        프레임을 빈 슬롯에 복사하고 가장 한가한 워커에게 디코딩 요청
+        빈 슬롯이 없으면 프레임을 버림 (느린 워커 때문에 큐가 무한히 쌓이지 않도록)
+        :param frame: 원본 프레임
+        :param tag: 결과와 함께 돌려받을 값 (예: 화면 표시용 프레임)
+        :param block: 빈 슬롯이 없을 때 버리지 않고 슬롯이 빌 때까지 대기 (녹화 재생처럼 모든 프레임을 디코딩할 때)
+        :return: 부여된 프레임 번호, 버려진 경우 None
+        """
+        if self.frame_shape is None:
+            self._start(frame)
+        elif frame.shape != self.frame_shape or frame.dtype != self.frame_dtype:
+            raise ValueError(f"프레임 크기가 변경되었습니다: {self.frame_shape} → {frame.shape}")
+
+        self._drain()
+        while block and not self.free_slots:
+            self._drain(self.health_interval)
+            self._check_workers()  # 멈춘 워커의 슬롯도 회수되도록
+        if not self.free_slots:
+            self.frames_dropped += 1
+            return None
+
+        self._sync_settings()
+        slot = self.free_slots.popleft()
+        np.copyto(self.views[slot], frame)
+
+        worker = min(range(self.workers), key=self.worker_load.__getitem__)
+        seq = self.next_seq
+        self.next_seq += 1
+        self.tags[seq] = tag
+        self.in_flight[seq] = (slot, worker, time.monotonic())
+        self.worker_load[worker] += 1
+        self.task_queues[worker].put((seq, slot, self.shms[slot].name, self.frame_shape, self.frame_dtype.str))
+        self.frames_submitted += 1
+        return seq
+
+    def _drain(self, timeout=None):
+        """
+        워커별 결과 파이프에서 도착한 결과를 모두 꺼내 슬롯을 반환
+        :param timeout: 첫 결과 대기 시간 (None이면 대기하지 않음)
+        """
+        timeout = timeout or 0
+        while True:
+            pipes = [pipe for pipe in self.result_pipes if pipe is not None]
+            ready = wait_connections(pipes, timeout) if pipes else []
+            if not ready:
+                return
+
+            timeout = 0  # 첫 결과 이후에는 대기하지 않음
+            for pipe in ready:
+                try:
+                    seq, slot, decoded_objects, error = pipe.recv()
+                except (EOFError, OSError):
+                    # 워커가 죽음 (전송 도중이었으면 남은 조각은 버림) - 처리 중이던 프레임은 _check_workers가 회수
+                    pipe.close()
+                    self.result_pipes[self.result_pipes.index(pipe)] = None
+                    continue
+
+                owner = self.in_flight.pop(seq, None)
+                if owner is None:
+                    continue  # 이미 회수한 프레임
+                self.worker_load[owner[1]] -= 1
+                self.free_slots.append(slot)
+                if error:
+                    self.decode_errors += 1
+                    print(f"🚨 디코딩 워커 오류: {error}")
+                self.frames_decoded += 1
+                self.completed[seq] = (self.tags.pop(seq, None), decoded_objects)
+
+    def _check_workers(self):
+        """
+        죽었거나 프레임 하나를 task_timeout 넘게 붙잡고 있는 워커를 재시작하고,
+        그 워커가 가지고 있던 슬롯을 회수 (해당 프레임은 빈 결과로 순서대로 내보냄)
+        """
+        now = time.monotonic()
+        if not self.processes or now - self.last_health_check < self.health_interval:
+            return
+        self.last_health_check = now
+
+        oldest = {}  # 워커 번호 → 가장 오래된 처리 중 프레임의 제출 시각
+        for slot, worker, submitted_at in self.in_flight.values():
+            oldest[worker] = min(submitted_at, oldest.get(worker, submitted_at))
+
+        for index, process in enumerate(self.processes):
+            if not process.is_alive():
+                reason = f"종료됨 (exit code {process.exitcode})"
+            elif index in oldest and now - oldest[index] > self.task_timeout:
+                reason = f"{self.task_timeout:.0f}초 넘게 응답 없음"
+                process.kill()  # 멈춘 프로세스는 SIGTERM을 처리하지 못할 수 있음
+                process.join(timeout=1.0)
+            else:
+                continue
+
+            lost = [seq for seq, (_, worker, _) in self.in_flight.items() if worker == index]
+            for seq in lost:
+                slot, _, _ = self.in_flight.pop(seq)
+                self.free_slots.append(slot)
+                self.completed[seq] = (self.tags.pop(seq, None), [])
+            self.frames_lost += len(lost)
+            self.worker_load[index] = 0
+
+            self.task_queues[index].cancel_join_thread()  # 죽은 워커 큐에 남은 작업은 이미 회수함
+            self.task_queues[index].close()
+            if self.result_pipes[index] is not None:
+                self.result_pipes[index].close()  # 강제 종료된 워커의 결과 파이프는 새 워커와 함께 교체
+            self._spawn_worker(index)
+            self.worker_restarts += 1
+            print(f"🚨 디코딩 워커 {index} {reason} → 재시작 (프레임 {len(lost)}개 회수)")
+
+    def collect(self, timeout=None):
+        """
+        캡처 순서대로 완료된 디코딩 결과 반환
+        :param timeout: 순서상 다음 결과가 없을 때 대기할 시간 (초)
+        :return: (프레임 번호, 태그, 디코딩 결과) 리스트
+        """
+        self._drain()
+        if timeout and self.next_output < self.next_seq and self.next_output not in self.completed:
+            self._drain(timeout)
+        self._check_workers()
+
+        results = []
+        while self.next_output in self.completed:
+            tag, decoded_objects = self.completed.pop(self.next_output)
+            results.append((self.next_output, tag, decoded_objects))
+            self.next_output += 1
+        return results
+
+    def get_stats(self):
+        """
+        디코딩 통계 반환
+        :return: 제출/버림/디코딩/회수/오류 프레임 수, 워커 재시작/설정 변경 횟수 딕셔너리
+        """
+        return {
+            "submitted": self.frames_submitted,
+            "dropped": self.frames_dropped,
+            "decoded": self.frames_decoded,
+            "lost": self.frames_lost,
+            "errors": self.decode_errors,
+            "restarts": self.worker_restarts,
+            "settings_updates": self.settings_updates,
+        }
+
+    def close(self):
+        """워커 프로세스 종료 및 공유 메모리 해제"""
+        for task_queue in self.task_queues:
+            task_queue.put(None)
+
+        for process in self.processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        self.task_queues = []
+        for pipe in self.result_pipes:
+            if pipe is not None:
+                pipe.close()
+        self.result_pipes = []
+
+        self.views = []
+        for shm in self.shms:
+            shm.close()
+            shm.unlink()
+        self.shms = []
@@ -0,0 +1,66 @@
+# detection.py
+import numpy as np
+
+class Detection:
+    """
+    QR 코드 검출 결과 (프레임당 한 번만 생성)
+    문자열 변환, 중심, 면적을 미리 계산해 두어 소비하는 쪽에서 반복 계산하지 않음
+    """
+
+    __slots__ = ("text", "polygon", "rect", "center", "area")
+
+    def __init__(self, text, polygon):
+        """
+        초기화
+        :param text: QR 코드 문자열
+        :param polygon: 꼭짓점 좌표 배열 (N x 2, int16로 변환해서 저장)
+        """
+        self.text = text
+        self.polygon = np.asarray(polygon, dtype=np.int16).reshape(-1, 2)
+
+        xs = self.polygon[:, 0].astype(np.float32)
+        ys = self.polygon[:, 1].astype(np.float32)
+        left, top = int(xs.min()), int(ys.min())
+        self.rect = (left, top, int(xs.max()) - left, int(ys.max()) - top)  # (x, y, 너비, 높이)
+        self.center = (float(xs.mean()), float(ys.mean()))
+        # 신발끈 공식으로 다각형 면적 계산
+        self.area = 0.5 * abs(float(np.dot(xs, np.roll(ys, 1)) - np.dot(ys, np.roll(xs, 1))))
+
+    @classmethod
+    def from_pyzbar(cls, obj):
+        """
+        pyzbar 디코딩 결과를 Detection으로 변환
+        :param obj: pyzbar.Decoded
+        :return: Detection
+        """
+        return cls(obj.data.decode('utf-8'), obj.polygon)
+
+    def translated(self, dx, dy):
+        """
+        잘라낸 영역에서 찾은 결과의 좌표를 전체 프레임 기준으로 이동
+        :param dx: x 방향 이동량 (잘라낸 영역의 왼쪽 좌표)
+        :param dy: y 방향 이동량 (잘라낸 영역의 위쪽 좌표)
+        :return: 좌표가 이동된 새 Detection
+        """
+        return Detection(self.text, self.polygon.astype(np.int32) + (dx, dy))
+
+    def scaled(self, scale):
+        """
+        축소 이미지에서 찾은 결과의 좌표를 원본 해상도 기준으로 확대
+        :param scale: 확대 배율
+        :return: 좌표가 확대된 새 Detection
+        """
+        return Detection(self.text, self.polygon.astype(np.int32) * scale)
+
+    def contains(self, x, y):
+        """
+        점이 경계 사각형 안에 있는지 확인
+        :param x: x 좌표
+        :param y: y 좌표
+        :return: 포함 여부
+        """
+        left, top, width, height = self.rect
+        return left <= x <= left + width and top <= y <= top + height
+
+    def __repr__(self):
+        return f"Detection(text={self.text!r}, center=({self.center[0]:.1f}, {self.center[1]:.1f}), area={self.area:.0f})"
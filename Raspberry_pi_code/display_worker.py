@@ -0,0 +1,125 @@
+# display_worker.py
+import threading
+from collections import deque
+import cv2
+import numpy as np
+
+class DisplayWorker:
+    """별도 스레드에서 최신 프레임만 화면에 그리는 디스플레이 (스캔/추적 루프를 막지 않음)"""
+
+    WINDOW_NAME = "QR Code Scanner"
+
+    def __init__(self, window_name=WINDOW_NAME):
+        """
+        초기화 및 디스플레이 스레드 시작
+        :param window_name: OpenCV 창 이름
+        """
+        self.window_name = window_name
+        self.condition = threading.Condition()
+        self.pending = None         # 아직 그리지 않은 최신 (프레임, 디코딩 결과)
+        self.keys = deque(maxlen=16)  # 창에서 입력된 키 (waitKey는 디스플레이 스레드에서만 호출)
+        self.running = True
+
+        # 통계 카운터
+        self.frames_submitted = 0
+        self.frames_rendered = 0
+        self.frames_dropped = 0     # 그리기 전에 더 새로운 프레임이 들어와 버려진 수
+
+        self.thread = threading.Thread(target=self._render_loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def submit(self, frame, decoded_objects):
+        """
+        화면에 그릴 프레임 전달 (즉시 반환, 아직 그리지 않은 이전 프레임은 버림)
+        프레임 버퍼는 다음 캡처/전처리 때 재사용되므로 복사해서 보관
+        :param frame: 입력 프레임 (이미지)
+        :param decoded_objects: 디코딩된 QR 코드 객체 리스트
+        """
+        item = (frame.copy(), list(decoded_objects))
+        with self.condition:
+            if self.pending is not None:
+                self.frames_dropped += 1
+            self.pending = item
+            self.frames_submitted += 1
+            self.condition.notify()
+
+    def poll_key(self):
+        """
+        창에서 입력된 키 하나 꺼내기
+        :return: 키 코드 (입력이 없으면 -1)
+        """
+        try:
+            return self.keys.popleft()
+        except IndexError:
+            return -1
+
+    def _render_loop(self):
+        """디스플레이 스레드 함수 (창 생성, 그리기, 키 입력 처리를 모두 이 스레드에서 수행)"""
+        cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
+        # cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+
+        while self.running:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending is not None or not self.running, timeout=0.03)
+                item = self.pending
+                self.pending = None
+
+            if item is not None:
+                cv2.imshow(self.window_name, self._render(*item))
+                self.frames_rendered += 1
+
+            key = cv2.waitKey(1) & 0xFF  # 창 갱신 + 키 입력 확인
+            if key != 0xFF:
+                self.keys.append(key)
+
+        cv2.destroyWindow(self.window_name)
+        cv2.waitKey(1)
+
+    def _render(self, frame, decoded_objects):
+        """
+        QR 코드 경계선과 데이터를 프레임에 그리기
+        :param frame: 입력 프레임 (복사본)
+        :param decoded_objects: 디코딩된 QR 코드 객체 리스트
+        :return: 그려진 컬러 프레임
+        """
+        if frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)  # 색상 표시를 위해 컬러로 변환
+
+        for obj in decoded_objects:
+            points = obj.polygon
+            if len(points) > 4:
+                points = np.squeeze(cv2.convexHull(points.astype(np.float32)))
+            hull = [tuple(map(int, point)) for point in points]
+
+            # QR 코드 경계선 그리기
+            n = len(hull)
+            for j in range(n):
+                cv2.line(frame, hull[j], hull[(j + 1) % n], (255, 0, 0), 3)
+
+            # QR 코드 데이터 화면 출력
+            top_left = hull[0]
+            cv2.putText(frame, obj.text, (top_left[0], top_left[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 0), 3)
+
+        return frame
+
+    def get_stats(self):
+        """
+        디스플레이 통계 반환
+        :return: 전달/출력/버림 프레임 수 딕셔너리
+        """
+        with self.condition:
+            return {
+                "submitted": self.frames_submitted,
+                "rendered": self.frames_rendered,
+                "dropped": self.frames_dropped,
+            }
+
+    def stop(self):
+        """디스플레이 스레드 종료 (창은 디스플레이 스레드에서 닫음)"""
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+
+        if self.thread.is_alive():
+            self.thread.join(timeout=1.0)
@@ -0,0 +1,101 @@
+# frame_grabber.py
+import time
+import threading
+from collections import deque
+
+class FrameGrabber:
+    """백그라운드 스레드에서 카메라 프레임을 계속 읽어 최신 프레임만 넘겨주는 캡처 파이프라인"""
+
+    def __init__(self, capture_fn, buffer_size=2):
+        """
+        초기화
+        :param capture_fn: 프레임 한 장을 읽어 반환하는 함수 (예: FrameSource.read)
+        :param buffer_size: 링 버퍼 크기 (가득 차면 가장 오래된 프레임부터 버림)
+        """
+        self.capture_fn = capture_fn
+        self.buffer_size = max(1, buffer_size)
+        self.buffer = deque(maxlen=self.buffer_size)  # (프레임 번호, 프레임)
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+
+        # 통계 카운터
+        self.frames_captured = 0   # 카메라에서 읽은 프레임 수
+        self.frames_dropped = 0    # 소비되지 못하고 버려진 프레임 수
+        self.frames_consumed = 0   # get_latest()로 넘겨준 프레임 수
+        self.last_seq = 0          # 마지막으로 넘겨준 프레임 번호
+
+    def start(self):
+        """캡처 스레드 시작"""
+        if self.running:
+            return
+
+        self.running = True
+        self.thread = threading.Thread(target=self._capture_loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """캡처 스레드 중지"""
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+
+    def _capture_loop(self):
+        """캡처 스레드 함수 (버퍼가 가득 차면 가장 오래된 프레임을 버림)"""
+        while self.running:
+            try:
+                frame = self.capture_fn()
+            except Exception as e:
+                print(f"🚨 프레임 캡처 오류: {e}")
+                time.sleep(0.1)
+                continue
+
+            if frame is None:
+                time.sleep(0.01)  # 프레임이 없으면 잠시 대기 (바쁜 대기 방지)
+                continue
+
+            with self.condition:
+                self.frames_captured += 1
+                if len(self.buffer) == self.buffer.maxlen:
+                    self.frames_dropped += 1  # 가장 오래된 프레임이 밀려남
+                self.buffer.append((self.frames_captured, frame))
+                self.condition.notify_all()
+
+    def get_latest(self, timeout=1.0):
+        """
+        가장 최신 프레임을 반환 (이전에 넘겨준 프레임보다 새 프레임이 올 때까지 대기)
+        :param timeout: 새 프레임 대기 시간 (초)
+        :return: 최신 프레임, 시간 초과 시 None
+        """
+        with self.condition:
+            if not self.buffer:
+                self.condition.wait_for(lambda: self.buffer or not self.running, timeout)
+
+            if not self.buffer:
+                return None
+
+            seq, frame = self.buffer.pop()
+
+            # 최신 프레임보다 오래된 프레임은 모두 버림
+            self.frames_dropped += len(self.buffer)
+            self.buffer.clear()
+
+            self.frames_consumed += 1
+            self.last_seq = seq
+            return frame
+
+    def get_stats(self):
+        """
+        캡처 통계 반환
+        :return: 캡처/버림/소비 프레임 수 딕셔너리
+        """
+        with self.condition:
+            return {
+                "captured": self.frames_captured,
+                "dropped": self.frames_dropped,
+                "consumed": self.frames_consumed,
+            }
@@ -0,0 +1,260 @@
+# frame_source.py
+import os
+import time
+from abc import ABC, abstractmethod
+import cv2
+import numpy as np
+from hardware import is_simulated
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+class FrameSource(ABC):
+    """프레임 공급원 공통 인터페이스 (카메라, 녹화 파일, 테스트용 합성 프레임 등, read가 없으면 생성 시 오류)"""
+
+    @abstractmethod
+    def read(self):
+        """
+        프레임 한 장 읽기
+        반환한 배열은 이후 읽기에서 덮어쓰지 않아야 함 (캡처 스레드, 병렬 디코딩 워커가 여러 프레임을 동시에 붙잡고 있음)
+        :return: 프레임 (컬러 H x W x 3 - OpenCV와 같은 B, G, R 순서 - 또는 그레이스케일 H x W), 더 이상 없으면 None
+        """
+
+    def release(self):
+        """자원 해제"""
+        pass
+
+class RecordedSource(FrameSource):
+    """
+    녹화된 프레임 공급원 공통 동작 (재생 속도 흉내, 반복 재생, 카메라 YUV420 모드처럼 그레이스케일 출력)
+    하위 클래스는 _read_next()와 _rewind()만 구현 (없으면 생성 시 오류)
+    """
+
+    def __init__(self, fps=None, loop=False, gray=False):
+        """
+        초기화
+        :param fps: 카메라 속도 흉내 (None이면 대기 없이 바로 반환)
+        :param loop: 끝까지 읽은 뒤 처음부터 반복할지 여부 (게임 루프를 녹화로 돌릴 때 사용)
+        :param gray: 컬러 프레임을 그레이스케일로 변환해서 반환 (카메라 YUV420 모드와 같은 형태)
+        """
+        self.interval = 1.0 / fps if fps else 0.0
+        self.loop = loop
+        self.gray = gray
+        self.last_read_time = 0.0
+        self.frames_read = 0
+
+    @abstractmethod
+    def _read_next(self):
+        """
+        다음 녹화 프레임 읽기
+        :return: 프레임, 끝에 도달하면 None
+        """
+
+    @abstractmethod
+    def _rewind(self):
+        """처음 프레임으로 되돌리기"""
+
+    def _to_gray(self, frame):
+        """
+        컬러 프레임을 그레이스케일로 변환 (녹화 파일은 OpenCV BGR 순서)
+        매 프레임 새 배열을 반환하므로 캡처 스레드가 계속 읽어도 이미 넘겨준 프레임은 바뀌지 않음
+        """
+        if frame.ndim == 2:
+            return frame
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def read(self):
+        frame = self._read_next()
+        if frame is None and self.loop and self.frames_read:
+            self._rewind()
+            frame = self._read_next()
+        if frame is None:
+            return None
+
+        if self.interval:
+            wait = self.last_read_time + self.interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self.last_read_time = time.monotonic()
+
+        self.frames_read += 1
+        return self._to_gray(frame) if self.gray else frame
+
+class VideoFileSource(RecordedSource):
+    """녹화 영상 파일 프레임 공급원 (OpenCV가 열 수 있는 형식)"""
+
+    def __init__(self, path, **kwargs):
+        """
+        초기화
+        :param path: 영상 파일 경로
+        :param kwargs: RecordedSource 옵션 (fps, loop, gray)
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise IOError(f"영상 파일을 열 수 없습니다: {path}")
+
+    def _read_next(self):
+        ok, frame = self.capture.read()
+        return frame if ok else None
+
+    def _rewind(self):
+        self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def release(self):
+        self.capture.release()
+
+class ImageDirectorySource(RecordedSource):
+    """이미지 폴더 프레임 공급원 (파일 이름 순서, 읽을 때마다 한 장씩 불러옴)"""
+
+    def __init__(self, path, **kwargs):
+        """
+        초기화
+        :param path: 이미지 폴더 경로 (.png/.jpg/.jpeg/.bmp)
+        :param kwargs: RecordedSource 옵션 (fps, loop, gray)
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        self.paths = [os.path.join(path, name) for name in sorted(os.listdir(path))
+                      if name.lower().endswith(IMAGE_EXTENSIONS)]
+        self.index = 0
+
+    def _read_next(self):
+        while self.index < len(self.paths):
+            frame = cv2.imread(self.paths[self.index])
+            self.index += 1
+            if frame is not None:
+                return frame
+        return None
+
+    def _rewind(self):
+        self.index = 0
+
+class NpySource(RecordedSource):
+    """(N, H, W[, 3]) 형태의 .npy 프레임 공급원 (메모리 매핑으로 필요한 프레임만 디스크에서 읽음)"""
+
+    def __init__(self, path, **kwargs):
+        """
+        초기화
+        :param path: .npy 파일 경로
+        :param kwargs: RecordedSource 옵션 (fps, loop, gray)
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        self.frames = np.load(path, mmap_mode="r")
+        self.index = 0
+
+    def _read_next(self):
+        if self.index >= len(self.frames):
+            return None
+        frame = self.frames[self.index]
+        self.index += 1
+        return frame
+
+    def _rewind(self):
+        self.index = 0
+
+    def release(self):
+        self.frames = None
+
+class PiCameraSource(FrameSource):
+    """PiCamera2 프레임 공급원 (RGB888 컬러 또는 YUV420의 Y 평면 그레이스케일)"""
+
+    def __init__(self, width=640, height=480, pixel_format="RGB888"):
+        """
+        카메라 초기화
+        :param width: 카메라 해상도 (기본값 640x480)
+        :param height: 카메라 해상도
+        :param pixel_format: 'RGB888' (컬러 배열 복사, Picamera2 RGB888은 메모리상 B, G, R 순서) 또는 'YUV420' (Y 평면만 그레이스케일로 사용)
+        """
+        # 카메라가 없는 환경(테스트, 리플레이)에서도 이 모듈을 쓸 수 있도록 여기서 import
+        from picamera2 import Picamera2, MappedArray
+
+        self.width = width
+        self.height = height
+        self.pixel_format = pixel_format
+        self.mapped_array = MappedArray
+
+        self.picam2 = Picamera2()
+        self.picam2.preview_configuration.main.size = (width, height)
+        self.picam2.preview_configuration.main.format = pixel_format
+        self.picam2.configure("preview")
+        self.picam2.start()
+
+    def read(self):
+        if self.pixel_format != "YUV420":
+            return self.picam2.capture_array()
+
+        # 요청 버퍼를 직접 매핑해서 Y 평면만 새 배열로 한 번 복사하고 버퍼는 즉시 반환
+        # (버퍼를 돌려쓰면 캡처 스레드가 디코딩/추적/화면 표시 중인 프레임을 덮어쓰므로 매 프레임 새로 할당)
+        request = self.picam2.capture_request()
+        try:
+            with self.mapped_array(request, "main") as mapped:
+                gray = mapped.array[:self.height, :self.width].copy()  # 행 패딩(stride) 제외
+        finally:
+            request.release()
+        return gray
+
+    def release(self):
+        self.picam2.close()
+
+class SyntheticSource(FrameSource):
+    """카메라 대신 사용할 합성 프레임 공급원 (테스트용)"""
+
+    def __init__(self, frames=None, width=640, height=480, fps=None, loop=True):
+        """
+        초기화
+        :param frames: 순서대로 내보낼 프레임 리스트 (None이면 무작위 그레이스케일 프레임 생성)
+        :param width: 생성 프레임 너비 (frames가 None일 때)
+        :param height: 생성 프레임 높이 (frames가 None일 때)
+        :param fps: 카메라 속도 흉내 (None이면 대기 없이 바로 반환)
+        :param loop: 프레임을 모두 내보낸 뒤 처음부터 반복할지 여부
+        """
+        if frames is None:
+            rng = np.random.default_rng(0)
+            frames = [rng.integers(0, 256, (height, width), dtype=np.uint8) for _ in range(4)]
+
+        self.frames = frames
+        self.interval = 1.0 / fps if fps else 0.0
+        self.loop = loop
+        self.index = 0
+        self.last_read_time = 0.0
+
+    def read(self):
+        if self.index >= len(self.frames):
+            if not self.loop or not self.frames:
+                return None
+            self.index = 0
+
+        if self.interval:
+            wait = self.last_read_time + self.interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self.last_read_time = time.monotonic()
+
+        frame = self.frames[self.index]
+        self.index += 1
+        return frame
+
+def open_source(spec=None, width=640, height=480, pixel_format="RGB888", fps=None, loop=False):
+    """
+    경로(또는 None)에 맞는 프레임 공급원 생성
+    :param spec: None 또는 'camera' = PiCamera2 (시뮬레이션 백엔드면 합성 프레임), .npy 파일, 이미지 폴더, 그 외는 영상 파일
+    :param width: 카메라 해상도 (카메라일 때)
+    :param height: 카메라 해상도
+    :param pixel_format: 'RGB888' 또는 'YUV420' (녹화 파일이면 YUV420일 때 그레이스케일로 변환)
+    :param fps: 녹화 재생 속도 (None이면 가능한 한 빠르게)
+    :param loop: 녹화를 끝까지 읽은 뒤 반복할지 여부
+    :return: FrameSource
+    """
+    if spec is None or spec == "camera":
+        if is_simulated():
+            return SyntheticSource(width=width, height=height, fps=30)
+        return PiCameraSource(width, height, pixel_format=pixel_format)
+
+    options = {"fps": fps, "loop": loop, "gray": pixel_format == "YUV420"}
+    if spec.endswith(".npy"):
+        return NpySource(spec, **options)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, **options)
+    return VideoFileSource(spec, **options)
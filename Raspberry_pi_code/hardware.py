@@ -0,0 +1,171 @@
+# hardware.py
+# 하드웨어 백엔드 선택 (실제 라즈베리파이 또는 시뮬레이션)
+#   - 실행 시 --sim 옵션 또는 환경 변수 MCA_HARDWARE=sim 으로 시뮬레이션 선택
+#   - 실제 백엔드 모듈(RPi.GPIO, picamera2, playsound)은 처음 사용할 때 import
+import os
+import subprocess
+import threading
+import time
+from startup import lazy_import
+
+_simulated = os.environ.get("MCA_HARDWARE", "real") == "sim"
+
+def use_simulation(enabled=True):
+    """
+    시뮬레이션 백엔드 사용 여부 설정 (GPIO/카메라/오디오를 처음 사용하기 전에 호출)
+    :param enabled: True = 시뮬레이션, False = 실제 하드웨어
+    """
+    global _simulated
+    _simulated = enabled
+
+def is_simulated():
+    """
+    시뮬레이션 백엔드 사용 여부
+    :return: 시뮬레이션이면 True
+    """
+    return _simulated
+
+class SimulatedPWM:
+    """RPi.GPIO.PWM 대체 (듀티 사이클만 기록)"""
+
+    def __init__(self, pin, frequency):
+        self.pin = pin
+        self.frequency = frequency
+        self.duty_cycle = 0
+
+    def start(self, duty_cycle):
+        self.duty_cycle = duty_cycle
+
+    def ChangeDutyCycle(self, duty_cycle):
+        self.duty_cycle = duty_cycle
+
+    def stop(self):
+        self.duty_cycle = 0
+
+class SimulatedGPIO:
+    """RPi.GPIO 대체 (핀 상태 기록, press()로 버튼 이벤트 발생)"""
+
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    PUD_UP = 22
+    PUD_DOWN = 21
+    FALLING = 32
+    RISING = 31
+    BOTH = 33
+
+    PWM = SimulatedPWM
+
+    def __init__(self):
+        self.pins = {}          # 핀 번호 → 출력 값 (입력 핀은 풀업이면 HIGH)
+        self.callbacks = {}     # 핀 번호 → 이벤트 콜백
+        self.lock = threading.Lock()
+
+    def setmode(self, mode):
+        pass
+
+    def setwarnings(self, enabled):
+        pass
+
+    def setup(self, pin, direction, pull_up_down=None, initial=None):
+        with self.lock:
+            if direction == self.IN:
+                self.pins[pin] = self.HIGH if pull_up_down == self.PUD_UP else self.LOW
+            else:
+                self.pins[pin] = initial if initial is not None else self.LOW
+
+    def output(self, pin, value):
+        with self.lock:
+            self.pins[pin] = value
+
+    def input(self, pin):
+        with self.lock:
+            return self.pins.get(pin, self.LOW)
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        with self.lock:
+            self.callbacks[pin] = callback
+
+    def remove_event_detect(self, pin):
+        with self.lock:
+            self.callbacks.pop(pin, None)
+
+    def press(self, pin):
+        """
+        버튼 누름 흉내 (등록된 콜백을 RPi.GPIO처럼 별도 스레드에서 호출)
+        :param pin: 버튼 GPIO 핀
+        :return: 콜백 스레드 (등록된 콜백이 없으면 None)
+        """
+        with self.lock:
+            callback = self.callbacks.get(pin)
+        if callback is None:
+            return None
+
+        thread = threading.Thread(target=callback, args=(pin,))
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def cleanup(self, *pins):
+        with self.lock:
+            self.pins.clear()
+            self.callbacks.clear()
+
+class _GPIOProxy:
+    """처음 사용할 때 백엔드(RPi.GPIO 또는 SimulatedGPIO)를 결정하는 GPIO 모듈 대리 객체"""
+
+    def __init__(self):
+        self._backend = None
+        self._real = lazy_import("RPi.GPIO")
+
+    def _resolve(self):
+        if self._backend is None:
+            self._backend = SimulatedGPIO() if _simulated else self._real
+        return self._backend
+
+    def __getattr__(self, attr):
+        return getattr(self._resolve(), attr)
+
+GPIO = _GPIOProxy()
+
+class SimulatedProcess:
+    """배경 음악 프로세스(subprocess.Popen) 대체"""
+
+    def __init__(self, path):
+        self.path = path
+        self.running = True
+
+    def poll(self):
+        return None if self.running else 0
+
+    def terminate(self):
+        self.running = False
+
+# 시뮬레이션 오디오 재생 기록 (시각, 종류, 파일 경로)
+played_sounds = []
+
+_playsound = lazy_import("playsound")
+
+def play_sound(path):
+    """
+    효과음 재생 (재생이 끝날 때까지 반환하지 않음)
+    :param path: 오디오 파일 경로
+    """
+    if _simulated:
+        played_sounds.append((time.time(), "effect", path))
+        return
+    _playsound.playsound(path)
+
+def start_music(path):
+    """
+    배경 음악 재생 프로세스 시작
+    :param path: 오디오 파일 경로
+    :return: poll()/terminate()를 지원하는 프로세스 객체
+    """
+    if _simulated:
+        played_sounds.append((time.time(), "music", path))
+        return SimulatedProcess(path)
+    return subprocess.Popen(["mpg123", path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
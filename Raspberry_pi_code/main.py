@@ -5,22 +5,57 @@
 # https://github.com/jener0907/mca_winter_pro/tree/main/Raspberry%20pi_code
 
 # main.py
+import startup  # 시작 시각 기록 (가장 먼저 import)
 import time
 import sys
-from status_manager import StatusManager
+import hardware
+import metrics
 
 if __name__ == "__main__":
     try:
         # 명령줄 인자로 개발 모드 여부 결정 (기본: 운영 모드)
         show_display = "--dev" in sys.argv
         
+        # --sim : GPIO/카메라/오디오를 시뮬레이션 백엔드로 대체 (환경 변수 MCA_HARDWARE=sim 과 동일)
+        if "--sim" in sys.argv:
+            hardware.use_simulation()
+        
+        # --workers=N : 병렬 디코딩 워커 프로세스 수 (기본: 사용 안 함)
+        # --decoder=NAME : QR 디코더 백엔드 (기본: 스캐너 프로파일 값, 없으면 pyzbar)
+        # --source=PATH : 카메라 대신 녹화 영상/이미지 폴더/.npy 파일을 반복 재생
+        # --metrics-port=N : 단계별 처리 시간 /metrics 엔드포인트 포트 (기본: 9100, 0 = 사용 안 함)
+        decode_workers = 0
+        decoder = None
+        frame_source = None
+        metrics_port = 9100
+        for arg in sys.argv[1:]:
+            if arg.startswith("--workers="):
+                decode_workers = int(arg.split("=", 1)[1])
+            elif arg.startswith("--decoder="):
+                decoder = arg.split("=", 1)[1]
+            elif arg.startswith("--source="):
+                frame_source = arg.split("=", 1)[1]
+            elif arg.startswith("--metrics-port="):
+                metrics_port = int(arg.split("=", 1)[1])
+        
         if show_display:
             print("🔧 개발 모드로 실행합니다. (디스플레이 활성화)")
         else:
             print("🚀 운영 모드로 실행합니다. (디스플레이 비활성화)")
         
+        if metrics_port:
+            try:
+                metrics.start_server(metrics_port)
+            except OSError as e:
+                print(f"⚠️ 메트릭 엔드포인트를 시작할 수 없습니다: {e}")  # 측정은 계속, 엔드포인트만 없음
+        
         # StatusManager 인스턴스 생성 및 실행
-        manager = StatusManager(show_display=show_display)
+        with startup.timed("import", "status_manager"):
+            from status_manager import StatusManager
+        manager = StatusManager(show_display=show_display, decode_workers=decode_workers,
+                                decoder=decoder, frame_source=frame_source)
+        
+        startup.report()
         
         # 시스템 준비 완료 메시지
         print("✅ MCA 소주 디스펜서 시스템이 준비되었습니다.")
@@ -0,0 +1,181 @@
+# metrics.py
+# 단계별 처리 시간 측정 (고정 구간 히스토그램) 및 Prometheus 형식 /metrics 엔드포인트
+#   - 측정 한 번은 시계 두 번 + 구간 탐색 + 카운터 증가뿐이므로 운영 중에도 켜 둘 수 있음
+#   - 병렬 디코딩 워커 프로세스 안의 디코딩 시간은 측정되지 않음 (메인 프로세스 단계만)
+import time
+import bisect
+import threading
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 히스토그램 구간 상한 (초, 50us ~ 5초)
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class Histogram:
+    """고정 구간 지연 시간 히스토그램 (구간별 개수만 저장하므로 메모리/시간 고정)"""
+
+    def __init__(self, buckets=BUCKETS):
+        """
+        초기화
+        :param buckets: 구간 상한 튜플 (초, 오름차순, 마지막 구간 뒤에 +Inf 구간 추가)
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds):
+        """
+        측정값 하나 기록
+        :param seconds: 소요 시간 (초)
+        """
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def percentile(self, q):
+        """
+        백분위수 추정 (해당 구간 안에서 선형 보간)
+        :param q: 백분위 (0-1)
+        :return: 추정 시간 (초), 측정값이 없으면 0
+        """
+        with self.lock:
+            counts = list(self.counts)
+            count = self.count
+        if not count:
+            return 0.0
+
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                low = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return low  # +Inf 구간은 마지막 상한으로 보고
+                high = self.buckets[index]
+                return low + (high - low) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def snapshot(self):
+        """
+        현재 값 복사
+        :return: (구간별 개수 리스트, 전체 개수, 합계)
+        """
+        with self.lock:
+            return list(self.counts), self.count, self.sum
+
+_histograms = {}
+_registry_lock = threading.Lock()
+
+def histogram(stage):
+    """
+    단계별 히스토그램 (처음 요청할 때 생성)
+    :param stage: 단계 이름 (예: 'capture', 'decode')
+    :return: Histogram
+    """
+    hist = _histograms.get(stage)
+    if hist is None:
+        with _registry_lock:
+            hist = _histograms.setdefault(stage, Histogram())
+    return hist
+
+def observe(stage, seconds):
+    """
+    단계 소요 시간 기록
+    :param stage: 단계 이름
+    :param seconds: 소요 시간 (초)
+    """
+    histogram(stage).observe(seconds)
+
+def instrument(stage):
+    """
+    함수/메서드 실행 시간을 단계 히스토그램에 기록하는 데코레이터 (예외가 나도 기록)
+    :param stage: 단계 이름
+    """
+    def decorator(fn):
+        hist = histogram(stage)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                hist.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def get_stats():
+    """
+    단계별 측정 통계
+    :return: 단계 이름 → 횟수/평균/p50/p95/p99 (ms) 딕셔너리
+    """
+    stats = {}
+    for stage, hist in sorted(_histograms.items()):
+        _, count, total = hist.snapshot()
+        if not count:
+            continue
+        stats[stage] = {
+            "count": count,
+            "mean_ms": round(total / count * 1000, 2),
+            "p50_ms": round(hist.percentile(0.50) * 1000, 2),
+            "p95_ms": round(hist.percentile(0.95) * 1000, 2),
+            "p99_ms": round(hist.percentile(0.99) * 1000, 2),
+        }
+    return stats
+
+def render():
+    """
+    Prometheus 텍스트 형식으로 변환
+    :return: /metrics 응답 본문
+    """
+    lines = [
+        "# HELP mca_stage_seconds Time spent in each pipeline stage.",
+        "# TYPE mca_stage_seconds histogram",
+    ]
+    for stage, hist in sorted(_histograms.items()):
+        counts, count, total = hist.snapshot()
+        cumulative = 0
+        for bound, bucket_count in zip(hist.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'mca_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'mca_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {count}')
+        lines.append(f'mca_stage_seconds_sum{{stage="{stage}"}} {total:.6f}')
+        lines.append(f'mca_stage_seconds_count{{stage="{stage}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics 요청 처리"""
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # 수집 요청마다 로그 출력하지 않음
+
+def start_server(port=9100, host="127.0.0.1"):
+    """
+    /metrics 엔드포인트 서버를 백그라운드 스레드에서 시작
+    :param port: 포트 번호 (0이면 빈 포트 자동 선택)
+    :param host: 바인드 주소 (기본: 로컬에서만 접근)
+    :return: HTTP 서버 (server_address로 실제 포트 확인, shutdown()으로 종료)
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server")
+    thread.daemon = True
+    thread.start()
+    print(f"📈 메트릭 엔드포인트: http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,138 @@
+# motion_gate.py
+import cv2
+import numpy as np
+
+class MotionGate:
+    """축소 프레임 비교로 움직임이 없는 장면의 디코딩을 건너뛰는 변화 감지기"""
+
+    # 판정 결과
+    DECODE_FULL = "full"        # 전체 프레임 디코딩 필요
+    DECODE_PARTIAL = "partial"  # 바뀐 타일만 디코딩
+    REUSE = "reuse"             # 이전 프레임 디코딩 결과 재사용
+
+    def __init__(self, grid=(4, 4), small_size=(80, 60), threshold=6.0, full_decode_interval=20):
+        """
+        초기화
+        :param grid: 변화 감지 타일 개수 (가로, 세로)
+        :param small_size: 비교용 축소 프레임 크기 (가로, 세로)
+        :param threshold: 타일이 바뀌었다고 판단하는 평균 밝기 차이 (0-255)
+        :param full_decode_interval: 변화와 관계없이 전체 디코딩을 강제하는 프레임 간격
+        """
+        self.grid = grid
+        self.small_size = small_size
+        self.threshold = threshold
+        self.full_decode_interval = full_decode_interval
+
+        self.reference = None      # 마지막으로 디코딩한 시점의 축소 프레임
+        self.small = None          # 현재 축소 프레임 버퍼
+        self.diff = None           # 차이 버퍼
+        self.detections = []       # 마지막 디코딩 결과
+        self.frames_since_full = 0
+
+        # 통계 카운터
+        self.hits = 0              # 결과 재사용 (디코딩 생략)
+        self.partial = 0           # 바뀐 타일만 디코딩
+        self.misses = 0            # 전체 디코딩
+
+    def _shrink(self, frame):
+        """비교용 그레이스케일 축소 프레임 생성 (버퍼 재사용)"""
+        if frame.ndim == 3:
+            small_color = cv2.resize(frame, self.small_size, interpolation=cv2.INTER_AREA)
+            small = cv2.cvtColor(small_color, cv2.COLOR_BGR2GRAY, dst=self.small)
+        else:
+            small = cv2.resize(frame, self.small_size, dst=self.small, interpolation=cv2.INTER_AREA)
+        self.small = small
+        return small
+
+    def check(self, frame):
+        """
+        현재 프레임이 디코딩이 필요한지 판정
+        :param frame: 원본 프레임 (컬러 또는 그레이스케일)
+        :return: (판정 결과, 바뀐 영역 리스트 [(x0, y0, x1, y1), ...] - 원본 프레임 좌표)
+        """
+        small = self._shrink(frame)
+        self.frames_since_full += 1
+
+        if self.reference is None or self.frames_since_full >= self.full_decode_interval:
+            return self.DECODE_FULL, []
+
+        # 타일별 평균 차이 계산 (INTER_AREA 축소 = 타일 평균)
+        self.diff = cv2.absdiff(small, self.reference, dst=self.diff)
+        tile_means = cv2.resize(self.diff, self.grid, interpolation=cv2.INTER_AREA)
+        changed = np.argwhere(tile_means > self.threshold)
+
+        if len(changed) == 0:
+            return self.REUSE, []
+        if len(changed) * 2 > self.grid[0] * self.grid[1]:
+            return self.DECODE_FULL, []  # 절반 이상 바뀌면 전체 디코딩이 더 빠름
+
+        height, width = frame.shape[:2]
+        tile_w = width / self.grid[0]
+        tile_h = height / self.grid[1]
+        regions = []
+        for row, col in changed:
+            # QR 코드가 타일 경계에 걸칠 수 있으므로 타일 절반만큼 여백 추가
+            regions.append((max(0, int((col - 0.5) * tile_w)), max(0, int((row - 0.5) * tile_h)),
+                            min(width, int((col + 1.5) * tile_w)), min(height, int((row + 1.5) * tile_h))))
+        return self.DECODE_PARTIAL, regions
+
+    def store_full(self, detections):
+        """
+        전체 디코딩 결과 저장 (기준 프레임 갱신)
+        :param detections: 디코딩 결과 리스트
+        """
+        self.reference = self.small.copy()
+        self.detections = list(detections)
+        self.frames_since_full = 0
+        self.misses += 1
+
+    def store_partial(self, regions, detections, frame_shape):
+        """
+        부분 디코딩 결과 병합 (다시 디코딩한 영역의 이전 결과는 교체)
+        :param regions: 다시 디코딩한 영역 리스트 (원본 프레임 좌표)
+        :param detections: 다시 디코딩한 영역에서 찾은 결과 (원본 프레임 좌표)
+        :param frame_shape: 원본 프레임 크기
+        """
+        def inside(obj, region):
+            cx, cy = obj.center
+            return region[0] <= cx < region[2] and region[1] <= cy < region[3]
+
+        kept = [obj for obj in self.detections if not any(inside(obj, region) for region in regions)]
+        found = {obj.text for obj in detections}
+        self.detections = [obj for obj in kept if obj.text not in found] + list(detections)
+
+        # 다시 디코딩한 영역만 기준 프레임 갱신
+        scale_x = self.small_size[0] / frame_shape[1]
+        scale_y = self.small_size[1] / frame_shape[0]
+        for x0, y0, x1, y1 in regions:
+            sx0, sy0 = int(x0 * scale_x), int(y0 * scale_y)
+            sx1, sy1 = int(np.ceil(x1 * scale_x)), int(np.ceil(y1 * scale_y))
+            self.reference[sy0:sy1, sx0:sx1] = self.small[sy0:sy1, sx0:sx1]
+        self.partial += 1
+
+    def reuse(self):
+        """
+        이전 디코딩 결과 재사용
+        :return: 이전 디코딩 결과 리스트
+        """
+        self.hits += 1
+        return self.detections
+
+    def reset(self):
+        """기준 프레임과 저장된 결과 초기화 (다음 프레임은 전체 디코딩)"""
+        self.reference = None
+        self.detections = []
+        self.frames_since_full = 0
+
+    def get_stats(self):
+        """
+        변화 감지 통계 반환
+        :return: 재사용/부분/전체 디코딩 횟수와 재사용 비율 딕셔너리
+        """
+        total = self.hits + self.partial + self.misses
+        return {
+            "hits": self.hits,
+            "partial": self.partial,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -1,6 +1,7 @@
 # motor_controller.py 구조
-import RPi.GPIO as GPIO
 import time
+from hardware import GPIO
+from metrics import instrument
 
 class MotorController:
     """L9110 모터 드라이버를 사용한 DC 모터 제어 클래스"""
@@ -49,6 +50,7 @@ class MotorController:
         else:
             self.stop()
     
+    @instrument("motor")
     def adjust_for_qr_position(self, qr_x, frame_width):
         """
         QR 코드 위치에 따라 모터 방향 및 속도 조정
@@ -0,0 +1,85 @@
+# pacer.py
+import time
+
+class RatePacer:
+    """목표 프레임 속도에 맞춰 루프 주기를 맞추는 스케줄러 (처리 시간을 뺀 남은 시간만 대기)"""
+
+    def __init__(self, target_fps, min_fps=None, miss_limit=5, recover_after=30,
+                 clock=time.perf_counter, sleep=time.sleep):
+        """
+        초기화
+        :param target_fps: 목표 루프 속도 (초당 반복 수)
+        :param min_fps: 마감 시간을 계속 놓칠 때 낮출 수 있는 최저 속도 (None = 목표의 절반)
+        :param miss_limit: 속도를 낮추기 전까지 허용하는 연속 마감 초과 횟수
+        :param recover_after: 속도를 다시 올리기 전까지 필요한 연속 마감 준수 횟수
+        :param clock: 현재 시각 함수 (초, 테스트/시뮬레이션에서 가상 시계 주입)
+        :param sleep: 대기 함수 (초, 예: 중단 신호의 Event.wait)
+        """
+        self.target_fps = target_fps
+        self.min_fps = min_fps if min_fps is not None else target_fps / 2
+        self.miss_limit = miss_limit
+        self.recover_after = recover_after
+        self.clock = clock
+        self.sleep = sleep
+
+        self.current_fps = target_fps  # 마감 초과가 계속되면 낮아지는 현재 목표 속도
+        self.deadline = None           # 이번 주기가 끝나야 하는 시각
+        self.consecutive_misses = 0
+        self.consecutive_hits = 0
+
+        # 통계 카운터
+        self.started_at = None
+        self.ticks = 0
+        self.misses = 0
+
+    def start(self):
+        """주기 측정 시작 (루프 진입 직전에 호출)"""
+        self.started_at = self.clock()
+        self.deadline = self.started_at + 1.0 / self.current_fps
+
+    def wait(self):
+        """
+        이번 주기의 남은 시간만큼 대기 (루프 끝에서 호출)
+        :return: 마감 시간을 지켰으면 True, 처리 시간이 주기를 넘었으면 False
+        """
+        if self.deadline is None:
+            self.start()
+
+        now = self.clock()
+        self.ticks += 1
+        remaining = self.deadline - now
+
+        if remaining > 0:
+            self.sleep(remaining)
+            self.consecutive_misses = 0
+            self.consecutive_hits += 1
+            if self.consecutive_hits >= self.recover_after and self.current_fps < self.target_fps:
+                self.current_fps = min(self.target_fps, self.current_fps * 1.25)
+                self.consecutive_hits = 0
+            self.deadline += 1.0 / self.current_fps
+            return True
+
+        # 마감 초과: 밀린 주기를 따라잡으려 하지 않고 지금부터 다시 주기 시작
+        self.misses += 1
+        self.consecutive_hits = 0
+        self.consecutive_misses += 1
+        if self.consecutive_misses >= self.miss_limit and self.current_fps > self.min_fps:
+            self.current_fps = max(self.min_fps, self.current_fps * 0.8)
+            self.consecutive_misses = 0
+        self.deadline = now + 1.0 / self.current_fps
+        return False
+
+    def get_stats(self):
+        """
+        페이싱 통계
+        :return: 목표/현재/실제 속도, 반복 수, 마감 초과 횟수 딕셔너리
+        """
+        elapsed = self.clock() - self.started_at if self.started_at is not None else 0.0
+        return {
+            "target_fps": self.target_fps,
+            "current_fps": round(self.current_fps, 1),
+            "achieved_fps": round(self.ticks / elapsed, 1) if elapsed > 0 else 0.0,
+            "ticks": self.ticks,
+            "misses": self.misses,
+            "miss_rate": self.misses / self.ticks if self.ticks else 0.0,
+        }
@@ -0,0 +1,204 @@
+# preprocessor.py
+import cv2
+import numpy as np
+
+class Preprocessor:
+    """작업 버퍼를 재사용하는 QR 코드 인식용 전처리 파이프라인 (프레임마다 새 numpy 배열을 만들지 않음, OpenCV 내부 임시 버퍼는 제외)"""
+
+    def __init__(self, settings):
+        """
+        초기화
+        :param settings: 전처리 설정 딕셔너리 (QRScanner.preprocess_settings, 변경 시 자동 반영)
+        """
+        self.settings = settings
+        self.lut = None        # 밝기/대비 조정용 256단계 룩업 테이블
+        self.lut_key = None    # LUT를 만들 때 사용한 (대비, 밝기)
+        self.buffers = {}      # 이름 → 1차원 작업 버퍼
+
+    def _update_lut(self):
+        """
+        밝기/대비 설정이 바뀌었을 때만 룩업 테이블 재생성
+        0-255 값에 convertScaleAbs를 직접 적용해서 만듦 (OpenCV의 float32 계산/반올림과 비트 단위로 같음)
+        """
+        key = (self.settings["contrast"], self.settings["brightness"])
+        if key == self.lut_key:
+            return
+
+        values = np.arange(256, dtype=np.uint8)
+        self.lut = cv2.convertScaleAbs(values, alpha=key[0], beta=key[1] * 50).reshape(256)
+        self.lut_key = key
+
+    def _buffer(self, name, shape):
+        """
+        작업 버퍼를 주어진 크기의 연속 배열로 반환 (용량이 부족할 때만 새로 할당)
+        ROI처럼 크기가 매번 달라도 가장 큰 크기로 한 번만 할당하면 재사용 가능
+        :param name: 버퍼 이름
+        :param shape: 필요한 배열 크기 (높이, 너비) 또는 (높이, 너비, 채널)
+        :return: 버퍼 메모리를 공유하는 uint8 배열
+        """
+        size = int(np.prod(shape))
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.size < size:
+            buffer = np.empty(size, dtype=np.uint8)
+            self.buffers[name] = buffer
+        return buffer[:size].reshape(shape)
+
+    def process(self, frame):
+        """
+        QR 코드 인식을 위한 이미지 전처리 (밝기/대비 LUT, 그레이스케일, 블러링, 적응형 이진화)
+        반환되는 배열은 내부 버퍼이므로 다음 호출 때 덮어써짐 (보관하려면 복사해서 사용)
+        :param frame: 원본 이미지 (컬러 또는 그레이스케일)
+        :return: 전처리된 이미지
+        """
+        settings = self.settings
+        shape = frame.shape[:2]
+        self._update_lut()
+
+        # 🔵 1. 밝기 및 대비 조정 (룩업 테이블, 컬러면 채널마다 적용해서 convertScaleAbs와 같은 결과)
+        adjusted = self._buffer("adjusted", frame.shape)
+        cv2.LUT(frame, self.lut, dst=adjusted)
+
+        # 🔵 2. 그레이스케일 변환 (이미 그레이스케일이면 생략, 컬러는 카메라 RGB888/녹화 모두 B, G, R 순서)
+        if frame.ndim == 3:
+            gray = self._buffer("gray", shape)
+            cv2.cvtColor(adjusted, cv2.COLOR_BGR2GRAY, dst=gray)
+        else:
+            gray = adjusted
+
+        # 🔵 3. 가우시안 블러 적용 (노이즈 제거)
+        blurred = self._buffer("blurred", shape)
+        cv2.GaussianBlur(gray, settings["blur_kernel"], 0, dst=blurred)
+
+        # 🔵 4. 적응형 이진화 적용 (threshold_method 설정으로 방식 선택)
+        thresh = self._buffer("thresh", shape)
+        method = settings.get("threshold_method", "gaussian")
+        if method == "gaussian":
+            cv2.adaptiveThreshold(
+                blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+                settings["adaptive_block_size"], settings["adaptive_C"], dst=thresh
+            )
+        elif method == "box":
+            self._threshold_box(blurred, thresh)
+        elif method == "downsampled":
+            self._threshold_downsampled(blurred, thresh)
+        else:
+            raise ValueError(f"알 수 없는 이진화 방식: {method}")
+
+        return thresh  # QR 코드 검출을 위해 이진화된 이미지 반환
+
+    def _threshold_box(self, blurred, thresh):
+        """
+        박스 평균 적응형 이진화 (cv2.adaptiveThreshold의 ADAPTIVE_THRESH_MEAN_C, 지역 평균에 가우시안 가중치 대신 단순 평균 사용)
+        :param blurred: 블러링된 그레이스케일 이미지
+        :param thresh: 결과를 기록할 버퍼
+        """
+        cv2.adaptiveThreshold(
+            blurred, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY,
+            self.settings["adaptive_block_size"], self.settings["adaptive_C"], dst=thresh
+        )
+
+    def _threshold_downsampled(self, blurred, thresh):
+        """
+        1/4 해상도에서 가우시안 임계값 지도를 계산한 뒤 원래 크기로 확대해서 비교
+        :param blurred: 블러링된 그레이스케일 이미지
+        :param thresh: 결과를 기록할 버퍼
+        """
+        height, width = blurred.shape
+        small_shape = (max(1, height // 4), max(1, width // 4))
+        kernel = max(3, (self.settings["adaptive_block_size"] // 4) | 1)  # 홀수 유지
+
+        small = self._buffer("small", small_shape)
+        small_mean = self._buffer("small_mean", small_shape)
+        mean = self._buffer("mean", blurred.shape)
+
+        cv2.resize(blurred, (small_shape[1], small_shape[0]), dst=small, interpolation=cv2.INTER_AREA)
+        cv2.GaussianBlur(small, (kernel, kernel), 0, dst=small_mean)
+        cv2.resize(small_mean, (width, height), dst=mean, interpolation=cv2.INTER_LINEAR)
+
+        # 픽셀 값 > (지역 평균 - C) 이면 흰색 (adaptiveThreshold와 같은 규칙)
+        cv2.subtract(mean, self.settings["adaptive_C"], dst=mean)
+        cv2.compare(blurred, mean, cv2.CMP_GT, dst=thresh)
+
+def preprocess_frame(frame, settings):
+    """
+    QR 코드 인식을 위한 이미지 전처리 (한 번만 사용하는 경우, 결과를 새 배열로 반환)
+    :param frame: 원본 이미지
+    :param settings: 전처리 설정 딕셔너리 (QRScanner.preprocess_settings 형식)
+    :return: 전처리된 이미지
+    """
+    return Preprocessor(settings).process(frame)
+
+def _reference_process(frame, settings):
+    """
+    LUT 도입 전의 원래 전처리 (컬러 프레임에 convertScaleAbs 적용 후 그레이스케일 변환) - 결과 비교용
+    :param frame: 원본 컬러 이미지 (B, G, R 순서)
+    :param settings: 전처리 설정 딕셔너리
+    :return: (밝기/대비 조정된 그레이스케일 이미지, 이진화된 이미지)
+    """
+    adjusted = cv2.convertScaleAbs(frame, alpha=settings["contrast"], beta=settings["brightness"] * 50)
+    gray = cv2.cvtColor(adjusted, cv2.COLOR_BGR2GRAY)
+    blurred = cv2.GaussianBlur(gray, settings["blur_kernel"], 0)
+    thresh = cv2.adaptiveThreshold(
+        blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+        settings["adaptive_block_size"], settings["adaptive_C"]
+    )
+    return gray, thresh
+
+# ✅ **단독 실행 테스트 모드**
+#   1. 반복 호출 중 새 numpy 배열이 할당되지 않는지 확인 (tracemalloc은 numpy 할당만 추적하고
+#      GaussianBlur/adaptiveThreshold가 내부에서 만드는 OpenCV 임시 버퍼는 보지 못함)
+#   2. 컬러 프레임에 LUT를 적용한 결과가 원래 순서(convertScaleAbs → cvtColor)와 픽셀 단위로 같은지 확인
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+    from synthetic_dataset import SyntheticQRGenerator
+
+    settings = {
+        "brightness": 0.6,
+        "contrast": 1.0,
+        "blur_kernel": (3, 3),
+        "adaptive_block_size": 101,
+        "adaptive_C": 6
+    }
+    preprocessor = Preprocessor(settings)
+    frame = np.random.randint(0, 256, (480, 640, 3), dtype=np.uint8)
+    frame_bytes = frame.shape[0] * frame.shape[1]
+
+    preprocessor.process(frame)  # 첫 호출: 버퍼 할당
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    for _ in range(50):
+        preprocessor.process(frame)
+        preprocessor.process(frame[100:300, 200:400])  # ROI 크기 프레임도 같은 버퍼 사용
+    elapsed = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"⏱️ 프레임당 전처리 시간: {elapsed / 100 * 1000:.2f} ms")
+    print(f"📦 측정 중 최대 추가 numpy 메모리: {peak} bytes (프레임 크기 {frame_bytes} bytes, OpenCV 내부 버퍼 제외)")
+    assert peak < frame_bytes // 4, "🚨 프레임마다 큰 numpy 배열이 새로 할당되고 있습니다."
+
+    # LUT는 설정이 바뀔 때만 재생성
+    lut = preprocessor.lut
+    preprocessor.process(frame)
+    assert preprocessor.lut is lut
+    settings["brightness"] = 0.8
+    preprocessor.process(frame)
+    assert preprocessor.lut is not lut
+
+    # 원래 파이프라인과 결과가 같은지 확인 (무작위 노이즈 = 채널 포화가 많은 경우, 합성 QR 프레임 = 실제와 비슷한 경우)
+    generator = SyntheticQRGenerator(seed=0)
+    samples = [np.random.randint(0, 256, (480, 640, 3), dtype=np.uint8) for _ in range(3)]
+    samples += [generator.generate()[0] for _ in range(10)]
+
+    for brightness, contrast in [(0.6, 1.0), (0.55, 1.3), (1.5, 1.2), (0.0, 1.8), (-0.4, 0.7)]:
+        settings["brightness"], settings["contrast"] = brightness, contrast
+        for sample in samples:
+            expected_gray, expected_thresh = _reference_process(sample, settings)
+            thresh = preprocessor.process(sample)
+            gray = preprocessor._buffer("gray", sample.shape[:2])
+            assert np.array_equal(gray, expected_gray), f"🚨 밝기 {brightness}, 대비 {contrast}: 조정 후 그레이가 원래 파이프라인과 다릅니다."
+            assert np.array_equal(thresh, expected_thresh), f"🚨 밝기 {brightness}, 대비 {contrast}: 이진화 결과가 원래 파이프라인과 다릅니다."
+
+    print("✅ 전처리 버퍼 재사용 및 원래 파이프라인과 같은 결과 확인 완료")
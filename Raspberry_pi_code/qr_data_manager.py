@@ -1,29 +1,113 @@
 import random
+import time
+from metrics import instrument
+
+class Sighting:
+    """QR 코드 하나의 감지 기록"""
+
+    __slots__ = ("data", "count", "first_seen", "last_seen", "last_polygon")
+
+    def __init__(self, data, timestamp, polygon=None):
+        self.data = data
+        self.count = 1
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.last_polygon = polygon
+
+    def __repr__(self):
+        return f"Sighting(data={self.data!r}, count={self.count}, first_seen={self.first_seen:.2f}, last_seen={self.last_seen:.2f})"
 
 class QRDataManager:
-    """QR 코드 데이터를 관리하는 클래스"""
+    """QR 코드 데이터를 관리하는 클래스 (데이터별 감지 횟수/시각/위치 기록)"""
+
+    # 선택 방식
+    SELECT_UNIFORM = "uniform"      # 모든 코드 균등 확률
+    SELECT_WEIGHTED = "weighted"    # 감지 횟수에 비례한 확률
 
     def __init__(self):
-        """QR 데이터 리스트 초기화"""
-        self.qr_data_list = []
+        """QR 데이터 저장소 초기화"""
+        self.sightings = {}     # 데이터 -> Sighting (삽입 순서 유지)
+        self.keys = []          # 랜덤 선택용 데이터 리스트 (sightings와 같은 순서)
 
-    def add_data(self, data):
+    @property
+    def qr_data_list(self):
         """
-        QR 데이터를 리스트에 추가 (중복 제외)
+        감지된 QR 데이터 리스트 (감지 순서)
+        :return: 데이터 리스트
+        """
+        return list(self.keys)
+
+    @instrument("add_data")
+    def add_data(self, data, polygon=None, timestamp=None, fresh=True):
+        """
+        QR 데이터 추가 (이미 있으면 감지 기록만 갱신)
         :param data: QR 코드에서 읽은 데이터
+        :param polygon: 감지된 위치 꼭짓점 배열 (선택)
+        :param timestamp: 감지 시각 (None이면 현재 시각)
+        :param fresh: 이번 프레임에서 실제로 디코딩한 결과인지 여부
+                      (False면 마지막 감지 시각/위치만 갱신하고 감지 횟수는 늘리지 않음 - 움직임 감지로 재사용한 결과)
         """
-        if data not in self.qr_data_list:
-            self.qr_data_list.append(data)
+        if timestamp is None:
+            timestamp = time.time()
+
+        sighting = self.sightings.get(data)
+        if sighting is None:
+            self.sightings[data] = Sighting(data, timestamp, polygon)
+            self.keys.append(data)
+            return
+
+        if fresh:
+            sighting.count += 1
+        sighting.last_seen = timestamp
+        if polygon is not None:
+            sighting.last_polygon = polygon
+
+    def get_sighting(self, data):
+        """
+        데이터의 감지 기록 조회
+        :param data: QR 데이터
+        :return: Sighting, 없으면 None
+        """
+        return self.sightings.get(data)
+
+    def get_random_data(self, mode=SELECT_UNIFORM, min_sightings=1, max_age=None, now=None):
+        """
+        QR 데이터 중에서 랜덤으로 데이터 하나를 선택
+        조건 없이 균등 선택하면 O(1), 감지 횟수/최근성 조건이나 가중 선택을 쓰면 전체를 한 번 훑음
+        :param mode: 선택 방식 (SELECT_UNIFORM, SELECT_WEIGHTED)
+        :param min_sightings: 후보가 되기 위한 최소 감지 횟수 (한 번만 스친 코드 제외 등, 실제 디코딩한 횟수만 셈)
+        :param max_age: 마지막 감지 후 이 시간(초)이 지난 코드는 제외 (None이면 제한 없음)
+        :param now: 최근성 판단 기준 시각 (None이면 현재 시각)
+        :return: 선택된 데이터, 후보가 없으면 None 반환
+        """
+        if not self.keys:
+            return None
+
+        if mode == self.SELECT_UNIFORM and min_sightings <= 1 and max_age is None:
+            return self.keys[random.randrange(len(self.keys))]
+
+        if now is None:
+            now = time.time()
+        candidates = [s for s in self.sightings.values()
+                      if s.count >= min_sightings and (max_age is None or now - s.last_seen <= max_age)]
+        if not candidates:
+            return None
+
+        if mode == self.SELECT_WEIGHTED:
+            return random.choices(candidates, weights=[s.count for s in candidates])[0].data
+        return random.choice(candidates).data
 
-    def get_random_data(self):
+    def get_stats(self):
         """
-        QR 데이터 리스트에서 랜덤으로 데이터 하나를 선택
-        :return: 선택된 데이터, 데이터가 없으면 None 반환
+        감지 통계 반환
+        :return: 코드 수와 전체 감지 횟수 딕셔너리
         """
-        if self.qr_data_list:
-            return random.choice(self.qr_data_list)
-        return None
+        return {
+            "codes": len(self.keys),
+            "sightings": sum(s.count for s in self.sightings.values()),
+        }
 
     def clear_data(self):
-        """QR 데이터 리스트 초기화"""
-        self.qr_data_list = []
+        """QR 데이터 저장소 초기화"""
+        self.sightings = {}
+        self.keys = []
@@ -0,0 +1,189 @@
+# qr_decoders.py
+import os
+from abc import ABC, abstractmethod
+import cv2
+from startup import lazy_import
+from detection import Detection
+
+pyzbar = lazy_import("pyzbar.pyzbar")  # 첫 디코딩 때 import (libzbar 로딩 시간을 시작 시간에서 제외)
+
+class QRDecoder(ABC):
+    """QR 디코더 백엔드 공통 인터페이스 (모든 백엔드는 같은 형태의 Detection 리스트를 반환, decode가 없으면 생성 시 오류)"""
+
+    name = None
+
+    @classmethod
+    def is_available(cls):
+        """
+        현재 환경에서 사용 가능한지 확인
+        :return: 사용 가능 여부
+        """
+        return True
+
+    @abstractmethod
+    def decode(self, image):
+        """
+        QR 코드 디코딩
+        :param image: 입력 이미지 (전처리된 이미지)
+        :return: Detection 리스트 (문자열, 꼭짓점, 중심, 면적)
+        """
+
+class PyzbarDecoder(QRDecoder):
+    """pyzbar(zbar) 디코더 (QR 코드만 탐색)"""
+
+    name = "pyzbar"
+
+    def decode(self, image):
+        return [Detection.from_pyzbar(obj) for obj in pyzbar.decode(image, symbols=[pyzbar.ZBarSymbol.QRCODE])]
+
+class OpenCVDecoder(QRDecoder):
+    """OpenCV QRCodeDetector 디코더 (한 프레임의 여러 코드 동시 인식)"""
+
+    name = "opencv"
+
+    def __init__(self):
+        self.detector = cv2.QRCodeDetector()
+
+    def decode(self, image):
+        ok, texts, points, _ = self.detector.detectAndDecodeMulti(image)
+        if not ok or points is None:
+            return []
+        return [Detection(text, corners) for text, corners in zip(texts, points) if text]
+
+class WeChatDecoder(QRDecoder):
+    """WeChat CNN 기반 디코더 (opencv-contrib 설치 시에만 사용 가능)"""
+
+    name = "wechat"
+
+    # CNN 모델 파일 폴더 (없으면 모델 없이 기본 검출기 사용)
+    MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wechat_models")
+
+    @classmethod
+    def is_available(cls):
+        return hasattr(cv2, "wechat_qrcode_WeChatQRCode")
+
+    def __init__(self, model_dir=None):
+        model_dir = model_dir or self.MODEL_DIR
+        model_files = [os.path.join(model_dir, name) for name in
+                       ("detect.prototxt", "detect.caffemodel", "sr.prototxt", "sr.caffemodel")]
+
+        if all(os.path.exists(path) for path in model_files):
+            self.detector = cv2.wechat_qrcode_WeChatQRCode(*model_files)
+        else:
+            self.detector = cv2.wechat_qrcode_WeChatQRCode()
+
+    def decode(self, image):
+        texts, points = self.detector.detectAndDecode(image)
+        return [Detection(text, corners) for text, corners in zip(texts, points) if text]
+
+# 사용 가능한 디코더 백엔드 목록
+DECODERS = {
+    PyzbarDecoder.name: PyzbarDecoder,
+    OpenCVDecoder.name: OpenCVDecoder,
+    WeChatDecoder.name: WeChatDecoder,
+}
+
+def available_decoders():
+    """
+    현재 환경에서 사용 가능한 디코더 이름 목록
+    :return: 디코더 이름 리스트
+    """
+    return [name for name, decoder_class in DECODERS.items() if decoder_class.is_available()]
+
+def create_decoder(name="pyzbar"):
+    """
+    이름으로 디코더 백엔드 생성
+    :param name: 디코더 이름 ('pyzbar', 'opencv', 'wechat')
+    :return: QRDecoder 인스턴스
+    """
+    if name not in DECODERS:
+        raise ValueError(f"알 수 없는 디코더: {name} (사용 가능: {', '.join(DECODERS)})")
+    if not DECODERS[name].is_available():
+        raise RuntimeError(f"'{name}' 디코더를 현재 환경에서 사용할 수 없습니다.")
+    return DECODERS[name]()
+
+def find_finder_candidates(binary):
+    """
+    이진화 이미지에서 QR 코드 파인더 패턴(3중 사각형) 후보 찾기
+    :param binary: 이진화 이미지 (QR 모듈이 검은색)
+    :return: 후보 경계 사각형 리스트 [(x, y, w, h), ...]
+    """
+    # 검은 모듈을 흰색으로 뒤집어야 파인더 패턴이 '사각형 안의 사각형 안의 사각형' 윤곽선이 됨
+    contours, hierarchy = cv2.findContours(255 - binary, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+    if hierarchy is None:
+        return []
+
+    hierarchy = hierarchy[0]
+    candidates = []
+    for i, contour in enumerate(contours):
+        child = hierarchy[i][2]
+        if child < 0 or hierarchy[child][2] < 0:
+            continue  # 2단계 이상 중첩된 윤곽선만 파인더 패턴 후보
+
+        x, y, w, h = cv2.boundingRect(contour)
+        if w < 5 or h < 5 or not 0.5 < w / h < 2.0:
+            continue  # 너무 작거나 정사각형과 거리가 먼 경우 제외
+        candidates.append((x, y, w, h))
+    return candidates
+
+def merge_boxes(boxes):
+    """
+    겹치는 사각형 영역을 하나로 병합
+    :param boxes: 사각형 리스트 [(x0, y0, x1, y1), ...]
+    :return: 서로 겹치지 않는 사각형 리스트
+    """
+    merged = []
+    for box in boxes:
+        x0, y0, x1, y1 = box
+        changed = True
+        while changed:
+            changed = False
+            for other in merged:
+                if x0 < other[2] and other[0] < x1 and y0 < other[3] and other[1] < y1:
+                    merged.remove(other)
+                    x0, y0 = min(x0, other[0]), min(y0, other[1])
+                    x1, y1 = max(x1, other[2]), max(y1, other[3])
+                    changed = True
+                    break
+        merged.append((x0, y0, x1, y1))
+    return merged
+
+def decode_pyramid(image, decode, scale=2):
+    """
+    축소 이미지에서 먼저 디코딩하고, 파인더 패턴 후보가 있는데 디코딩되지 않은 영역만 원본 해상도로 다시 디코딩
+    축소 이미지에서 아무것도 찾지 못하면 원본 전체를 디코딩
+    :param image: 전처리된 이미지 (원본 해상도)
+    :param decode: 디코딩 함수 (예: QRDecoder.decode)
+    :param scale: 축소 배율 (2 = 1/2, 4 = 1/4)
+    :return: 원본 해상도 좌표의 디코딩 결과 리스트
+    """
+    height, width = image.shape[:2]
+    small = cv2.resize(image, (width // scale, height // scale), interpolation=cv2.INTER_AREA)
+
+    coarse = decode(small)
+    candidates = find_finder_candidates(small)
+
+    if not coarse and not candidates:
+        return decode(image)  # 🔵 후보가 없으면 원본 전체 재탐색
+
+    decoded_objects = [obj.scaled(scale) for obj in coarse]
+
+    # 🔵 디코딩된 코드 밖에 있는 파인더 후보 주변만 원본 해상도로 재탐색
+    boxes = []
+    for x, y, w, h in candidates:
+        cx, cy = x + w / 2, y + h / 2
+        if any(obj.contains(cx, cy) for obj in coarse):
+            continue
+
+        pad = max(w, h) * 4  # 파인더 패턴은 QR 코드 한 변의 1/3 이하
+        boxes.append((max(0, int((x - pad) * scale)), max(0, int((y - pad) * scale)),
+                      min(width, int((x + w + pad) * scale)), min(height, int((y + h + pad) * scale))))
+
+    found = {obj.text for obj in decoded_objects}
+    for x0, y0, x1, y1 in merge_boxes(boxes):
+        for obj in decode(image[y0:y1, x0:x1]):
+            if obj.text not in found:
+                found.add(obj.text)
+                decoded_objects.append(obj.translated(x0, y0))
+
+    return decoded_objects
@@ -1,23 +1,48 @@
-from picamera2 import Picamera2
+import time
 import cv2
 import numpy as np
-import pyzbar.pyzbar as pyzbar
+from collections import deque
+from frame_grabber import FrameGrabber
+from frame_source import open_source
+from display_worker import DisplayWorker
+from decode_farm import DecodeFarm
+from preprocessor import Preprocessor
+from qr_decoders import decode_pyramid, merge_boxes, create_decoder
+from scanner_profile import load_profile
+from motion_gate import MotionGate
+from target_tracker import TargetTracker
+from metrics import instrument
 
 class QRScanner:
-    """PiCamera2를 이용한 QR 코드 스캐너"""
+    """PiCamera2(또는 다른 프레임 공급원)를 이용한 QR 코드 스캐너"""
 
-    def __init__(self, width=640, height=480, show_display=True):
+    def __init__(self, width=640, height=480, show_display=True, threaded_capture=False, decode_workers=0,
+                 pyramid_scale=0, motion_gating=False, decoder=None, source=None, pixel_format="RGB888",
+                 drop_frames=True):
         """
         카메라 및 전처리 설정 초기화
         :param width: 카메라 해상도 (기본값 640x480)
         :param height: 카메라 해상도
         :param show_display: 디스플레이 출력 여부 (True = 출력, False = 미출력)
+        :param threaded_capture: 백그라운드 캡처 스레드 사용 여부 (True = 항상 최신 프레임 사용)
+        :param decode_workers: 병렬 디코딩 워커 프로세스 수 (0 = 현재 스레드에서 디코딩)
+        :param pyramid_scale: 피라미드 디코딩 축소 배율 (0 = 원본 해상도만 디코딩)
+        :param motion_gating: 움직임이 없는 장면에서 이전 디코딩 결과 재사용 여부
+        :param decoder: QR 디코더 백엔드 이름 (None = 스캐너 프로파일 값, 없으면 'pyzbar')
+        :param source: 프레임 공급원 (None = PiCamera2, FrameSource 객체 또는 녹화 경로 - 영상/이미지 폴더/.npy, 반복 재생)
+        :param pixel_format: 카메라 출력 형식 ('RGB888' 또는 'YUV420' = Y 평면을 그레이스케일로 바로 사용)
+        :param drop_frames: 병렬 디코딩 워커가 모두 바쁘면 프레임을 버림 (False = 빈 슬롯이 날 때까지 대기, 녹화 재생용)
         """
-        self.picam2 = Picamera2()
-        self.picam2.preview_configuration.main.size = (width, height)
-        self.picam2.preview_configuration.main.format = "RGB888"
-        self.picam2.configure("preview")
-        self.picam2.start()
+        if source is None or isinstance(source, str):
+            source = open_source(source, width, height, pixel_format=pixel_format, loop=True)
+        self.source = source
+        self.read_source = instrument("capture")(self.source.read)  # 카메라 읽기 시간은 실제로 읽는 스레드에서 측정
+
+        # ✅ 백그라운드 캡처 모드 (카메라 읽기 지연이 디코딩 루프를 막지 않도록)
+        self.frame_grabber = None
+        if threaded_capture:
+            self.frame_grabber = FrameGrabber(self.read_source)
+            self.frame_grabber.start()
 
         self.show_display = show_display  # ✅ 디스플레이 출력 여부 설정
 
@@ -27,93 +52,333 @@ class QRScanner:
             "contrast": 1.0,     # 대비 조정 (1.0 = 기본값, 1.5 = 강한 대비)
             "blur_kernel": (3, 3),  # 가우시안 블러 크기 (홀수 값만 가능)
             "adaptive_block_size": 101,  # ✅ 적응형 이진화 블록 크기 (홀수)
-            "adaptive_C": 6  # ✅ 적응형 이진화 상수 (값이 클수록 더 밝게)
+            "adaptive_C": 6,  # ✅ 적응형 이진화 상수 (값이 클수록 더 밝게)
+            "threshold_method": "gaussian"  # ✅ 이진화 방식 ('gaussian', 'box' = 박스 평균, 'downsampled' = 1/4 해상도 임계값)
         }
+        # ✅ 튜닝 도구(autotune.py)로 찾은 설정이 스캐너 프로파일에 저장되어 있으면 덮어씀
+        profile = load_profile()
+        tuned = profile.get("preprocess_settings", {})
+        self.preprocess_settings.update(tuned)
+        self.preprocess_settings["blur_kernel"] = tuple(self.preprocess_settings["blur_kernel"])  # JSON은 리스트로 저장됨
+        if tuned:
+            print(f"📐 튜닝된 전처리 설정 사용: {tuned}")
+        self.preprocessor = Preprocessor(self.preprocess_settings)  # 작업 버퍼 재사용
+
+        # ✅ QR 디코더 백엔드 (벤치마크로 고른 값이 스캐너 프로파일에 저장되어 있으면 사용)
+        self.decoder_name = decoder or profile.get("decoder", "pyzbar")
+        self.decoder = create_decoder(self.decoder_name)
+
+        # ✅ 피라미드 디코딩 배율 (0 = 사용 안 함, 2 = 1/2 해상도 먼저 탐색, 4 = 1/4 해상도 먼저 탐색)
+        self.pyramid_scale = pyramid_scale
+
+        # ✅ 움직임 감지 기반 디코딩 생략 (정지 장면에서는 이전 결과 재사용)
+        self.motion_gate = MotionGate() if motion_gating else None
+        self.fresh_detections = []  # 마지막 scan()에서 실제로 디코딩한 결과 (재사용한 이전 결과 제외)
+
+        # 디스플레이 스레드 생성 (디스플레이 ON일 경우만, 창은 디스플레이 스레드에서 생성)
+        self.display = DisplayWorker() if self.show_display else None
 
-        if self.show_display:
-            # OpenCV 창 생성 (디스플레이 ON일 경우만)
-            cv2.namedWindow("QR Code Scanner", cv2.WINDOW_NORMAL)
-            # cv2.setWindowProperty("QR Code Scanner", cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+        # ✅ 멀티프로세스 디코딩 엔진 (GIL 때문에 놀고 있는 코어 활용)
+        self.decode_farm = None
+        self.drop_frames = drop_frames
+        if decode_workers > 0:
+            self.decode_farm = DecodeFarm(self.preprocess_settings, workers=decode_workers,
+                                          pyramid_scale=pyramid_scale, decoder=self.decoder_name)
+        self.ready_results = deque()  # 캡처 순서대로 완료된 (프레임 번호, 프레임, 결과)
+
+        # ✅ 추적 모드 ROI 설정 (직전 위치 주변만 잘라서 디코딩)
+        self.roi_padding = 0.6      # QR 코드 크기 대비 ROI 여백 비율
+        self.roi_min_size = 160     # ROI 최소 크기 (픽셀, 적응형 이진화 블록보다 크게)
+        self.roi_max_misses = 5     # 연속 미검출 시 전체 프레임 탐색으로 전환하는 횟수
+        self.roi_target = None      # 추적 중인 QR 데이터
+        self.roi_box = None         # 현재 ROI (x0, y0, x1, y1)
+        self.roi_misses = 0         # ROI 연속 미검출 횟수
+
+        # ✅ 디코딩 사이 프레임의 타겟 위치 추정 (코너 광류 + 등속 예측)
+        self.target_tracker = TargetTracker()
+        self.track_decode_interval = 3   # 추정이 유지되는 동안 몇 프레임마다 실제 디코딩할지
+        self.frames_since_decode = 0
+        self.target_center = None        # 마지막 scan_tracked()의 타겟 중심 (디코딩 또는 추정값)
+        self.track_gray = None           # 컬러 프레임용 그레이스케일 버퍼
+
+    def capture_frame(self):
+        """
+        카메라에서 원본 프레임을 가져옴 (전처리 없음)
+        :return: 원본 프레임, 실패 시 None
+        """
+        if self.frame_grabber:
+            return self._wait_latest()
+        return self.read_source()
+
+    @instrument("capture_wait")
+    def _wait_latest(self):
+        """캡처 스레드의 최신 프레임 (새 프레임이 올 때까지 기다린 시간을 따로 측정)"""
+        return self.frame_grabber.get_latest()
 
     def get_frame(self):
         """
         카메라에서 프레임을 가져와서 전처리 수행 후 반환
         :return: 전처리된 프레임 (이미지)
         """
-        frame = self.picam2.capture_array()
+        frame = self.capture_frame()
+        if frame is None:
+            return None
         return self.preprocess_frame(frame)  # 전처리 적용 후 반환
 
-    def preprocess_frame(self, frame):
+    def scan(self):
         """
-        QR 코드 인식을 위한 이미지 전처리 (밝기, 대비, 블러링, 적응형 이진화 적용)
-        :param frame: 원본 이미지
-        :return: 전처리된 이미지
+        프레임 캡처 → 전처리 → 디코딩을 한 번에 수행
+        병렬 디코딩 모드에서는 프레임을 워커에 넘기고, 캡처 순서대로 완료된 결과를 하나씩 반환
+        이번 프레임에서 실제로 디코딩한 결과는 fresh_detections에 저장 (움직임 감지로 재사용한 결과 제외)
+        :return: (화면 표시용 프레임, 디코딩된 QR 코드 객체 리스트), 결과가 없으면 (None, [])
+        """
+        self.fresh_detections = []
+        if self.decode_farm is None:
+            if self.motion_gate:
+                return self._scan_gated()
+
+            frame = self.get_frame()
+            if frame is None:
+                return None, []
+            self.fresh_detections = self.decode_qr(frame)
+            return frame, self.fresh_detections
+
+        frame = self.capture_frame()
+        if frame is not None:
+            self.decode_farm.submit(frame, tag=frame, block=not self.drop_frames)
+
+        self.ready_results.extend(self.decode_farm.collect(timeout=0.05))
+        if not self.ready_results:
+            return None, []
+
+        _, frame, decoded_objects = self.ready_results.popleft()
+        self.fresh_detections = decoded_objects
+        return frame, decoded_objects
+
+    def _scan_gated(self):
+        """
+        움직임 감지 스캔: 바뀐 타일만 다시 디코딩하고, 변화가 없으면 이전 결과 재사용
+        (주기적으로 전체 디코딩을 강제해서 놓친 코드가 없도록 함)
+        :return: (원본 프레임, 디코딩된 QR 코드 객체 리스트), 실패 시 (None, [])
+        """
+        frame = self.capture_frame()
+        if frame is None:
+            return None, []
+
+        decision, regions = self.motion_gate.check(frame)
+
+        if decision == MotionGate.REUSE:
+            return frame, self.motion_gate.reuse()
+
+        if decision == MotionGate.DECODE_PARTIAL:
+            regions = merge_boxes(regions)
+            decoded_objects = []
+            for x0, y0, x1, y1 in regions:
+                roi = self.preprocess_frame(frame[y0:y1, x0:x1])
+                decoded_objects.extend(obj.translated(x0, y0) for obj in self.decode_qr(roi))
+            self.motion_gate.store_partial(regions, decoded_objects, frame.shape)
+            self.fresh_detections = decoded_objects  # 바뀌지 않은 타일의 이전 결과는 재사용
+            return frame, self.motion_gate.detections
+
+        decoded_objects = self.decode_qr(self.preprocess_frame(frame))
+        self.motion_gate.store_full(decoded_objects)
+        self.fresh_detections = decoded_objects
+        return frame, decoded_objects
+
+    def get_motion_stats(self):
+        """
+        움직임 감지 통계 반환
+        :return: 재사용/부분/전체 디코딩 횟수 딕셔너리 (움직임 감지 미사용 시 None)
+        """
+        if self.motion_gate:
+            return self.motion_gate.get_stats()
+        return None
+
+    def start_roi_tracking(self, target_data):
+        """
+        ROI 추적 모드 시작 (scan_tracked에서 사용)
+        :param target_data: 추적할 QR 코드 데이터 (문자열)
         """
-        settings = self.preprocess_settings
+        self.roi_target = target_data
+        self.roi_box = None
+        self.roi_misses = 0
+        self.target_tracker.reset()
+        self.frames_since_decode = 0
+        self.target_center = None
 
-        # 🔵 1. 밝기 및 대비 조정
-        adjusted = cv2.convertScaleAbs(frame, alpha=settings["contrast"], beta=settings["brightness"] * 50)
+    def stop_roi_tracking(self):
+        """ROI 추적 모드 종료"""
+        self.roi_target = None
+        self.roi_box = None
+        self.roi_misses = 0
+        self.target_tracker.reset()
+        self.target_center = None
 
-        # 🔵 2. 그레이스케일 변환
-        gray = cv2.cvtColor(adjusted, cv2.COLOR_RGB2GRAY)
+    def _gray(self, frame):
+        """타겟 추정용 그레이스케일 프레임 (컬러 프레임이면 재사용 버퍼로 변환)"""
+        if frame.ndim == 2:
+            return frame
+        if self.track_gray is None or self.track_gray.shape != frame.shape[:2]:
+            self.track_gray = np.empty(frame.shape[:2], dtype=np.uint8)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.track_gray)
 
-        # 🔵 3. 가우시안 블러 적용 (노이즈 제거)
-        blurred = cv2.GaussianBlur(gray, settings["blur_kernel"], 0)
+    def scan_tracked(self):
+        """
+        추적 모드 스캔: 직전 타겟 위치 주변(ROI)만 전처리 + 디코딩하고 좌표를 전체 프레임 기준으로 변환
+        ROI에서 roi_max_misses회 연속 검출에 실패하면 전체 프레임 탐색으로 전환
+        (ROI는 작기 때문에 병렬 디코딩 워커를 거치지 않고 현재 스레드에서 디코딩)
+        위치 추정이 유지되는 동안에는 track_decode_interval 프레임마다만 디코딩하고,
+        나머지 프레임은 광류로 타겟 중심을 추정 (결과는 target_center에 저장)
+        :return: (원본 프레임, 디코딩된 QR 코드 객체 리스트), 실패 시 (None, [])
+        """
+        frame = self.capture_frame()
+        if frame is None:
+            return None, []
+
+        now = time.monotonic()
+        gray = self._gray(frame)
+
+        # 🔵 디코딩하지 않는 프레임: 광류로 중심만 추정하고 ROI를 따라 이동
+        if self.target_tracker.is_tracking() and self.frames_since_decode + 1 < self.track_decode_interval:
+            self.frames_since_decode += 1
+            self.target_center = self.target_tracker.update(gray, now)
+            if self.target_center and self.roi_box:
+                self.roi_box = self._roi_shifted(self.roi_box, self.target_center, frame.shape[1], frame.shape[0])
+            return frame, []
+
+        self.frames_since_decode = 0
+        if self.roi_box and self.roi_misses < self.roi_max_misses:
+            x0, y0, x1, y1 = self.roi_box
+            roi = self.preprocess_frame(frame[y0:y1, x0:x1])
+            decoded_objects = [obj.translated(x0, y0) for obj in self.decode_qr(roi)]
+        else:
+            decoded_objects = self.decode_qr(self.preprocess_frame(frame))
+
+        # 타겟 위치로 다음 ROI 갱신 및 위치 추정 보정
+        for obj in decoded_objects:
+            if obj.text == self.roi_target:
+                self.roi_box = self._roi_around(obj.rect, frame.shape[1], frame.shape[0])
+                self.roi_misses = 0
+                self.target_center = self.target_tracker.anchor(obj.polygon, gray, now)
+                break
+        else:
+            self.roi_misses += 1
+            self.target_center = self.target_tracker.update(gray, now)
+
+        return frame, decoded_objects
+
+    def _roi_shifted(self, box, center, frame_width, frame_height):
+        """
+        ROI 크기는 유지하고 추정 중심으로 이동
+        :param box: 현재 ROI (x0, y0, x1, y1)
+        :param center: 추정 중심 (x, y)
+        :param frame_width: 프레임 너비
+        :param frame_height: 프레임 높이
+        :return: 프레임 안으로 제한된 ROI (x0, y0, x1, y1)
+        """
+        width = box[2] - box[0]
+        height = box[3] - box[1]
+        x0 = min(max(0, int(center[0] - width / 2)), max(0, frame_width - width))
+        y0 = min(max(0, int(center[1] - height / 2)), max(0, frame_height - height))
+        return x0, y0, x0 + width, y0 + height
+
+    def get_tracking_stats(self):
+        """
+        타겟 위치 추정 통계 반환
+        :return: 디코딩 보정/광류 추정/등속 예측 횟수 딕셔너리
+        """
+        return self.target_tracker.get_stats()
+
+    def _roi_around(self, rect, frame_width, frame_height):
+        """
+        QR 코드 영역 주변에 여백을 더한 ROI 계산
+        :param rect: QR 코드 경계 사각형 (x, y, 너비, 높이)
+        :param frame_width: 프레임 너비
+        :param frame_height: 프레임 높이
+        :return: 프레임 안으로 제한된 ROI (x0, y0, x1, y1)
+        """
+        left, top, width, height = rect
+        pad_x = max(int(width * self.roi_padding), (self.roi_min_size - width) // 2)
+        pad_y = max(int(height * self.roi_padding), (self.roi_min_size - height) // 2)
 
-        # 🔵 4. 적응형 이진화 적용 (기존 고정값 이진화 → ✅ 적응형으로 개선)
-        thresh = cv2.adaptiveThreshold(
-            blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
-            settings["adaptive_block_size"], settings["adaptive_C"]
-        )
+        x0 = max(0, left - pad_x)
+        y0 = max(0, top - pad_y)
+        x1 = min(frame_width, left + width + pad_x)
+        y1 = min(frame_height, top + height + pad_y)
+        return x0, y0, x1, y1
 
-        return thresh  # QR 코드 검출을 위해 이진화된 이미지 반환
+    def get_capture_stats(self):
+        """
+        백그라운드 캡처 통계 반환
+        :return: 캡처/버림/소비 프레임 수 딕셔너리 (캡처 스레드 미사용 시 None)
+        """
+        if self.frame_grabber:
+            return self.frame_grabber.get_stats()
+        return None
 
+    def get_decode_stats(self):
+        """
+        병렬 디코딩 통계 반환
+        :return: 제출/버림/디코딩/오류 프레임 수 딕셔너리 (병렬 디코딩 미사용 시 None)
+        """
+        if self.decode_farm:
+            return self.decode_farm.get_stats()
+        return None
+
+    @instrument("preprocess")
+    def preprocess_frame(self, frame):
+        """
+        QR 코드 인식을 위한 이미지 전처리 (밝기, 대비, 블러링, 적응형 이진화 적용)
+        반환된 이미지는 다음 프레임 전처리 때 덮어써짐 (작업 버퍼 재사용)
+        :param frame: 원본 이미지
+        :return: 전처리된 이미지
+        """
+        return self.preprocessor.process(frame)
+
+    @instrument("decode")
     def decode_qr(self, frame):
         """
         QR 코드를 디코딩
+        피라미드 모드에서는 축소 이미지를 먼저 탐색하고, 좌표는 항상 입력 프레임 해상도 기준으로 반환
         :param frame: 입력 프레임 (전처리된 이미지)
         :return: 디코딩된 QR 코드 객체 리스트
         """
-        return pyzbar.decode(frame)
+        if self.pyramid_scale > 1:
+            return decode_pyramid(frame, self.decoder.decode, self.pyramid_scale)
+        return self.decoder.decode(frame)
 
     def display_frame(self, frame, decoded_objects):
         """
-        QR 코드를 화면에 출력 (show_display가 True일 때만)
+        QR 코드를 화면에 출력 (show_display가 True일 때만, 호출 스레드를 막지 않음)
         :param frame: 입력 프레임 (이미지)
         :param decoded_objects: 디코딩된 QR 코드 객체 리스트
         """
         if not self.show_display:  
             return  # 🔴 디스플레이 출력 OFF일 경우 생략
 
-        for obj in decoded_objects:
-            points = obj.polygon
-            if len(points) > 4:
-                hull = cv2.convexHull(np.array([point for point in points], dtype=np.float32))
-                hull = list(map(tuple, np.squeeze(hull)))
-            else:
-                hull = points
-
-            # QR 코드 경계선 그리기
-            n = len(hull)
-            for j in range(n):
-                cv2.line(frame, hull[j], hull[(j + 1) % n], (255, 0, 0), 3)
-
-            # QR 코드 데이터 화면 출력
-            qr_data = obj.data.decode('utf-8')
-            top_left = hull[0]
-            cv2.putText(frame, qr_data, (top_left[0], top_left[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 0), 3)
-
-        # ✅ 디스플레이에 프레임 출력 (show_display가 True일 경우만)
-        cv2.imshow("QR Code Scanner", frame)
-        cv2.waitKey(1)
+        # ✅ 그리기와 imshow는 디스플레이 스레드에서 처리 (최신 프레임만 출력, 나머지는 버림)
+        self.display.submit(frame, decoded_objects)
+
+    def poll_key(self):
+        """
+        디스플레이 창에서 입력된 키 하나 꺼내기
+        :return: 키 코드 (입력이 없거나 디스플레이 OFF이면 -1)
+        """
+        if self.display:
+            return self.display.poll_key()
+        return -1
 
     def release(self):
         """
         카메라 및 OpenCV 창 자원 해제
         """
-        self.picam2.close()
-        if self.show_display:
-            cv2.destroyAllWindows()
+        if self.frame_grabber:
+            self.frame_grabber.stop()
+        if self.decode_farm:
+            self.decode_farm.close()
+        self.source.release()
+        if self.display:
+            self.display.stop()
 
 # ✅ **단독 실행 테스트 모드**
 if __name__ == "__main__":
@@ -131,12 +396,11 @@ if __name__ == "__main__":
 
         if decoded_objects:
             for obj in decoded_objects:
-                qr_data = obj.data.decode('utf-8')
-                print(f"✅ 인식된 QR 코드: {qr_data}")
+                print(f"✅ 인식된 QR 코드: {obj.text}")
 
         scanner.display_frame(frame, decoded_objects)  # 🔵 디스플레이 출력 여부 확인
 
-        key = cv2.waitKey(1) & 0xFF
+        key = scanner.poll_key()
         if key == 27:  # ESC 키로 종료
             print("🛑 QR 스캐너 종료")
             break
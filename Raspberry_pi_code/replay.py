@@ -0,0 +1,121 @@
+# replay.py
+# 사용법: python replay.py <녹화 경로> [--gray] [--workers N] [--motion] [--pyramid 2] [--decoder NAME] [--fps 30]
+#   - 녹화 경로: 영상 파일, 이미지 폴더(.png/.jpg) 또는 (N, H, W[, 3]) 형태의 .npy 파일
+#   - 카메라 없이 QRScanner를 그대로 돌려서 초당 프레임 수, 단계별 시간, 디코딩된 QR 데이터를 출력
+import sys
+import time
+import argparse
+from collections import Counter
+from frame_source import open_source
+from qr_scanner import QRScanner
+
+def _pending(scanner):
+    """병렬 디코딩 워커에서 아직 결과가 돌아오지 않은 프레임 수"""
+    stats = scanner.get_decode_stats()
+    return stats["submitted"] - stats["decoded"] - stats["lost"]
+
+def replay_stages(scanner):
+    """
+    캡처 → 전처리 → 디코딩을 단계별로 나눠서 시간 측정 (QRScanner.get_frame/decode_qr과 같은 경로)
+    :param scanner: QRScanner
+    :return: (처리 프레임 수, 단계별 누적 시간 딕셔너리, 데이터별 감지 횟수)
+    """
+    timings = {"capture": 0.0, "preprocess": 0.0, "decode": 0.0}
+    payloads = Counter()
+    frames = 0
+
+    while True:
+        start = time.perf_counter()
+        frame = scanner.capture_frame()
+        captured = time.perf_counter()
+        if frame is None:
+            break
+
+        processed = scanner.preprocess_frame(frame)
+        preprocessed = time.perf_counter()
+        decoded_objects = scanner.decode_qr(processed)
+        decoded = time.perf_counter()
+
+        timings["capture"] += captured - start
+        timings["preprocess"] += preprocessed - captured
+        timings["decode"] += decoded - preprocessed
+        payloads.update(obj.text for obj in decoded_objects)
+        frames += 1
+
+    return frames, timings, payloads
+
+def replay_scan(scanner):
+    """
+    QRScanner.scan()을 게임 루프와 똑같이 호출 (움직임 감지/병렬 디코딩은 단계를 나눌 수 없으므로 전체 시간만 측정)
+    :param scanner: QRScanner
+    :return: (결과를 받은 프레임 수, 단계별 누적 시간 딕셔너리, 데이터별 감지 횟수)
+    """
+    timings = {"scan": 0.0}
+    payloads = Counter()
+    frames = 0
+
+    while True:
+        start = time.perf_counter()
+        frame, decoded_objects = scanner.scan()
+        timings["scan"] += time.perf_counter() - start
+
+        if frame is None:
+            # 녹화가 끝났고 워커에 남은 프레임도 없으면 종료
+            if scanner.decode_farm is None or (_pending(scanner) == 0 and not scanner.ready_results):
+                break
+            continue
+
+        payloads.update(obj.text for obj in decoded_objects)
+        frames += 1
+
+    return frames, timings, payloads
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="녹화된 프레임으로 QR 스캐너 재생")
+    parser.add_argument("source", help="영상 파일, 이미지 폴더 또는 .npy 파일")
+    parser.add_argument("--gray", action="store_true", help="카메라 YUV420 모드처럼 그레이스케일 프레임으로 재생")
+    parser.add_argument("--fps", type=float, help="카메라 속도 흉내 (기본: 가능한 한 빠르게)")
+    parser.add_argument("--workers", type=int, default=0, help="병렬 디코딩 워커 프로세스 수")
+    parser.add_argument("--motion", action="store_true", help="움직임 감지 기반 디코딩 생략 사용 (병렬 디코딩과 함께 쓰면 무시됨)")
+    parser.add_argument("--pyramid", type=int, default=0, help="피라미드 디코딩 축소 배율")
+    parser.add_argument("--decoder", help="QR 디코더 백엔드 (기본: 스캐너 프로파일 값)")
+    args = parser.parse_args(argv)
+
+    source = open_source(args.source, pixel_format="YUV420" if args.gray else "RGB888", fps=args.fps)
+    scanner = QRScanner(show_display=False, decode_workers=args.workers, pyramid_scale=args.pyramid,
+                        motion_gating=args.motion, decoder=args.decoder, source=source,
+                        drop_frames=False)  # 녹화는 기다려도 되므로 모든 프레임을 디코딩 (인식률 비교용)
+
+    print(f"📂 재생: {args.source} (디코더: {scanner.decoder_name})")
+    start = time.perf_counter()
+    try:
+        if args.workers or args.motion:
+            frames, timings, payloads = replay_scan(scanner)
+        else:
+            frames, timings, payloads = replay_stages(scanner)
+    finally:
+        scanner.release()
+    elapsed = time.perf_counter() - start
+
+    if not frames:
+        print("⚠️ 재생할 프레임이 없습니다.")
+        return 1
+
+    print(f"🎞️ {frames}프레임, {elapsed:.2f}초, 초당 {frames / elapsed:.1f}프레임")
+    for stage, total in timings.items():
+        print(f"  {stage:<12} {total / frames * 1000:>8.2f} ms/프레임")
+
+    motion_stats = scanner.get_motion_stats()
+    if motion_stats:
+        print(f"📊 움직임 감지 통계: {motion_stats}")
+    decode_stats = scanner.get_decode_stats()
+    if decode_stats:
+        print(f"📊 디코딩 통계: {decode_stats}")
+
+    print(f"✅ 디코딩된 QR 코드 {len(payloads)}개")
+    for text, count in payloads.most_common():
+        print(f"  {text:<24} {count:>6}프레임")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+# scanner_profile.py
+import os
+import json
+
+# 기본 스캐너 프로파일 경로 (벤치마크/튜닝 결과 저장, QRScanner 시작 시 로드)
+PROFILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scanner_profile.json")
+
+def load_profile(path=PROFILE_PATH):
+    """
+    스캐너 프로파일 불러오기
+    :param path: 프로파일 파일 경로
+    :return: 프로파일 딕셔너리 (파일이 없거나 읽을 수 없으면 빈 딕셔너리)
+    """
+    if not os.path.exists(path):
+        return {}
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ 스캐너 프로파일을 읽을 수 없습니다: {e}")
+        return {}
+
+def save_profile(updates, path=PROFILE_PATH):
+    """
+    스캐너 프로파일에 항목을 추가/갱신해서 저장 (기존 항목은 유지)
+    :param updates: 저장할 항목 딕셔너리 (예: {"decoder": "opencv"})
+    :param path: 프로파일 파일 경로
+    """
+    profile = load_profile(path)
+    profile.update(updates)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2, ensure_ascii=False)
+    print(f"💾 스캐너 프로파일 저장: {path}")
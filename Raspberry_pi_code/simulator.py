@@ -0,0 +1,808 @@
+# simulator.py
+# 사용법: python simulator.py [--rounds 1000] [--seed 0] [--source 녹화 경로] [--abort 0.1] [--outage 0.05] [--stall 0.02] [--verbose]
+#   - StatusManager를 가짜 GPIO/카메라/오디오/ESP32에 연결하고 가상 시계로 게임을 반복 실행
+#   - 라운드 작업은 실제 스레드로 돌지만 가상 시간을 기다릴 때만 실행권을 넘기므로 이벤트 루프와 번갈아 실행되고 시드로 재현 가능
+#   - 대기(sleep)는 가상 시계만 앞으로 돌리므로 30초 남짓한 라운드를 초당 30개 정도 실행
+#     (기본 설정 1000라운드 시도 = 가상 8시간 남짓이 약 25초, 대부분 작업 스레드 실행권 전환 비용)
+#   - 라운드별 단계 시간 분포와 상태 이상(멈춘 상태, 라운드 시간 초과, LED/모터/음악 불일치,
+#     끝난 라운드의 작업 스레드가 모터/QR 기록/배경 음악을 건드리는 경합)을 출력
+#   - --source를 주면 합성 검출 결과 대신 녹화 프레임을 실제 QRScanner로 디코딩 (디코딩 시간만큼 가상 시계 진행)
+import os
+import sys
+import time
+import heapq
+import queue
+import argparse
+import threading
+import contextlib
+from functools import wraps
+from collections import Counter, deque
+import numpy as np
+import hardware
+from hardware import GPIO
+from detection import Detection
+from pacer import RatePacer
+from status_manager import StatusManager
+
+class VirtualTimer:
+    """가상 시계에 예약된 호출 (threading.Timer처럼 cancel() 지원)"""
+
+    __slots__ = ("when", "fn", "args", "cancelled")
+
+    def __init__(self, when, fn, args):
+        self.when = when
+        self.fn = fn
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class VirtualThread:
+    """가상 시계 위에서 도는 작업 스레드 (실제 스레드지만 한 번에 하나만 실행)"""
+
+    __slots__ = ("name", "thread", "done", "baton")
+
+    def __init__(self, name):
+        self.name = name
+        self.thread = None
+        self.done = False
+        self.baton = threading.Lock()  # 실행권 전달용 (잠긴 동안 대기, 드라이버가 풀어 주면 실행)
+        self.baton.acquire()
+
+class VirtualClock:
+    """
+    가상 시계 및 협력형 스레드 스케줄러 (시간은 advance()/run_next()로만 흐름)
+    작업 스레드는 실제 스레드로 돌지만 가상 시간을 기다릴 때(sleep/wait/busy)만 실행권을 넘기므로,
+    운영 환경처럼 작업 스레드와 이벤트 루프가 번갈아 실행되면서도 같은 시드면 같은 순서로 재현됨
+    예약된 호출과 이벤트 처리(on_fire)는 드라이버(advance를 호출한 스레드)에서 실행
+    """
+
+    def __init__(self, start=0.0):
+        self.now = start
+        self.pending = []   # (시각, 순번, VirtualTimer) 힙
+        self.seq = 0
+        self.on_fire = None # 작업 스레드가 실행권을 넘길 때마다 드라이버에서 실행할 함수 (예: 쌓인 이벤트 처리)
+
+        self.lock = threading.Lock()        # 예약 힙/실행 대기열 보호 (가상 스레드 밖에서 spawn할 수 있음)
+        self.driver_baton = threading.Lock()  # 작업 스레드가 실행권을 돌려줄 때 풀림
+        self.driver_baton.acquire()
+        self.running = None     # 실행권을 가진 가상 스레드 (None = 드라이버)
+        self.ready = deque()    # 실행 대기 중인 가상 스레드
+        self.waiters = []       # (Event, VirtualThread, VirtualTimer) 이벤트 대기 중인 스레드
+        self.local = threading.local()
+        self.switches = 0       # 드라이버 ↔ 작업 스레드 전환 횟수
+
+    def time(self):
+        """
+        현재 가상 시각
+        :return: 시각 (초)
+        """
+        return self.now
+
+    def call_later(self, delay, fn, *args):
+        """
+        일정 시간 뒤 함수 호출 예약 (드라이버에서 실행)
+        :param delay: 지연 시간 (초)
+        :param fn: 호출할 함수
+        :return: VirtualTimer
+        """
+        with self.lock:
+            timer = VirtualTimer(self.now + max(delay, 0.0), fn, args)
+            heapq.heappush(self.pending, (timer.when, self.seq, timer))
+            self.seq += 1
+        return timer
+
+    def next_due(self):
+        """
+        다음 예약 호출 시각
+        :return: 시각 (초, 예약이 없으면 None)
+        """
+        while self.pending and self.pending[0][2].cancelled:
+            heapq.heappop(self.pending)
+        return self.pending[0][0] if self.pending else None
+
+    def spawn(self, fn, *args, name=None):
+        """
+        가상 스레드 시작 (드라이버가 실행권을 줄 때 실행, 어느 스레드에서든 호출 가능)
+        :param fn: 스레드 함수
+        :return: VirtualThread
+        """
+        vthread = VirtualThread(name or getattr(fn, "__name__", "worker"))
+
+        def body():
+            self.local.thread = vthread
+            vthread.baton.acquire()
+            try:
+                fn(*args)
+            finally:
+                vthread.done = True
+                self.running = None
+                self.driver_baton.release()
+
+        vthread.thread = threading.Thread(target=body, name=f"sim-{vthread.name}", daemon=True)
+        vthread.thread.start()
+        with self.lock:
+            self.ready.append(vthread)
+        return vthread
+
+    def current(self):
+        """
+        호출한 스레드의 가상 스레드
+        :return: VirtualThread (드라이버나 일반 스레드면 None)
+        """
+        return getattr(self.local, "thread", None)
+
+    def _yield(self, vthread):
+        """실행권을 드라이버에 넘기고 다시 받을 때까지 대기 (가상 스레드에서 호출)"""
+        self.running = None
+        self.driver_baton.release()
+        vthread.baton.acquire()
+
+    def _wake(self, vthread):
+        """대기 중인 가상 스레드를 실행 대기열에 넣음"""
+        for waiter in self.waiters:
+            if waiter[1] is vthread:
+                waiter[2].cancel()
+                self.waiters.remove(waiter)
+                break
+        self.ready.append(vthread)
+
+    def sleep(self, seconds):
+        """
+        가상 시간만큼 대기 (가상 스레드에서 호출, 그동안 다른 스레드/이벤트 처리가 진행됨)
+        :param seconds: 대기 시간 (초)
+        """
+        vthread = self.current()
+        if vthread is None:
+            raise RuntimeError("가상 시계 대기는 가상 스레드에서만 호출할 수 있습니다 (드라이버는 advance 사용)")
+        self.call_later(seconds, self._wake, vthread)
+        self._yield(vthread)
+
+    def busy(self, seconds):
+        """
+        처리 시간 흉내 (디코딩, 네트워크 왕복 등 - 호출한 가상 스레드만 그 시간 동안 멈춤)
+        :param seconds: 처리 시간 (초)
+        """
+        self.sleep(seconds)
+
+    def wait(self, event, timeout):
+        """
+        threading.Event.wait의 가상 시계 버전 (이벤트가 설정되거나 시간이 지나면 깨어남)
+        :param event: threading.Event
+        :param timeout: 최대 대기 시간 (초)
+        :return: 이벤트 설정 여부
+        """
+        if event.is_set():
+            return True
+        vthread = self.current()
+        if vthread is None:
+            raise RuntimeError("가상 시계 대기는 가상 스레드에서만 호출할 수 있습니다 (드라이버는 advance 사용)")
+        timer = self.call_later(timeout, self._wake, vthread)
+        self.waiters.append((event, vthread, timer))
+        self._yield(vthread)
+        return event.is_set()
+
+    def run_ready(self):
+        """실행 가능한 가상 스레드가 없을 때까지 한 번에 하나씩 실행 (사이사이 on_fire로 이벤트 처리)"""
+        while True:
+            if self.on_fire:
+                self.on_fire()
+            for event, vthread, timer in list(self.waiters):
+                if event.is_set():
+                    self._wake(vthread)
+            if not self.ready:
+                return
+            with self.lock:
+                vthread = self.ready.popleft()
+            # 실행권을 직접 넘기고 돌려받을 때까지 대기 (한 번 전환에 해당 스레드 하나만 깨움)
+            self.running = vthread
+            self.switches += 1
+            vthread.baton.release()
+            self.driver_baton.acquire()
+
+    def advance(self, seconds):
+        """
+        시간 진행 (드라이버에서 호출, 그 사이에 예약된 호출과 깨어난 가상 스레드를 순서대로 실행)
+        :param seconds: 진행할 시간 (초)
+        """
+        target = self.now + max(seconds, 0.0)
+        self.run_ready()
+        while True:
+            due = self.next_due()
+            if due is None or due > target:
+                break
+            _, _, timer = heapq.heappop(self.pending)
+            self.now = max(self.now, timer.when)
+            timer.fn(*timer.args)
+            self.run_ready()
+        self.now = max(self.now, target)
+
+    def run_next(self):
+        """
+        다음 예약 호출 시각까지 진행
+        :return: 실행한 예약이 있으면 True
+        """
+        due = self.next_due()
+        if due is None:
+            return False
+        self.advance(due - self.now)
+        return True
+
+class FakeESP32:
+    """WiFiProcessor 대체 (프로세스 안의 ESP32, 링크 상태는 시뮬레이터가 바꿈)"""
+
+    def __init__(self, clock, rng, status_manager=None, latency=0.02, timeout=1.0):
+        """
+        초기화
+        :param clock: VirtualClock
+        :param rng: numpy 난수 생성기
+        :param status_manager: 연결 상태 변화 콜백을 받을 상태 관리자
+        :param latency: 요청 한 번의 왕복 시간 (초, 요청한 가상 스레드만 멈춤)
+        :param timeout: 링크가 끊겼을 때 요청이 실패하기까지 걸리는 시간 (초, WiFiProcessor 연결 타임아웃)
+        """
+        self.clock = clock
+        self.rng = rng
+        self.status_manager = status_manager
+        self.latency = latency
+        self.timeout = timeout
+        self.link_up = True
+        self.is_connected = False
+        self.commands = []  # (가상 시각, 명령, 전달 성공 여부)
+        self.requests = 0
+        self.last_checked = None
+        self.heartbeat = None
+        self.heartbeat_stop = threading.Event()
+        self.heartbeat_wake = threading.Event()
+
+    def set_link(self, up):
+        """ESP32 전원/WiFi 상태 변경 (다음 요청부터 반영)"""
+        self.link_up = up
+
+    def start_heartbeat(self, interval=2.0, jitter=0.2, max_backoff=10.0):
+        """WiFiProcessor와 같은 간격/지수 백오프로 연결을 확인하는 가상 스레드 시작"""
+
+        def beat():
+            failures = 0
+            while not self.heartbeat_stop.is_set():
+                self.heartbeat_wake.clear()
+                self.check_connection()
+                failures = 0 if self.is_connected else failures + 1
+                delay = min(max_backoff, interval * 2 ** min(failures, 10))
+                self.clock.wait(self.heartbeat_wake, delay * self.rng.uniform(1 - jitter, 1 + jitter))
+
+        self.heartbeat_stop.clear()
+        self.heartbeat = self.clock.spawn(beat, name="esp32-heartbeat")
+
+    def probe_soon(self):
+        self.heartbeat_wake.set()
+
+    def stop_heartbeat(self):
+        self.heartbeat_stop.set()
+        self.heartbeat_wake.set()
+        self.heartbeat = None
+
+    def heartbeat_running(self):
+        return self.heartbeat is not None and not self.heartbeat.done
+
+    def get_link_state(self):
+        age = self.clock.time() - self.last_checked if self.last_checked is not None else None
+        return self.is_connected, age
+
+    def _set_connected(self, connected):
+        self.last_checked = self.clock.time()
+        if connected == self.is_connected:
+            return
+        self.is_connected = connected
+        if self.status_manager:
+            if connected:
+                self.status_manager.on_connection_established()
+            else:
+                self.status_manager.on_connection_lost()
+
+    def check_connection(self):
+        self.requests += 1
+        self.clock.busy(self.latency if self.link_up else self.timeout)
+        self._set_connected(self.link_up)
+        return self.is_connected
+
+    def send_command(self, command):
+        if not self.heartbeat_running():
+            self.check_connection()
+        self.requests += 1
+        self.clock.busy(self.latency if self.link_up else self.timeout)
+        self.commands.append((self.clock.time(), command, self.link_up))
+        self._set_connected(self.link_up)
+        return self.link_up
+
+    def get_random_cup(self):
+        return ("A", "B", "C")[self.rng.integers(3)]
+
+    def close(self):
+        self.stop_heartbeat()
+
+class FakeAudioPlayer:
+    """AudioPlayer 대체 (재생 기록만 남기고 바로 반환)"""
+
+    def __init__(self, audio_files, clock):
+        self.audio_files = audio_files
+        self.clock = clock
+        self.effect_thread = None
+        self.music = None
+        self.played = Counter()
+
+    def play_audio(self, sound_key):
+        if sound_key in self.audio_files:
+            self.play_effect(sound_key)
+
+    def play_effect(self, sound_key):
+        self.played[sound_key] += 1
+
+    def play_background_music(self, sound_key):
+        self.played[sound_key] += 1
+        self.music = sound_key
+
+    def stop_background_music(self):
+        self.music = None
+
+class FakeScanner:
+    """
+    QRScanner 대체 (디코딩 없이 이번 라운드 참가자 코드를 확률적으로 검출)
+    스캔 한 번마다 디코딩 시간만큼 스캔한 가상 스레드를 멈춤, stall()로 카메라 멈춤 흉내
+    """
+
+    def __init__(self, clock, rng, width=640, height=480, visibility=0.7, scan_cost=(0.005, 0.04)):
+        """
+        초기화
+        :param clock: VirtualClock
+        :param rng: numpy 난수 생성기
+        :param visibility: 참가자 코드가 한 프레임에서 검출될 확률
+        :param scan_cost: 스캔 한 번 처리 시간 범위 (초, 최소, 최대)
+        """
+        self.clock = clock
+        self.rng = rng
+        self.frame = np.zeros((height, width), np.uint8)
+        self.visibility = visibility
+        self.scan_cost = scan_cost
+        self.players = {}           # 코드 문자열 → Detection
+        self.motion_gate = None
+        self.fresh_detections = []  # 움직임 감지가 없으므로 매 스캔 결과가 모두 새 디코딩
+        self.target = None
+        self.target_center = None
+        self.stall_seconds = 0.0
+        self.scans = 0
+
+    def set_players(self, count):
+        """이번 라운드 참가자 배치"""
+        numbers = self.rng.choice(np.arange(1, 457), size=count, replace=False)
+        width, y = self.frame.shape[1], self.frame.shape[0] / 2
+        self.players = {}   # 참가자는 라운드 동안 제자리 (검출 객체를 미리 만들어 재사용)
+        for n in numbers:
+            x = float(self.rng.uniform(40, width - 40))
+            text = f"Player_Number_{n:03d}"
+            self.players[text] = Detection(text, [[x - 20, y - 20], [x + 20, y - 20], [x + 20, y + 20], [x - 20, y + 20]])
+
+    def stall(self, seconds):
+        """다음 스캔 한 번을 지정 시간 동안 멈춤 (카메라/드라이버 멈춤 흉내)"""
+        self.stall_seconds = seconds
+
+    def _detect(self, texts):
+        self.scans += 1
+        self.clock.busy(self.rng.uniform(*self.scan_cost) + self.stall_seconds)
+        self.stall_seconds = 0.0
+        visible = self.rng.random(len(texts)) < self.visibility
+        return self.frame, [self.players[text] for text, seen in zip(texts, visible) if seen]
+
+    def scan(self):
+        frame, detections = self._detect(list(self.players))
+        self.fresh_detections = detections
+        return frame, detections
+
+    def start_roi_tracking(self, target_data):
+        self.target = target_data
+
+    def stop_roi_tracking(self):
+        self.target = None
+        self.target_center = None
+
+    def scan_tracked(self):
+        frame, detections = self._detect([self.target] if self.target in self.players else [])
+        self.target_center = detections[0].center if detections else None
+        return frame, detections
+
+    def get_capture_stats(self):
+        return None
+
+    def get_motion_stats(self):
+        return None
+
+    def get_decode_stats(self):
+        return None
+
+    def get_tracking_stats(self):
+        return {"scans": self.scans}
+
+    def display_frame(self, frame, decoded_objects):
+        pass
+
+    def poll_key(self):
+        return -1
+
+    def release(self):
+        pass
+
+class ReplayScanner:
+    """실제 QRScanner로 녹화 프레임 디코딩 (걸린 실제 시간만큼 스캔한 가상 스레드를 멈춤)"""
+
+    def __init__(self, scanner, clock):
+        self.scanner = scanner
+        self.clock = clock
+        self.stall_seconds = 0.0
+
+    def _timed(self, fn):
+        start = time.perf_counter()
+        result = fn()
+        self.clock.busy(time.perf_counter() - start + self.stall_seconds)
+        self.stall_seconds = 0.0
+        return result
+
+    def scan(self):
+        return self._timed(self.scanner.scan)
+
+    def scan_tracked(self):
+        return self._timed(self.scanner.scan_tracked)
+
+    def stall(self, seconds):
+        self.stall_seconds = seconds
+
+    def set_players(self, count):
+        pass  # 녹화에 찍힌 코드가 참가자
+
+    def __getattr__(self, attr):
+        return getattr(self.scanner, attr)
+
+class SimulatedStatusManager(StatusManager):
+    """
+    가짜 장치와 가상 시계로 동작하는 StatusManager
+    라운드 작업은 가상 스레드로 실행되어 이벤트 루프(드라이버)와 운영 환경처럼 번갈아 실행되고,
+    끝난 라운드의 작업 스레드가 모터/QR 기록/다음 라운드 작업과 겹치는 경합을 기록
+    """
+
+    def __init__(self, clock, rng, scanner):
+        self.sim_clock = clock
+        self.sim_rng = rng
+        self.sim_scanner = scanner
+        self.transition_log = []    # (가상 시각, 이전 상태, 새 상태, 원인 이벤트)
+        self.stale_events = 0       # 중단된 라운드가 늦게 보낸 이벤트 수
+        self.ignored_events = Counter()
+        self.current_event = None
+        self.thread_rounds = {}     # 가상 스레드 → 라운드 번호 (라운드 작업 스레드만)
+        self.races = []             # (가상 시각, 종류, 설명)
+        self.worker_overlaps = 0    # 이전 라운드 작업 스레드가 살아 있을 때 새 라운드 작업이 시작된 횟수
+        super().__init__(show_display=False)
+        self.init_done["esp32_heartbeat"].wait()  # 감시 가상 스레드가 첫 라운드 전에 등록되도록 (실행 결과 재현성)
+        self.clock = clock.time
+        clock.on_fire = self.pump  # 작업 스레드가 실행권을 넘길 때마다 쌓인 이벤트 처리
+
+        # 끝난 라운드의 작업 스레드가 공유 자원을 건드리는지 감시
+        self.motor.adjust_for_qr_position = self._guarded("motor", self.motor.adjust_for_qr_position)
+        self.qr_manager.add_data = self._guarded("qr_data", self.qr_manager.add_data)
+        self.audio_player.play_background_music = self._guarded("music", self.audio_player.play_background_music)
+        self.pump()
+
+    def _create_wifi(self):
+        return FakeESP32(self.sim_clock, self.sim_rng, status_manager=self)
+
+    def _create_scanner(self, decode_workers, decoder, frame_source):
+        return self.sim_scanner
+
+    def _create_audio_player(self, audio_files):
+        return FakeAudioPlayer(audio_files, self.sim_clock)
+
+    def _spawn(self, target, *args):
+        vthread = self.sim_clock.spawn(target, *args)
+        if target in (self._game_sequence, self.start_tracking):
+            round_id = args[0]
+            # 카메라가 멈춰 이전 라운드 작업이 스캔 중에 붙잡혀 있으면 겹칠 수 있음 (겹친 뒤 공유 자원을 건드리면 경합)
+            if any(other_round != round_id and not other.done for other, other_round in self.thread_rounds.items()):
+                self.worker_overlaps += 1
+            self.thread_rounds = {other: other_round for other, other_round in self.thread_rounds.items()
+                                  if not other.done}
+            self.thread_rounds[vthread] = round_id
+        return vthread
+
+    def _schedule(self, delay, fn, *args):
+        return self.sim_clock.call_later(delay, fn, *args)
+
+    def _pacer(self, target_fps, cancel):
+        return RatePacer(target_fps, clock=self.clock, sleep=lambda seconds: self.sim_clock.wait(cancel, seconds))
+
+    def _race(self, kind, detail):
+        self.races.append((round(self.sim_clock.time(), 2), kind, detail))
+
+    def _guarded(self, kind, fn):
+        """
+        라운드 작업 스레드가 자기 라운드가 끝난 뒤 호출하면 경합으로 기록하는 래퍼
+        :param kind: 경합 종류
+        :param fn: 감쌀 함수
+        """
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            round_id = self.thread_rounds.get(self.sim_clock.current())
+            if round_id is not None and (round_id != self.round_id or self.round_cancel.is_set()):
+                self._race(kind, f"라운드 {round_id}가 끝난 뒤 작업 스레드가 {fn.__name__} 호출 "
+                                 f"(현재 라운드 {self.round_id}, 상태 {self.current_status})")
+            return fn(*args, **kwargs)
+        return wrapper
+
+    def _is_current_round(self, payload):
+        current = super()._is_current_round(payload)
+        if payload is not None and not current:
+            self.stale_events += 1
+        return current
+
+    def start_led_blinking(self):
+        self.led_blinking = True  # 깜빡임 스레드 없이 상태만 기록
+
+    def stop_led_blinking(self):
+        self.led_blinking = False
+
+    def update_status(self, new_status):
+        if new_status != self.current_status:
+            self.transition_log.append((self.sim_clock.time(), self.current_status, new_status, self.current_event))
+        super().update_status(new_status)
+
+    def dispatch(self, event):
+        event_type = event[0]
+        if event_type != self.EVENT_QUIT and (self.current_status, event_type) not in self.transitions:
+            self.ignored_events[event_type] += 1
+        previous, self.current_event = self.current_event, event_type
+        try:
+            super().dispatch(event)
+        finally:
+            self.current_event = previous
+
+    def pump(self):
+        """
+        쌓인 이벤트를 모두 처리
+        :return: 처리한 이벤트 수
+        """
+        handled = 0
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                return handled
+            self.dispatch(event)
+            handled += 1
+
+class GameSimulator:
+    """라운드 시나리오(버튼, 중단, ESP32 끊김, 카메라 멈춤)를 만들고 이상 여부를 검사하는 시뮬레이터"""
+
+    ACTIVE = (StatusManager.STATUS_GAME_RUNNING, StatusManager.STATUS_TRACKING)
+    IDLE = (StatusManager.STATUS_DISCONNECTED, StatusManager.STATUS_CONNECTED)
+
+    def __init__(self, seed=0, source=None, players=(1, 8), press_gap=(1.0, 5.0),
+                 abort_prob=0.1, outage_prob=0.05, stall_prob=0.02, settle=2.0):
+        """
+        초기화
+        :param seed: 난수 시드
+        :param source: 녹화 프레임 경로 (None이면 합성 검출 결과)
+        :param players: 라운드당 참가자 수 범위 (최소, 최대)
+        :param press_gap: 라운드 사이 버튼 누르기까지의 간격 범위 (초)
+        :param abort_prob: 라운드 중 버튼으로 중단할 확률
+        :param outage_prob: 라운드 중 ESP32 연결이 끊길 확률
+        :param stall_prob: 라운드 중 카메라가 라운드 제한 시간보다 오래 멈출 확률
+        :param settle: 라운드 종료 후 검사 전까지 진행할 시간 (초, ESP32 연결 타임아웃보다 길게)
+        """
+        hardware.use_simulation()
+        self.rng = np.random.default_rng(seed)
+        self.clock = VirtualClock()
+        self.players = players
+        self.press_gap = press_gap
+        self.abort_prob = abort_prob
+        self.outage_prob = outage_prob
+        self.stall_prob = stall_prob
+        self.settle = settle
+
+        if source is None:
+            scanner = FakeScanner(self.clock, self.rng)
+        else:
+            from frame_source import open_source
+            from qr_scanner import QRScanner
+            scanner = ReplayScanner(QRScanner(show_display=False, motion_gating=True,
+                                              source=open_source(source, loop=True)), self.clock)
+
+        self.manager = SimulatedStatusManager(self.clock, self.rng, scanner)
+        self.esp32 = self.manager.wifi
+        self.anomalies = []             # (가상 시각, 종류, 설명)
+        self.outcomes = Counter()
+        self.phase_times = {"collect": [], "track": [], "round": []}
+        self.rejected = 0
+
+    def _anomaly(self, kind, detail):
+        self.anomalies.append((round(self.clock.time(), 2), kind, detail))
+
+    def _press(self):
+        """게임 버튼 누름 (GPIO 콜백과 같은 경로)"""
+        self.manager.button_callback(self.manager.BUTTON_PIN)
+
+    def _press_if_active(self):
+        if self.manager.current_status in self.ACTIVE:
+            self._press()
+
+    def _check_invariants(self):
+        """대기 상태 불변 조건 검사 (LED, 모터, 배경 음악)"""
+        manager = self.manager
+        status = manager.current_status
+        if status in self.IDLE:
+            led = GPIO.input(manager.LED_PIN)
+            expected = GPIO.HIGH if status == manager.STATUS_CONNECTED else GPIO.LOW
+            if manager.led_blinking or led != expected:
+                self._anomaly("led", f"상태 {status}인데 LED={led}, 깜빡임={manager.led_blinking}")
+            if manager.audio_player.music is not None:
+                self._anomaly("music", f"대기 상태에서 배경 음악 재생 중: {manager.audio_player.music}")
+        elif not manager.led_blinking:
+            self._anomaly("led", f"게임 중(상태 {status})인데 LED가 깜빡이지 않음")
+        if manager.motor.is_running and status != manager.STATUS_TRACKING:
+            self._anomaly("motor", f"추적 중이 아닌데(상태 {status}) 모터 동작 중")
+
+    def _schedule_round(self):
+        """
+        다음 라운드 시나리오 예약
+        :return: 버튼을 누를 때까지 남은 시간 (초)
+        """
+        gap = self.rng.uniform(*self.press_gap)
+        self.manager.qr_scanner.set_players(int(self.rng.integers(self.players[0], self.players[1] + 1)))
+        self.clock.call_later(gap, self._press)
+
+        round_length = self.manager.qr_capture_duration + self.manager.tracking_duration + 10
+        if self.rng.random() < self.abort_prob:
+            self.clock.call_later(gap + self.rng.uniform(0.5, round_length), self._press_if_active)
+        if self.rng.random() < self.outage_prob:
+            down = gap + self.rng.uniform(0, round_length)
+            self.clock.call_later(down, self.esp32.set_link, False)
+            self.clock.call_later(down + self.rng.uniform(1, 20), self.esp32.set_link, True)
+        if self.rng.random() < self.stall_prob:
+            stall = self.manager.round_time_limit + 5
+            self.clock.call_later(gap + self.rng.uniform(0.5, round_length), self.manager.qr_scanner.stall, stall)
+        return gap
+
+    def _record_round(self, start_index):
+        """이번 라운드 상태 전이 기록에서 단계 시간과 결과 집계"""
+        manager = self.manager
+        entered = {}
+        for when, old, new, cause in manager.transition_log[start_index:]:
+            if new in self.ACTIVE:
+                entered[new] = when
+            if old in self.ACTIVE and new in self.IDLE:
+                start = entered.get(manager.STATUS_GAME_RUNNING, when)
+                tracking = entered.get(manager.STATUS_TRACKING)
+                self.phase_times["collect"].append((tracking if tracking is not None else when) - start)
+                if tracking is not None:
+                    self.phase_times["track"].append(when - tracking)
+                self.phase_times["round"].append(when - start)
+                self.outcomes[cause or "unknown"] += 1
+
+                if when - start > manager.round_time_limit + 1:
+                    self._anomaly("overrun", f"라운드 {manager.round_id}가 {when - start:.1f}초 동안 진행됨")
+                if not any(command == "STOP" and t >= when for t, command, _ in self.esp32.commands):
+                    self._anomaly("stop", f"라운드 {manager.round_id} 종료 후 STOP 명령을 보내지 않음")
+                entered = {}
+
+    def run_round(self):
+        """
+        버튼 한 번부터 라운드 종료(또는 시작 거부)까지 진행
+        :return: 라운드가 시작되었으면 True
+        """
+        manager = self.manager
+        round_id = manager.round_id
+        start_index = len(manager.transition_log)
+
+        # 버튼 누름 (이벤트 루프가 라운드를 시작하고 작업 스레드를 띄움)
+        self.clock.advance(self._schedule_round())
+        if manager.round_id == round_id:
+            # 연결이 끊겨 있어 시작이 거부됨
+            self.rejected += 1
+            self._check_invariants()
+            return False
+
+        # 라운드 종료까지 진행 (작업 스레드는 가상 시간을 기다릴 때마다 이벤트 루프에 실행권을 넘김)
+        started = self.clock.time()
+        while manager.current_status in self.ACTIVE:
+            if manager.pump():
+                continue
+            if not self.clock.run_next():
+                self._anomaly("stuck", f"상태 {manager.current_status}에서 더 이상 진행할 이벤트가 없음")
+                manager.post_event(manager.EVENT_STOP)
+                manager.pump()
+                break
+            if self.clock.time() - started > manager.round_time_limit * 3:
+                self._anomaly("stuck", f"상태 {manager.current_status}가 {self.clock.time() - started:.0f}초 동안 유지됨")
+                break
+
+        # 종료 후 STOP 명령 전송과 늦게 깨어난 작업 스레드가 끝날 시간을 준 뒤 검사
+        self.clock.advance(self.settle)
+        self._check_invariants()
+        self._record_round(start_index)
+        return True
+
+    def run(self, rounds):
+        """
+        라운드 반복 실행
+        :param rounds: 시도할 라운드 수
+        :return: 결과 딕셔너리
+        """
+        start = time.perf_counter()
+        played = 0
+        for _ in range(rounds):
+            if self.run_round():
+                played += 1
+        wall = time.perf_counter() - start
+
+        phases = {}
+        for phase, values in self.phase_times.items():
+            if values:
+                phases[phase] = {
+                    "count": len(values),
+                    "p50": round(float(np.percentile(values, 50)), 2),
+                    "p95": round(float(np.percentile(values, 95)), 2),
+                    "max": round(float(max(values)), 2),
+                }
+
+        return {
+            "rounds": played,
+            "rejected": self.rejected,
+            "wall_seconds": wall,
+            "virtual_seconds": self.clock.time(),
+            "rounds_per_second": played / wall if wall > 0 else 0.0,
+            "phases": phases,
+            "outcomes": dict(self.outcomes),
+            "stale_events": self.manager.stale_events,
+            "ignored_events": dict(self.manager.ignored_events),
+            "esp32_requests": self.esp32.requests,
+            "thread_switches": self.clock.switches,
+            "worker_overlaps": self.manager.worker_overlaps,
+            "anomalies": sorted(self.anomalies + self.manager.races),
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가상 시계로 게임 라운드를 빠르게 반복 실행")
+    parser.add_argument("--rounds", type=int, default=1000, help="시도할 라운드 수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    parser.add_argument("--source", help="녹화 프레임 경로 (기본: 합성 검출 결과)")
+    parser.add_argument("--abort", type=float, default=0.1, help="라운드 중 버튼으로 중단할 확률")
+    parser.add_argument("--outage", type=float, default=0.05, help="라운드 중 ESP32 연결이 끊길 확률")
+    parser.add_argument("--stall", type=float, default=0.02, help="라운드 중 카메라가 멈출 확률")
+    parser.add_argument("--verbose", action="store_true", help="게임 진행 메시지 출력")
+    args = parser.parse_args(argv)
+
+    with open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+        simulator = GameSimulator(seed=args.seed, source=args.source, abort_prob=args.abort,
+                                  outage_prob=args.outage, stall_prob=args.stall)
+        result = simulator.run(args.rounds)
+
+    print(f"🎮 라운드 {result['rounds']}개 (시작 거부 {result['rejected']}회), "
+          f"가상 {result['virtual_seconds'] / 3600:.1f}시간을 {result['wall_seconds']:.2f}초에 실행 "
+          f"(초당 {result['rounds_per_second']:.0f}라운드)")
+    print(f"{'단계':<10} {'횟수':>6} {'p50(s)':>8} {'p95(s)':>8} {'max(s)':>8}")
+    for phase, stats in result["phases"].items():
+        print(f"{phase:<10} {stats['count']:>6} {stats['p50']:>8.2f} {stats['p95']:>8.2f} {stats['max']:>8.2f}")
+    print(f"📊 라운드 종료 원인: {result['outcomes']}")
+    print(f"📊 무시된 이벤트: {result['ignored_events']}, 늦게 도착한 이전 라운드 이벤트: {result['stale_events']}, "
+          f"이전 라운드 작업과 겹친 라운드: {result['worker_overlaps']}")
+    print(f"📊 ESP32 요청: {result['esp32_requests']}회, 작업 스레드 전환: {result['thread_switches']}회")
+
+    anomalies = result["anomalies"]
+    if not anomalies:
+        print("✅ 이상 없음")
+        return 0
+
+    print(f"⚠️ 이상 {len(anomalies)}건: {dict(Counter(kind for _, kind, _ in anomalies))}")
+    for when, kind, detail in anomalies[:10]:
+        print(f"  {when:>10.2f}s {kind:<8} {detail}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
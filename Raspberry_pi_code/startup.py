@@ -0,0 +1,138 @@
+# startup.py
+# 시작 시간 측정 및 지연 import (무거운 모듈은 처음 사용할 때 불러옴)
+import time
+import importlib
+import threading
+from contextlib import contextmanager
+
+BOOT_TIME = time.perf_counter()  # main.py가 가장 먼저 import하므로 프로세스 시작 시각으로 사용
+
+_records = []           # (구분, 이름, 소요 시간 초)
+_lock = threading.Lock()
+
+def record(kind, name, seconds):
+    """
+    시작 비용 기록
+    :param kind: 'import' 또는 'init'
+    :param name: 모듈/서브시스템 이름
+    :param seconds: 소요 시간 (초)
+    """
+    with _lock:
+        _records.append((kind, name, seconds))
+
+@contextmanager
+def timed(kind, name):
+    """
+    블록 실행 시간을 시작 비용으로 기록
+    :param kind: 'import' 또는 'init'
+    :param name: 모듈/서브시스템 이름
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(kind, name, time.perf_counter() - start)
+
+def since_boot():
+    """
+    프로세스 시작 후 경과 시간
+    :return: 경과 시간 (초)
+    """
+    return time.perf_counter() - BOOT_TIME
+
+class LazyModule:
+    """처음 속성에 접근할 때 실제 모듈을 import하는 대리 객체 (import 시간은 시작 비용으로 기록)"""
+
+    def __init__(self, name):
+        """
+        초기화
+        :param name: 모듈 이름 (예: 'requests', 'pyzbar.pyzbar')
+        """
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """모듈 import (여러 스레드에서 동시에 접근해도 한 번만)"""
+        with self._lock:
+            if self._module is None:
+                with timed("import", self._name):
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        module = self._module or self._load()
+        return getattr(module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
+
+def lazy_import(name):
+    """
+    지연 import
+    :param name: 모듈 이름
+    :return: 처음 사용할 때 import되는 모듈 대리 객체
+    """
+    return LazyModule(name)
+
+def report():
+    """모듈/서브시스템별 import 및 초기화 시간 출력"""
+    with _lock:
+        records = list(_records)
+
+    totals = {}
+    for kind, name, seconds in records:
+        entry = totals.setdefault(name, {"import": 0.0, "init": 0.0})
+        entry[kind] += seconds
+
+    print(f"⏱️ 시작 시간 분석 (부팅 후 {since_boot() * 1000:.0f}ms)")
+    print(f"  {'모듈':<20} {'import(ms)':>10} {'초기화(ms)':>10}")
+    for name, entry in sorted(totals.items(), key=lambda item: -(item[1]["import"] + item[1]["init"])):
+        print(f"  {name:<20} {entry['import'] * 1000:>10.1f} {entry['init'] * 1000:>10.1f}")
+
+def run_graph(tasks, background=()):
+    """
+    의존 관계에 따라 초기화 작업을 병렬 실행 (서로 의존하지 않는 작업은 동시에 시작)
+    :param tasks: 이름 → (실행 함수, 먼저 끝나야 하는 작업 이름 튜플)
+    :param background: 끝날 때까지 기다리지 않는 작업 이름 (예: 응답이 느릴 수 있는 연결 확인)
+    :return: 작업 이름 → 완료 이벤트 (백그라운드 작업 완료 확인용)
+    """
+    for name, (_, deps) in tasks.items():
+        unknown = [dep for dep in deps if dep not in tasks]
+        if unknown:
+            raise ValueError(f"'{name}' 작업의 선행 작업이 없습니다: {unknown}")
+
+    done = {name: threading.Event() for name in tasks}
+    errors = {}
+
+    def run(name, fn, deps):
+        try:
+            for dep in deps:
+                done[dep].wait()
+            failed = [dep for dep in deps if dep in errors]
+            if failed:
+                errors[name] = RuntimeError(f"선행 작업 실패: {failed}")
+                return
+            with timed("init", name):
+                fn()
+        except Exception as e:
+            errors[name] = e
+            if name in background:
+                print(f"🚨 백그라운드 초기화 실패 ({name}): {e}")
+        finally:
+            done[name].set()
+
+    for name, (fn, deps) in tasks.items():
+        thread = threading.Thread(target=run, args=(name, fn, deps), name=f"init-{name}")
+        thread.daemon = True
+        thread.start()
+
+    for name in tasks:
+        if name not in background:
+            done[name].wait()
+
+    for name in tasks:
+        if name not in background and name in errors:
+            raise RuntimeError(f"'{name}' 초기화 실패: {errors[name]}") from errors[name]
+    return done
@@ -1,14 +1,16 @@
 # status_manager.py
 import time
-import cv2
-import numpy as np
+import queue
 import threading
-import RPi.GPIO as GPIO
-from qr_scanner import QRScanner
+import metrics
+from collections import deque
+from hardware import GPIO
+from startup import timed, run_graph, since_boot
 from qr_data_manager import QRDataManager
-from audio_player import AudioPlayer
+from audio_player import AudioPlayer, AudioTimeline
 from wifi_processor import WiFiProcessor
 from motor_controller import MotorController
+from pacer import RatePacer
 
 class StatusManager:
     """시스템 전체 상태 및 게임 흐름을 관리하는 중앙 제어 장치"""
@@ -19,14 +21,32 @@ class StatusManager:
     STATUS_GAME_RUNNING = 2    # 게임 진행 중
     STATUS_TRACKING = 3        # QR 코드 추적 중
     
+    # 이벤트 종류 (이벤트 루프 큐로 전달, 상태 변경은 이벤트 루프 스레드에서만 수행)
+    EVENT_BUTTON = "button"                  # 게임 버튼 (대기 중이면 시작, 게임 중이면 중단)
+    EVENT_START = "start"                    # 게임 시작 요청 (개발 모드 스페이스바 등)
+    EVENT_STOP = "stop"                      # 게임 중단 요청 (개발 모드 's' 키 등)
+    EVENT_QUIT = "quit"                      # 프로그램 종료
+    EVENT_CONNECTED = "connected"            # ESP32 연결 확인 (네트워크)
+    EVENT_DISCONNECTED = "disconnected"      # ESP32 연결 끊김 (네트워크)
+    EVENT_TARGET_SELECTED = "target"         # QR 수집 완료, 타겟 선택됨 (비전)
+    EVENT_NO_TARGET = "no_target"            # QR 수집 완료, 감지된 코드 없음 (비전)
+    EVENT_ROUND_FINISHED = "round_finished"  # 추적/탈락자 호명까지 끝남 (비전)
+    EVENT_ROUND_TIMEOUT = "round_timeout"    # 라운드 최대 시간 초과 (타이머)
+    
+    # 사용자 입력 이벤트 (입력 → 처리 지연 시간 측정 대상)
+    INPUT_EVENTS = (EVENT_BUTTON, EVENT_START, EVENT_STOP)
+    
     # GPIO 핀 설정
     LED_PIN = 18  # LED 제어용 GPIO 핀 (PWM 지원)
     BUTTON_PIN = 23  # 게임 시작 버튼 GPIO 핀
     
-    def __init__(self, show_display=False):
+    def __init__(self, show_display=False, decode_workers=0, decoder=None, frame_source=None):
         """
         초기화
         :param show_display: 디스플레이 출력 여부 (개발 모드에서만 True)
+        :param decode_workers: 병렬 디코딩 워커 프로세스 수 (0 = 사용 안 함)
+        :param decoder: QR 디코더 백엔드 이름 (None = 스캐너 프로파일 값)
+        :param frame_source: 프레임 공급원 (None = PiCamera2, 녹화 경로 또는 FrameSource 객체)
         """
         self.current_status = self.STATUS_DISCONNECTED
         self.show_display = show_display
@@ -35,14 +55,38 @@ class StatusManager:
         self.led_blinking = False
         self.button_pressed = False
         
-        # GPIO 설정
-        self.setup_gpio()
+        self.ready = threading.Event()  # 모든 서브시스템 준비 완료 (버튼 입력 처리 가능)
+        
+        # 이벤트 루프 (버튼/네트워크/비전/타이머 이벤트를 한 스레드에서 순서대로 처리)
+        self.events = queue.Queue()
+        self.running = False
+        self.round_id = 0                   # 현재 라운드 번호 (중단된 라운드의 늦은 이벤트 무시용)
+        self.round_cancel = threading.Event()  # 진행 중인 라운드 작업 스레드 중단 신호
+        self.round_timer = None
+        self.input_latencies = deque(maxlen=200)  # 입력 이벤트 발생 → 처리 완료 시간 (초)
+        self.transitions = {
+            (self.STATUS_DISCONNECTED, self.EVENT_CONNECTED): self._on_connected,
+            (self.STATUS_DISCONNECTED, self.EVENT_BUTTON): self._on_start_rejected,
+            (self.STATUS_DISCONNECTED, self.EVENT_START): self._on_start_rejected,
+            (self.STATUS_CONNECTED, self.EVENT_DISCONNECTED): self._on_disconnected,
+            (self.STATUS_CONNECTED, self.EVENT_BUTTON): self._on_start_round,
+            (self.STATUS_CONNECTED, self.EVENT_START): self._on_start_round,
+            (self.STATUS_GAME_RUNNING, self.EVENT_BUTTON): self._on_abort_round,
+            (self.STATUS_GAME_RUNNING, self.EVENT_STOP): self._on_abort_round,
+            (self.STATUS_GAME_RUNNING, self.EVENT_DISCONNECTED): self._on_abort_round,
+            (self.STATUS_GAME_RUNNING, self.EVENT_ROUND_TIMEOUT): self._on_abort_round,
+            (self.STATUS_GAME_RUNNING, self.EVENT_TARGET_SELECTED): self._on_target_selected,
+            (self.STATUS_GAME_RUNNING, self.EVENT_NO_TARGET): self._on_round_finished,
+            (self.STATUS_TRACKING, self.EVENT_BUTTON): self._on_abort_round,
+            (self.STATUS_TRACKING, self.EVENT_STOP): self._on_abort_round,
+            (self.STATUS_TRACKING, self.EVENT_DISCONNECTED): self._on_abort_round,
+            (self.STATUS_TRACKING, self.EVENT_ROUND_TIMEOUT): self._on_abort_round,
+            (self.STATUS_TRACKING, self.EVENT_ROUND_FINISHED): self._on_round_finished,
+        }
         
-        # 모듈 초기화
-        self.wifi = WiFiProcessor(status_manager=self)
-        self.qr_scanner = QRScanner(show_display=self.show_display)
         self.qr_manager = QRDataManager()
-        self.motor = MotorController(pin_a=12, pin_b=13)  # PWM 지원 핀 사용
+        self.selection_mode = QRDataManager.SELECT_UNIFORM  # 타겟 선택 방식
+        self.min_sightings = 2      # 타겟 후보가 되기 위한 최소 감지 횟수 (스쳐 지나간 코드 제외)
         
         # 오디오 파일 경로 설정
         audio_files = {
@@ -67,15 +111,63 @@ class StatusManager:
             "B": "/home/pi/Desktop/jener/winter_project/game_sounds/B.mp3",
             "C": "/home/pi/Desktop/jener/winter_project/game_sounds/C.mp3",
         }
-        self.audio_player = AudioPlayer(audio_files)
         
         # 게임 설정
         self.qr_capture_duration = 20  # QR 코드 인식 지속 시간 (초)
         self.tracking_duration = 10  # QR 코드 추적 지속 시간 (초)
         self.tracking_timeout = 3  # QR 코드가 사라진 후 추적 중단까지의 시간 (초)
+        self.round_time_limit = 60  # 라운드 최대 시간 (초, 작업 스레드가 멈춰도 게임이 끝나도록)
+        self.cup_clip_duration = 2  # 컵 크기 음성 길이 (초)
+        self.announcement_duration = 5  # 게임 시작 안내 방송 길이 (초)
+        self.count_start_cue = "game_start"  # 이 소리가 나올 때부터 수집 시간 집계 (그 전에 보인 코드도 수집됨)
+        self.scan_fps = 10  # QR 수집 단계 목표 루프 속도 (초당 반복 수)
+        self.tracking_fps = 20  # 추적 단계 목표 루프 속도 (모터 제어 주기)
+        self.heartbeat_interval = 2.0  # ESP32 연결 감시 간격 (초, 끊긴 동안은 점점 늘어남)
+        self.clock = time.time  # 게임 진행 시계 (시뮬레이터는 가상 시계로 교체)
+        
+        def init_wifi():
+            self.wifi = self._create_wifi()
+        
+        def init_scanner():
+            self.qr_scanner = self._create_scanner(decode_workers, decoder, frame_source)
+        
+        def init_motor():
+            self.motor = MotorController(pin_a=12, pin_b=13)  # PWM 지원 핀 사용
+        
+        def init_audio():
+            self.audio_player = self._create_audio_player(audio_files)
         
-        # 초기 연결 확인
-        self.check_connection()
+        def init_heartbeat():
+            # ESP32 연결 확인은 감시 스레드에서 진행 (결과는 연결 이벤트 → LED로 표시)
+            self.wifi.start_heartbeat(self.heartbeat_interval)
+        
+        # 서브시스템 초기화 (서로 의존하지 않는 것은 동시에 시작, 연결 감시 시작은 기다리지 않고 준비 완료)
+        self.init_done = run_graph({
+            "gpio": (self.setup_gpio, ()),
+            "wifi": (init_wifi, ()),
+            "qr_scanner": (init_scanner, ()),
+            "motor": (init_motor, ("gpio",)),
+            "audio": (init_audio, ()),
+            "esp32_heartbeat": (init_heartbeat, ("gpio", "wifi")),
+        }, background=("esp32_heartbeat",))
+        
+        self.ready.set()
+        print(f"✅ 시스템 준비 완료: 부팅 후 {since_boot() * 1000:.0f}ms")
+    
+    # 서브시스템 생성 (시뮬레이터가 가짜 장치로 교체)
+    def _create_wifi(self):
+        return WiFiProcessor(status_manager=self)
+    
+    def _create_scanner(self, decode_workers, decoder, frame_source):
+        # 카메라/OpenCV는 가장 무거우므로 여기서 처음 import
+        with timed("import", "qr_scanner"):
+            from qr_scanner import QRScanner
+        return QRScanner(show_display=self.show_display, threaded_capture=True, pixel_format="YUV420",
+                         decode_workers=decode_workers, motion_gating=True,
+                         decoder=decoder, source=frame_source)
+    
+    def _create_audio_player(self, audio_files):
+        return AudioPlayer(audio_files)
     
     def setup_gpio(self):
         """GPIO 핀 설정"""
@@ -92,25 +184,24 @@ class StatusManager:
                              callback=self.button_callback, bouncetime=300)
     
     def button_callback(self, channel):
-        """버튼 누름 이벤트 처리"""
-        if self.current_status == self.STATUS_CONNECTED:
-            print("🔘 버튼이 눌렸습니다! 게임을 시작합니다.")
-            self.button_pressed = True
-            self.start_game()
-        elif self.current_status in [self.STATUS_GAME_RUNNING, self.STATUS_TRACKING]:
-            print("🔘 버튼이 눌렸습니다! 게임을 중단합니다.")
-            self.button_pressed = True
-            self.stop_game()
-    
-    def check_connection(self):
-        """ESP32 연결 상태 확인"""
-        is_connected = self.wifi.check_connection()
-        self.update_status(self.STATUS_CONNECTED if is_connected else self.STATUS_DISCONNECTED)
-        return is_connected
+        """버튼 누름 이벤트 처리 (RPi.GPIO 콜백 스레드 - 큐에 넣고 바로 반환)"""
+        if not self.ready.is_set():
+            print("⏳ 시스템 준비 중입니다. 잠시 후 다시 눌러주세요.")
+            return
+        
+        self.post_event(self.EVENT_BUTTON)
+    
+    def post_event(self, event_type, payload=None):
+        """
+        이벤트 루프에 이벤트 전달 (모든 스레드에서 호출 가능)
+        :param event_type: 이벤트 종류 (EVENT_*)
+        :param payload: 이벤트 데이터
+        """
+        self.events.put((event_type, payload, time.perf_counter()))
     
     def update_status(self, new_status):
         """
-        상태 업데이트 및 LED 제어
+        상태 업데이트 및 LED 제어 (이벤트 루프 스레드에서만 호출)
         :param new_status: 새로운 상태 코드
         """
         if self.current_status == new_status:
@@ -129,256 +220,392 @@ class StatusManager:
             self.start_led_blinking()  # LED 깜빡임
     
     def on_connection_established(self):
-        """ESP32 연결 수립 시 호출되는 콜백"""
+        """ESP32 연결 수립 시 호출되는 콜백 (WiFiProcessor 스레드)"""
         print("📡 ESP32와 연결되었습니다.")
-        self.update_status(self.STATUS_CONNECTED)
+        self.post_event(self.EVENT_CONNECTED)
     
     def on_connection_lost(self):
-        """ESP32 연결 해제 시 호출되는 콜백"""
+        """ESP32 연결 해제 시 호출되는 콜백 (WiFiProcessor 스레드)"""
         print("📡 ESP32와 연결이 끊어졌습니다.")
-        self.update_status(self.STATUS_DISCONNECTED)
+        self.post_event(self.EVENT_DISCONNECTED)
     
     def start_game(self, mode="random"):
         """
-        게임 시작
+        게임 시작 요청 (이벤트 루프에서 처리)
         :param mode: 게임 모드 ('random')
         """
-        if not self.check_connection():
-            print("⚠️ ESP32와 연결되지 않아 게임을 시작할 수 없습니다.")
-            return False
+        self.game_mode = mode
+        self.post_event(self.EVENT_START)
+    
+    def stop_game(self):
+        """게임 중지 요청 (이벤트 루프에서 처리)"""
+        self.post_event(self.EVENT_STOP)
+    
+    # 이벤트 루프 및 상태 전이
+    def dispatch(self, event):
+        """
+        이벤트 하나 처리 (상태 전이 표에 없는 조합은 무시)
+        :param event: (이벤트 종류, 데이터, 발생 시각)
+        """
+        event_type, payload, posted_at = event
+        if event_type == self.EVENT_QUIT:
+            self.running = False
+            return
         
-        # 이미 게임이 진행 중인 경우
-        if self.current_status in [self.STATUS_GAME_RUNNING, self.STATUS_TRACKING]:
-            print("⚠️ 게임이 이미 진행 중입니다.")
-            return False
+        handler = self.transitions.get((self.current_status, event_type))
+        if handler is not None:
+            handler(payload)
         
+        if event_type in self.INPUT_EVENTS:
+            self.input_latencies.append(time.perf_counter() - posted_at)
+    
+    def _spawn(self, target, *args):
+        """라운드 작업 스레드 시작 (카메라/오디오/네트워크처럼 블로킹되는 작업은 이벤트 루프 밖에서 실행)"""
+        thread = threading.Thread(target=target, args=args)
+        thread.daemon = True
+        thread.start()
+        return thread
+    
+    def _schedule(self, delay, fn, *args):
+        """
+        일정 시간 뒤 함수 실행 (타이머 스레드)
+        :return: cancel()로 취소할 수 있는 타이머
+        """
+        timer = threading.Timer(delay, fn, args=args)
+        timer.daemon = True
+        timer.start()
+        return timer
+    
+    def _pacer(self, target_fps, cancel):
+        """라운드 루프용 페이서 (대기 중에도 중단 신호에 바로 반응)"""
+        return RatePacer(target_fps, clock=self.clock, sleep=cancel.wait)
+    
+    def _is_current_round(self, payload):
+        """중단된 이전 라운드 작업 스레드가 늦게 보낸 이벤트인지 확인"""
+        return payload is not None and payload[0] == self.round_id
+    
+    def _on_connected(self, payload):
+        self.update_status(self.STATUS_CONNECTED)
+    
+    def _on_disconnected(self, payload):
+        self.update_status(self.STATUS_DISCONNECTED)
+    
+    def _on_start_rejected(self, payload):
+        _, age = self.wifi.get_link_state()
+        checked = f"{age:.1f}초 전 확인" if age is not None else "확인 중"
+        print(f"⚠️ ESP32와 연결되지 않아 게임을 시작할 수 없습니다. ({checked}, 연결되면 LED가 켜집니다)")
+        self.wifi.probe_soon()  # 백오프 대기 중이어도 바로 다시 확인 (결과는 연결 이벤트로)
+    
+    def _on_start_round(self, payload):
+        """대기 중 시작 입력: 새 라운드 시작 (컵 선택/명령 전송/QR 수집은 작업 스레드에서)"""
         print("🎮 게임을 시작합니다...")
-        self.game_mode = mode
+        self.round_id += 1
+        self.round_cancel = threading.Event()
         self.update_status(self.STATUS_GAME_RUNNING)
         
-        # 컵 크기 선택 (랜덤)
-        cup_size = self.wifi.get_random_cup()  # 랜덤 선택
-        print(f"🎲 랜덤 선택: {cup_size}")
+        # 작업 스레드가 멈추더라도 라운드가 끝나도록 타이머 이벤트 예약
+        round_id = self.round_id
+        self.round_timer = self._schedule(self.round_time_limit, self.post_event,
+                                          self.EVENT_ROUND_TIMEOUT, (round_id,))
         
-        # 소주 디스펜서 명령 전송
-        self.wifi.send_command(cup_size)
+        self._spawn(self._game_sequence, round_id, self.round_cancel)
+    
+    def _on_target_selected(self, payload):
+        """QR 수집 완료: 선택된 타겟 추적 시작"""
+        if not self._is_current_round(payload):
+            return
         
-        # 게임 시퀀스 시작 (별도 스레드로 실행)
-        game_thread = threading.Thread(target=self._game_sequence, args=(cup_size,))
-        game_thread.daemon = True
-        game_thread.start()
+        self.selected_qr = payload[1]
+        print(f"🎯 선택된 타겟: {self.selected_qr}")
+        self.update_status(self.STATUS_TRACKING)
+        self._spawn(self.start_tracking, payload[0], self.round_cancel)
+    
+    def _on_round_finished(self, payload):
+        """라운드 정상 종료 (타겟 없음 또는 탈락자 호명 완료)"""
+        if not self._is_current_round(payload):
+            return
+        self._end_round()
+    
+    def _on_abort_round(self, payload):
+        """게임 중 중단 입력/연결 끊김/시간 초과: 작업 스레드 중단 후 라운드 종료"""
+        if payload is not None and not self._is_current_round(payload):
+            return  # 이전 라운드의 타이머
+        
+        print("🛑 게임을 중지합니다...")
+        self._end_round()
+    
+    def _end_round(self):
+        """라운드 정리 (모터/음악 정지는 즉시, ESP32 정지 명령은 백그라운드)"""
+        self.round_cancel.set()
+        if self.round_timer:
+            self.round_timer.cancel()
+            self.round_timer = None
+        
+        # 모터 정지
+        self.motor.stop()
         
-        return True
+        # 배경 음악 중지
+        self.audio_player.stop_background_music()
+        
+        # 감시 스레드가 마지막으로 확인한 연결 상태로 전환 (이후 변화는 연결 이벤트로 반영)
+        self.update_status(self.STATUS_CONNECTED if self.wifi.is_connected else self.STATUS_DISCONNECTED)
+        
+        # 모터 정지 명령 전송 (실패하면 WiFiProcessor가 연결 끊김 이벤트를 보냄)
+        self._spawn(self.wifi.send_command, 'STOP')
     
-    def _game_sequence(self, cup_size):
+    def _game_sequence(self, round_id, cancel):
         """
-        게임 시퀀스 실행 (별도 스레드)
-        :param cup_size: 선택된 컵 크기 ('A', 'B', 'C')
+        게임 시퀀스 실행 (라운드 작업 스레드)
+        :param round_id: 라운드 번호
+        :param cancel: 라운드 중단 신호
         """
         try:
-            # 1. 컵 크기에 해당하는 음성 재생
+            # 컵 크기 선택 (랜덤)
+            cup_size = self.wifi.get_random_cup()  # 랜덤 선택
+            print(f"🎲 랜덤 선택: {cup_size}")
+            
+            # 소주 디스펜서 명령 전송
+            self.wifi.send_command(cup_size)
+            
+            # 1. 인트로 오디오 타임라인 (컵 크기 음성 → 게임 시작 안내 → 배경 음악)
+            #    안내 방송을 기다리지 않고 카메라/스캔을 바로 시작, 방송 중에 보인 코드도 수집
+            cues = []
+            offset = 0
             if cup_size in self.audio_player.audio_files:
-                self.audio_player.play_audio(cup_size)
-                time.sleep(2)
+                cues.append((offset, cup_size, AudioTimeline.EFFECT))
+                offset += self.cup_clip_duration
+            cues.append((offset, "game_start", AudioTimeline.EFFECT))
+            offset += self.announcement_duration
+            cues.append((offset, "Way_Back_then", AudioTimeline.MUSIC))
+            timeline = AudioTimeline(self.audio_player, cues, clock=self.clock)
             
-            # 2. 게임 시작 안내 방송 + 배경 음악
-            self.audio_player.play_audio("game_start")
-            time.sleep(5)
-            self.audio_player.play_background_music("Way_Back_then")
+            # 수집 시간 집계 시작 위치 (타임라인에 없는 소리면 스캔 시작부터)
+            count_start = timeline.offset_of(self.count_start_cue) or 0
             
-            # 3. QR 코드 스캔 시작
+            # 2. QR 코드 스캔 시작
             self.qr_manager.clear_data()
-            scan_start_time = time.time()
+            if self.qr_scanner.motion_gate:
+                self.qr_scanner.motion_gate.reset()
+            pacer = self._pacer(self.scan_fps, cancel)
+            timeline.start()
+            pacer.start()
+            counting = False
             
             print("📷 QR 코드 스캔 시작...")
-            while time.time() - scan_start_time < self.qr_capture_duration:
+            while timeline.elapsed() < count_start + self.qr_capture_duration:
                 # 게임이 중단되었는지 확인
-                if self.current_status != self.STATUS_GAME_RUNNING:
+                if cancel.is_set():
                     return
                 
-                frame = self.qr_scanner.get_frame()
+                timeline.update()
+                if not counting and timeline.elapsed() >= count_start:
+                    counting = True
+                    print(f"⏱️ 수집 시간 집계 시작 (집계 전 감지: {len(self.qr_manager.qr_data_list)}개)")
+                
+                frame, decoded_objects = self.qr_scanner.scan()
+                if cancel.is_set():
+                    continue  # 스캔 중에 라운드가 끝났으면 결과를 버림 (다음 라운드 기록에 섞이지 않도록)
                 if frame is None:
+                    pacer.wait()  # 프레임을 못 받은 주기도 페이서 통계에 집계하고 바쁜 반복 방지
                     continue
                 
-                decoded_objects = self.qr_scanner.decode_qr(frame)
+                # 재사용된 결과도 여전히 화면에 있는 코드이므로 마지막 감지 시각은 갱신하되,
+                # 감지 횟수는 실제로 디코딩한 결과만 셈 (디코딩 한 번이 반복돼서 min_sightings를 채우지 않도록, 새 코드만 출력)
+                now = self.clock()
+                fresh = {id(obj) for obj in self.qr_scanner.fresh_detections}
                 for obj in decoded_objects:
-                    qr_data = obj.data.decode('utf-8')
-                    self.qr_manager.add_data(qr_data)
-                    print(f"✅ QR 코드 감지: {qr_data}")
+                    self.qr_manager.add_data(obj.text, obj.polygon, now, fresh=id(obj) in fresh)
+                    if self.qr_manager.get_sighting(obj.text).count == 1:
+                        print(f"✅ QR 코드 감지: {obj.text}")
                 
                 if self.show_display:
                     self.qr_scanner.display_frame(frame, decoded_objects)
                 
-                time.sleep(0.1)  # CPU 사용량 감소
+                pacer.wait()  # 디코딩에 쓴 시간을 뺀 남은 주기만 대기
             
-            # 4. QR 코드 랜덤 선택
-            self.selected_qr = self.qr_manager.get_random_data()
+            print(f"📊 수집 루프 속도: {pacer.get_stats()}")
+            capture_stats = self.qr_scanner.get_capture_stats()
+            if capture_stats:
+                print(f"📊 캡처 통계: {capture_stats}")
+            motion_stats = self.qr_scanner.get_motion_stats()
+            if motion_stats:
+                print(f"📊 움직임 감지 통계: {motion_stats}")
+            decode_stats = self.qr_scanner.get_decode_stats()
+            if decode_stats:
+                print(f"📊 디코딩 통계: {decode_stats}")
             
-            if not self.selected_qr:
+            # 3. QR 코드 랜덤 선택
+            print(f"📊 QR 감지 통계: {self.qr_manager.get_stats()}")
+            selected_qr = self.qr_manager.get_random_data(self.selection_mode, self.min_sightings)
+            if not selected_qr:
+                # 충분히 자주 보인 코드가 없으면 한 번이라도 보인 코드 중에서 선택
+                selected_qr = self.qr_manager.get_random_data(self.selection_mode)
+            
+            if not selected_qr:
                 print("⚠️ 감지된 QR 코드가 없습니다.")
-                self.stop_game()
+                self.post_event(self.EVENT_NO_TARGET, (round_id,))
                 return
             
-            print(f"🎯 선택된 타겟: {self.selected_qr}")
-            
-            # 5. 선택된 QR 코드 추적 시작
-            self.start_tracking()
+            # 4. 선택된 QR 코드 추적 시작 (이벤트 루프에서 추적 단계로 전환)
+            self.post_event(self.EVENT_TARGET_SELECTED, (round_id, selected_qr))
             
         except Exception as e:
             print(f"🚨 게임 시퀀스 오류: {e}")
-            self.stop_game()
+            self.post_event(self.EVENT_NO_TARGET, (round_id,))
     
-    def start_tracking(self):
-        """선택된 QR 코드 추적 시작"""
-        if not self.selected_qr:
-            print("⚠️ 추적할 QR 코드가 선택되지 않았습니다.")
-            self.stop_game()
-            return
-        
-        self.update_status(self.STATUS_TRACKING)
+    def start_tracking(self, round_id, cancel):
+        """
+        선택된 QR 코드 추적 (라운드 작업 스레드)
+        :param round_id: 라운드 번호
+        :param cancel: 라운드 중단 신호
+        """
         print(f"🔍 QR 코드 추적 시작: {self.selected_qr}")
         
-        # 추적 시작 시 배경 음악 중지
-        self.audio_player.stop_background_music()
-        
-        # 추적 시간 설정
-        tracking_start_time = time.time()
-        last_detection_time = tracking_start_time
-        
-        while time.time() - tracking_start_time < self.tracking_duration:
-            # 게임이 중단되었는지 확인
-            if self.current_status != self.STATUS_TRACKING:
-                self.motor.stop()  # 모터 정지
-                return
-            
-            frame = self.qr_scanner.get_frame()
-            if frame is None:
-                continue
+        try:
+            # 추적 시작 시 배경 음악 중지
+            self.audio_player.stop_background_music()
             
-            decoded_objects = self.qr_scanner.decode_qr(frame)
-            target_found = False
+            # ROI 추적 모드 시작 (직전 위치 주변만 디코딩)
+            self.qr_scanner.start_roi_tracking(self.selected_qr)
             
-            for obj in decoded_objects:
-                qr_data = obj.data.decode('utf-8')
-                if qr_data == self.selected_qr:
-                    target_found = True
-                    last_detection_time = time.time()
-                    
-                    # QR 코드 위치 정보 얻기 (pyzbar의 polygon 속성 사용)
-                    points = obj.polygon
-                    if len(points) > 0:
-                        # 중심점 계산
-                        x_sum = sum(point[0] for point in points)
-                        y_sum = sum(point[1] for point in points)
-                        center_x = x_sum / len(points)
-                        center_y = y_sum / len(points)
-                        
-                        # 모터 제어
-                        self.motor.adjust_for_qr_position(center_x, frame.shape[1])
-                    break
+            # 추적 시간 설정
+            tracking_start_time = self.clock()
+            last_detection_time = tracking_start_time
+            pacer = self._pacer(self.tracking_fps, cancel)
+            pacer.start()
             
-            # QR 코드가 사라진 후 일정 시간이 지나면 추적 중단
-            if not target_found:
-                if time.time() - last_detection_time > self.tracking_timeout:
-                    print(f"⚠️ 타겟이 {self.tracking_timeout}초 이상 감지되지 않아 추적을 중단합니다.")
+            while self.clock() - tracking_start_time < self.tracking_duration:
+                # 게임이 중단되었는지 확인
+                if cancel.is_set():
                     self.motor.stop()  # 모터 정지
-                    break
+                    return
+                
+                frame, decoded_objects = self.qr_scanner.scan_tracked()
+                if cancel.is_set():
+                    continue  # 스캔 중에 라운드가 끝났으면 모터를 움직이지 않음
+                if frame is None:
+                    pacer.wait()  # 프레임을 못 받은 주기도 페이서 통계에 집계하고 바쁜 반복 방지
+                    continue
+                
+                target_found = False
+                
+                for obj in decoded_objects:
+                    if obj.text == self.selected_qr:
+                        target_found = True
+                        last_detection_time = self.clock()
+                        break
+                
+                # 모터 제어 (실제 디코딩 위치 또는 디코딩 사이 프레임에서 추정한 타겟 중심 사용)
+                target_center = self.qr_scanner.target_center
+                if target_center is not None:
+                    self.motor.adjust_for_qr_position(target_center[0], frame.shape[1])
+                
+                # QR 코드가 사라진 후 일정 시간이 지나면 추적 중단
+                if not target_found:
+                    if self.clock() - last_detection_time > self.tracking_timeout:
+                        print(f"⚠️ 타겟이 {self.tracking_timeout}초 이상 감지되지 않아 추적을 중단합니다.")
+                        self.motor.stop()  # 모터 정지
+                        break
+                
+                if self.show_display:
+                    self.qr_scanner.display_frame(frame, decoded_objects)
+                
+                pacer.wait()  # 디코딩에 쓴 시간을 뺀 남은 주기만 대기
             
-            if self.show_display:
-                self.qr_scanner.display_frame(frame, decoded_objects)
+            # 추적 종료, 모터 정지 (ROI 추적 모드는 finally에서 종료)
+            self.motor.stop()
+            print(f"📊 타겟 추정 통계: {self.qr_scanner.get_tracking_stats()}")
+            print(f"📊 추적 루프 속도: {pacer.get_stats()}")
             
-            time.sleep(0.1)  # CPU 사용량 감소
-        
-        # 추적 종료, 모터 정지
-        self.motor.stop()
-        
-        # 탈락자 호명 전 배경 음악 중지 (이미 중지되었지만 명확성을 위해)
-        self.audio_player.stop_background_music()
+            # 탈락자 호명 전 배경 음악 중지 (이미 중지되었지만 명확성을 위해)
+            self.audio_player.stop_background_music()
+            
+            # 탈락자 호명
+            print(f"🔊 탈락자 호명: {self.selected_qr}")
+            self.audio_player.play_audio(self.selected_qr)
+            
+            # 효과음 재생 완료 대기
+            if hasattr(self.audio_player, 'effect_thread') and self.audio_player.effect_thread:
+                self.audio_player.effect_thread.join()  # 효과음 재생 완료 대기
         
-        # 탈락자 호명
-        print(f"🔊 탈락자 호명: {self.selected_qr}")
-        self.audio_player.play_audio(self.selected_qr)
+        except Exception as e:
+            print(f"🚨 추적 오류: {e}")
         
-        # 효과음 재생 완료 대기
-        if hasattr(self.audio_player, 'effect_thread') and self.audio_player.effect_thread:
-            self.audio_player.effect_thread.join()  # 효과음 재생 완료 대기
+        finally:
+            self.qr_scanner.stop_roi_tracking()
         
         # 게임 종료
-        self.stop_game()
-    
-    def stop_game(self):
-        """게임 중지"""
-        # 이미 게임이 중지된 상태인 경우
-        if self.current_status not in [self.STATUS_GAME_RUNNING, self.STATUS_TRACKING]:
-            return
-        
-        print("🛑 게임을 중지합니다...")
-        
-        # 모터 정지
-        self.motor.stop()
-        
-        # 배경 음악 중지
-        self.audio_player.stop_background_music()
-        
-        # 모터 정지 명령 전송
-        self.wifi.send_command('STOP')
-        
-        # 상태 업데이트
-        if self.check_connection():
-            self.update_status(self.STATUS_CONNECTED)
-        else:
-            self.update_status(self.STATUS_DISCONNECTED)
+        self.post_event(self.EVENT_ROUND_FINISHED, (round_id,))
     
     # LED 제어 메서드
     def start_led_blinking(self):
         """LED 깜빡임 시작"""
-        if hasattr(self, 'led_blinking') and self.led_blinking:
+        if self.led_blinking:
             return  # 이미 깜빡이는 중
             
         self.led_blinking = True
-        self.led_thread = threading.Thread(target=self._blink_led)
+        self.led_stop = threading.Event()
+        self.led_thread = threading.Thread(target=self._blink_led, args=(self.led_stop,))
         self.led_thread.daemon = True
         self.led_thread.start()
     
     def stop_led_blinking(self):
-        """LED 깜빡임 중지"""
-        if hasattr(self, 'led_blinking'):
-            self.led_blinking = False
+        """LED 깜빡임 중지 (이벤트 루프가 블로킹되지 않도록 깜빡임 스레드를 바로 깨움)"""
+        self.led_blinking = False
+        if hasattr(self, 'led_stop'):
+            self.led_stop.set()
             
         if hasattr(self, 'led_thread') and self.led_thread.is_alive():
             self.led_thread.join(timeout=1.0)
     
-    def _blink_led(self):
+    def _blink_led(self, stop):
         """LED 깜빡임 스레드 함수"""
-        while hasattr(self, 'led_blinking') and self.led_blinking:
+        while not stop.is_set():
             GPIO.output(self.LED_PIN, GPIO.HIGH)
-            time.sleep(0.5)
+            if stop.wait(0.5):
+                break
             GPIO.output(self.LED_PIN, GPIO.LOW)
-            time.sleep(0.5)
+            stop.wait(0.5)
+    
+    def get_input_latency_stats(self):
+        """
+        입력 이벤트 발생 → 처리 완료 지연 시간 통계
+        :return: 횟수/평균/최대 지연 시간(ms) 딕셔너리
+        """
+        latencies = list(self.input_latencies)
+        if not latencies:
+            return {"count": 0, "mean_ms": 0.0, "max_ms": 0.0}
+        return {
+            "count": len(latencies),
+            "mean_ms": sum(latencies) / len(latencies) * 1000,
+            "max_ms": max(latencies) * 1000,
+        }
     
     def run(self):
-        """메인 루프 실행"""
+        """메인 이벤트 루프 실행 (상태 변경은 모두 이 스레드에서 수행)"""
         print("🚀 시스템 실행 중... (Ctrl+C로 종료)")
+        self.running = True
         
         try:
-            while True:
-                # 버튼 입력 확인은 GPIO 이벤트로 처리되므로 여기서는 생략
+            while self.running:
+                # 버튼/네트워크/비전/타이머 이벤트 대기 (개발 모드 키 입력 확인을 위해 짧은 타임아웃)
+                try:
+                    self.dispatch(self.events.get(timeout=0.05))
+                except queue.Empty:
+                    pass
                 
                 # 개발 모드에서 키보드 입력 처리
                 if self.show_display:
-                    key = cv2.waitKey(1) & 0xFF
+                    key = self.qr_scanner.poll_key()  # 키 입력은 디스플레이 스레드에서 수집
                     
                     if key == ord(' '):  # 스페이스바: 게임 시작
-                        if self.current_status == self.STATUS_CONNECTED:
-                            self.start_game()
+                        self.post_event(self.EVENT_START)
                     
                     elif key == ord('s'):  # 's' 키: 게임 중지
-                        self.stop_game()
+                        self.post_event(self.EVENT_STOP)
                     
                     elif key == 27:  # ESC: 종료
-                        break
-                
-                time.sleep(0.1)  # CPU 사용량 감소
+                        self.post_event(self.EVENT_QUIT)
         
         except KeyboardInterrupt:
             print("\n프로그램 종료...")
@@ -389,8 +616,15 @@ class StatusManager:
     def cleanup(self):
         """자원 해제"""
         print("🧹 자원을 정리합니다...")
+        print(f"📊 입력 처리 지연: {self.get_input_latency_stats()}")
+        print(f"📊 단계별 처리 시간: {metrics.get_stats()}")
+        self.round_cancel.set()
+        if self.round_timer:
+            self.round_timer.cancel()
         self.stop_led_blinking()
         self.audio_player.stop_background_music()
         self.motor.cleanup()  # 모터 자원 해제
         self.qr_scanner.release()
+        self.init_done["esp32_heartbeat"].wait(timeout=1.0)  # 준비 직후 종료해도 늦게 시작된 감시 스레드가 남지 않도록
+        self.wifi.close()
         GPIO.cleanup()
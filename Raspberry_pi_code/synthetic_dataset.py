@@ -0,0 +1,231 @@
+# synthetic_dataset.py
+# 사용법: python synthetic_dataset.py <출력 경로> [--frames 200] [--codes 1 4] [--seed 0] [--npy]
+#   - 출력 경로가 폴더면 프레임마다 .png와 같은 이름의 .json 정답 라벨 생성
+#   - --npy를 주면 <출력 경로>.npy 한 파일과 <출력 경로>.json (프레임별 라벨 리스트) 생성
+#   - 라벨 형식은 benchmark.py/replay.py와 동일: {"codes": [{"text": "Player_Number_001", "polygon": [[x, y], ...]}]}
+import os
+import sys
+import json
+import argparse
+import cv2
+import numpy as np
+
+class SyntheticQRGenerator:
+    """정답 위치를 아는 QR 코드 프레임 생성기 (크기/회전/원근 왜곡/블러/노이즈/반사광/저조도)"""
+
+    MODULE_PIXELS = 8   # 왜곡 전 QR 모듈 한 칸 크기 (픽셀)
+    QUIET_ZONE = 4      # 인쇄된 종이의 QR 주변 흰 여백 (모듈 수)
+
+    def __init__(self, width=640, height=480, codes=(1, 4), size=(60, 200), seed=0):
+        """
+        초기화
+        :param width: 프레임 너비
+        :param height: 프레임 높이
+        :param codes: 프레임당 QR 코드 수 범위 (최소, 최대)
+        :param size: QR 코드 한 변 크기 범위 (픽셀, 여백 제외, 최소, 최대)
+        :param seed: 난수 시드 (같은 시드면 같은 데이터셋)
+        """
+        self.width = width
+        self.height = height
+        self.codes = codes
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.encoder = cv2.QRCodeEncoder.create()
+        self.symbols = {}   # 문자열 → (QR 이미지, 여백을 제외한 심볼 꼭짓점)
+
+    def _symbol(self, text):
+        """QR 이미지(종이 여백 포함)와 여백을 제외한 심볼 꼭짓점 (문자열별로 한 번만 생성)"""
+        if text not in self.symbols:
+            modules = self.encoder.encode(text)
+            ys, xs = np.nonzero(modules == 0)
+            modules = modules[ys.min():ys.max() + 1, xs.min():xs.max() + 1]  # 인코더 여백 제거
+
+            # 모듈 경계가 뭉개지지 않도록 확대한 뒤 4모듈 여백(quiet zone)을 붙임
+            cell = self.MODULE_PIXELS
+            image = cv2.resize(modules, None, fx=cell, fy=cell, interpolation=cv2.INTER_NEAREST)
+            margin = self.QUIET_ZONE * cell
+            image = cv2.copyMakeBorder(image, margin, margin, margin, margin, cv2.BORDER_CONSTANT, value=255)
+
+            x0, y0 = margin, margin
+            x1, y1 = image.shape[1] - margin, image.shape[0] - margin
+            corners = np.float32([[x0, y0], [x1, y0], [x1, y1], [x0, y1]])
+            self.symbols[text] = (image, corners)
+        return self.symbols[text]
+
+    def _background(self):
+        """밝기 기울기와 얼룩이 있는 배경 (테이블/옷 같은 질감 흉내)"""
+        base = self.rng.uniform(90, 220)
+        gx, gy = self.rng.uniform(-60, 60, size=2)
+        xs = np.linspace(-0.5, 0.5, self.width, dtype=np.float32)
+        ys = np.linspace(-0.5, 0.5, self.height, dtype=np.float32)
+        background = base + gx * xs[None, :] + gy * ys[:, None]
+
+        blotches = self.rng.normal(0, 20, (self.height // 32 + 1, self.width // 32 + 1)).astype(np.float32)
+        background += cv2.resize(blotches, (self.width, self.height), interpolation=cv2.INTER_CUBIC)
+
+        tint = self.rng.uniform(0.85, 1.15, size=3).astype(np.float32)
+        return background[..., None] * tint
+
+    def _placement(self, side, occupied):
+        """
+        다른 코드와 겹치지 않는 목적지 사각형 선택 (회전 + 원근 왜곡)
+        :return: 목적지 꼭짓점 4개, 실패 시 None
+        """
+        for _ in range(30):
+            half = side / 2
+            cx = self.rng.uniform(half + 8, self.width - half - 8)
+            cy = self.rng.uniform(half + 8, self.height - half - 8)
+            angle = self.rng.uniform(0, 2 * np.pi)
+
+            square = np.float32([[-half, -half], [half, -half], [half, half], [-half, half]])
+            rotation = np.float32([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+            skew = self.rng.uniform(-0.08, 0.08, size=(4, 2)).astype(np.float32) * side  # 원근 왜곡
+            quad = (square @ rotation.T + skew + (cx, cy)).astype(np.float32)
+
+            if quad[:, 0].min() < 0 or quad[:, 1].min() < 0 or \
+                    quad[:, 0].max() >= self.width or quad[:, 1].max() >= self.height:
+                continue
+
+            pad = side * 0.2  # 종이 여백끼리도 겹치지 않도록
+            box = (quad[:, 0].min() - pad, quad[:, 1].min() - pad, quad[:, 0].max() + pad, quad[:, 1].max() + pad)
+            if any(box[0] < o[2] and o[0] < box[2] and box[1] < o[3] and o[1] < box[3] for o in occupied):
+                continue
+            occupied.append(box)
+            return quad
+        return None
+
+    def _degrade(self, frame):
+        """
+        촬영 조건 흉내 (블러, 반사광, 저조도, 노이즈)
+        :return: (열화된 프레임, 적용한 조건 딕셔너리)
+        """
+        conditions = {}
+
+        if self.rng.random() < 0.5:
+            sigma = float(self.rng.uniform(0.5, 2.0))
+            frame = cv2.GaussianBlur(frame, (0, 0), sigma)
+            conditions["blur"] = round(sigma, 2)
+
+        if self.rng.random() < 0.3:
+            # 모션 블러 (가로 방향 선형 커널을 임의 각도로 회전)
+            length = int(self.rng.integers(3, 9))
+            kernel = np.zeros((length, length), np.float32)
+            kernel[length // 2, :] = 1.0 / length
+            angle = float(self.rng.uniform(0, 180))
+            rotation = cv2.getRotationMatrix2D((length / 2 - 0.5, length / 2 - 0.5), angle, 1.0)
+            kernel = cv2.warpAffine(kernel, rotation, (length, length))
+            frame = cv2.filter2D(frame, -1, kernel / max(kernel.sum(), 1e-6))
+            conditions["motion_blur"] = length
+
+        if self.rng.random() < 0.3:
+            # 조명 반사광 (밝은 가우시안 얼룩)
+            cx, cy = self.rng.uniform(0, self.width), self.rng.uniform(0, self.height)
+            radius = self.rng.uniform(40, 160)
+            strength = float(self.rng.uniform(60, 160))
+            xs = np.arange(self.width, dtype=np.float32) - cx
+            ys = np.arange(self.height, dtype=np.float32) - cy
+            glare = strength * np.exp(-(xs[None, :] ** 2 + ys[:, None] ** 2) / (2 * radius ** 2))
+            frame = frame + glare[..., None]
+            conditions["glare"] = round(strength, 1)
+
+        if self.rng.random() < 0.3:
+            # 저조도 (밝기 감소 + 감마)
+            gain = float(self.rng.uniform(0.25, 0.6))
+            frame = 255.0 * (np.clip(frame, 0, 255) / 255.0) ** 1.2 * gain
+            conditions["low_light"] = round(gain, 2)
+
+        sigma = float(self.rng.uniform(2, 12))
+        frame = frame + self.rng.normal(0, sigma, frame.shape).astype(np.float32)
+        conditions["noise"] = round(sigma, 1)
+
+        return np.clip(frame, 0, 255).astype(np.uint8), conditions
+
+    def generate(self):
+        """
+        프레임 한 장 생성
+        :return: (BGR 프레임, 정답 라벨 딕셔너리)
+        """
+        frame = self._background()
+        count = int(self.rng.integers(self.codes[0], self.codes[1] + 1))
+        numbers = self.rng.choice(np.arange(1, 457), size=count, replace=False)
+
+        occupied = []
+        codes = []
+        for number in sorted(numbers):
+            text = f"Player_Number_{number:03d}"
+            side = self.rng.uniform(*self.size)
+            quad = self._placement(side, occupied)
+            if quad is None:
+                continue
+
+            image, corners = self._symbol(text)
+            homography = cv2.getPerspectiveTransform(corners, quad)
+            size = (self.width, self.height)
+
+            # 인쇄된 종이의 대비 흉내 (검정 = 잉크, 흰색 = 종이)
+            ink, paper = self.rng.uniform(10, 50), self.rng.uniform(200, 250)
+            symbol = cv2.warpPerspective(image.astype(np.float32), homography, size, flags=cv2.INTER_LINEAR)
+            mask = cv2.warpPerspective(np.ones(image.shape, np.float32), homography, size, flags=cv2.INTER_LINEAR)
+            printed = ink + (paper - ink) * symbol / 255.0
+            frame = frame * (1 - mask[..., None]) + printed[..., None] * mask[..., None]
+
+            codes.append({"text": text, "polygon": np.round(quad).astype(int).tolist()})
+
+        frame, conditions = self._degrade(frame)
+        return frame, {"codes": codes, "conditions": conditions}
+
+def write_dataset(path, frames=200, npy=False, **kwargs):
+    """
+    합성 데이터셋 저장 (replay.py/benchmark.py가 바로 읽는 형식)
+    :param path: 출력 폴더 (npy=True면 확장자 없는 출력 파일 경로)
+    :param frames: 생성할 프레임 수
+    :param npy: 한 개의 .npy 파일로 저장할지 여부
+    :param kwargs: SyntheticQRGenerator 옵션
+    :return: 생성한 코드 수
+    """
+    generator = SyntheticQRGenerator(**kwargs)
+    total_codes = 0
+
+    if npy:
+        data = np.empty((frames, generator.height, generator.width, 3), dtype=np.uint8)
+        labels = []
+        for i in range(frames):
+            data[i], label = generator.generate()
+            labels.append(label)
+            total_codes += len(label["codes"])
+        np.save(path + ".npy", data)
+        with open(path + ".json", "w", encoding="utf-8") as f:
+            json.dump({"frames": labels}, f)
+        return total_codes
+
+    os.makedirs(path, exist_ok=True)
+    for i in range(frames):
+        frame, label = generator.generate()
+        cv2.imwrite(os.path.join(path, f"{i:05d}.png"), frame)
+        with open(os.path.join(path, f"{i:05d}.json"), "w", encoding="utf-8") as f:
+            json.dump(label, f)
+        total_codes += len(label["codes"])
+    return total_codes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="정답 라벨이 있는 합성 QR 프레임 생성")
+    parser.add_argument("output", help="출력 폴더 (--npy면 확장자 없는 파일 경로)")
+    parser.add_argument("--frames", type=int, default=200, help="생성할 프레임 수")
+    parser.add_argument("--codes", type=int, nargs=2, default=[1, 4], metavar=("MIN", "MAX"),
+                        help="프레임당 QR 코드 수 범위")
+    parser.add_argument("--size", type=int, nargs=2, default=[60, 200], metavar=("MIN", "MAX"),
+                        help="QR 코드 한 변 크기 범위 (픽셀)")
+    parser.add_argument("--width", type=int, default=640, help="프레임 너비")
+    parser.add_argument("--height", type=int, default=480, help="프레임 높이")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    parser.add_argument("--npy", action="store_true", help="한 개의 .npy 파일로 저장")
+    args = parser.parse_args(argv)
+
+    total_codes = write_dataset(args.output, frames=args.frames, npy=args.npy, width=args.width,
+                                height=args.height, codes=tuple(args.codes), size=tuple(args.size),
+                                seed=args.seed)
+    print(f"✅ 프레임 {args.frames}장, QR 코드 {total_codes}개 생성: {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
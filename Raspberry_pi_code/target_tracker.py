@@ -0,0 +1,125 @@
+# target_tracker.py
+import cv2
+import numpy as np
+
+class TargetTracker:
+    """디코딩 사이의 프레임에서 타겟 QR 코드 중심을 추정하는 경량 추적기 (코너 광류 + 등속 예측)"""
+
+    def __init__(self, max_prediction_time=0.5, velocity_smoothing=0.5):
+        """
+        초기화
+        :param max_prediction_time: 마지막 디코딩 이후 위치 추정을 계속할 최대 시간 (초)
+        :param velocity_smoothing: 속도 갱신 비율 (0-1, 클수록 최근 움직임 반영)
+        """
+        self.max_prediction_time = max_prediction_time
+        self.velocity_smoothing = velocity_smoothing
+
+        self.points = None          # 추적 중인 코너 좌표 (N x 1 x 2, float32)
+        self.prev_gray = None       # 직전 그레이스케일 프레임 (광류 계산용 복사본)
+        self.center = None          # 추정 중심 (x, y)
+        self.velocity = (0.0, 0.0)  # 추정 속도 (픽셀/초)
+        self.last_time = None       # 마지막 추정 시각
+        self.anchor_time = None     # 마지막 실제 디코딩 시각
+
+        # 통계 카운터
+        self.anchors = 0            # 실제 디코딩으로 위치 보정한 횟수
+        self.flow_updates = 0       # 광류로 위치를 추정한 횟수
+        self.predictions = 0        # 광류 실패 시 등속 모델로 예측한 횟수
+
+    def is_tracking(self):
+        """
+        위치 추정이 유효한지 확인
+        :return: 추적 중 여부
+        """
+        return self.center is not None
+
+    def _store_gray(self, gray):
+        """광류 계산용 프레임 복사 (프레임 버퍼는 재사용되므로 보관용 버퍼에 복사)"""
+        if self.prev_gray is None or self.prev_gray.shape != gray.shape:
+            self.prev_gray = np.empty_like(gray)
+        np.copyto(self.prev_gray, gray)
+
+    def _move_to(self, center, timestamp):
+        """중심 이동 및 속도 갱신"""
+        if self.center is not None and self.last_time is not None and timestamp > self.last_time:
+            dt = timestamp - self.last_time
+            k = self.velocity_smoothing
+            vx = (center[0] - self.center[0]) / dt
+            vy = (center[1] - self.center[1]) / dt
+            self.velocity = (k * vx + (1 - k) * self.velocity[0], k * vy + (1 - k) * self.velocity[1])
+
+        self.center = center
+        self.last_time = timestamp
+
+    def anchor(self, polygon, gray, timestamp):
+        """
+        실제 디코딩 결과로 위치 보정
+        :param polygon: 타겟 QR 코드 꼭짓점 배열 (N x 2, 전체 프레임 좌표)
+        :param gray: 현재 그레이스케일 프레임
+        :param timestamp: 프레임 시각 (초)
+        :return: 보정된 중심 (x, y)
+        """
+        self.points = np.asarray(polygon, dtype=np.float32).reshape(-1, 1, 2)
+        center = tuple(float(v) for v in self.points.reshape(-1, 2).mean(axis=0))
+
+        self._move_to(center, timestamp)
+        self._store_gray(gray)
+        self.anchor_time = timestamp
+        self.anchors += 1
+        return self.center
+
+    def update(self, gray, timestamp):
+        """
+        디코딩 없이 현재 프레임에서 타겟 중심 추정 (코너 광류, 실패 시 등속 예측)
+        :param gray: 현재 그레이스케일 프레임
+        :param timestamp: 프레임 시각 (초)
+        :return: 추정 중심 (x, y), 추적이 끊겼으면 None
+        """
+        if self.center is None:
+            return None
+
+        if timestamp - self.anchor_time > self.max_prediction_time:
+            self.reset()  # 너무 오래 디코딩되지 않으면 추정 중단
+            return None
+
+        if self.points is not None and self.prev_gray is not None and self.prev_gray.shape == gray.shape:
+            new_points, status, _ = cv2.calcOpticalFlowPyrLK(
+                self.prev_gray, gray, self.points, None, winSize=(21, 21), maxLevel=2
+            )
+            good = status.reshape(-1) == 1 if status is not None else []
+
+            if np.count_nonzero(good) >= 2:
+                # 추적에 성공한 코너들의 평균 이동량만큼 중심 이동
+                shift = (new_points[good] - self.points[good]).reshape(-1, 2).mean(axis=0)
+                self.points = new_points
+                self._store_gray(gray)
+                self._move_to((self.center[0] + float(shift[0]), self.center[1] + float(shift[1])), timestamp)
+                self.flow_updates += 1
+                return self.center
+
+            self.points = None  # 코너를 잃어버리면 다음 디코딩까지 등속 예측만 사용
+
+        dt = timestamp - self.last_time
+        self.center = (self.center[0] + self.velocity[0] * dt, self.center[1] + self.velocity[1] * dt)
+        self.last_time = timestamp
+        self.predictions += 1
+        return self.center
+
+    def reset(self):
+        """추적 상태 초기화"""
+        self.points = None
+        self.center = None
+        self.velocity = (0.0, 0.0)
+        self.last_time = None
+        self.anchor_time = None
+
+    def get_stats(self):
+        """
+        추적 통계 반환
+        :return: 디코딩 보정/광류 추정/등속 예측 횟수 딕셔너리
+        """
+        return {
+            "anchors": self.anchors,
+            "flow_updates": self.flow_updates,
+            "predictions": self.predictions,
+        }
@@ -1,6 +1,11 @@
-import requests
 import time
+import random
 import threading
+from startup import lazy_import
+from metrics import instrument
+
+requests = lazy_import("requests")  # 첫 요청 때 import (시작 시간 단축)
+adapters = lazy_import("requests.adapters")
 
 class WiFiProcessor:
     """ESP32 통신을 관리하는 클래스"""
@@ -8,59 +13,246 @@ class WiFiProcessor:
     # ESP32 설정
     ESP32_IP = "192.168.4.1"
     
-    def __init__(self, status_manager=None):
+    # 요청 타임아웃 (연결, 응답) 초 - 같은 AP 안이므로 연결은 짧게, 모터 명령 응답은 조금 길게
+    PROBE_TIMEOUT = (1.0, 1.0)
+    COMMAND_TIMEOUT = (1.0, 3.0)
+    
+    # 연결 풀에서 이 시간(초) 넘게 쉰 연결은 명령 전에 닫음 (ESP32 서버가 유휴 연결을 먼저 닫기 전에)
+    # 펌웨어(ESPAsyncWebServer)는 유휴 제한을 따로 두지 않으므로 감시 주기 기준으로 정함:
+    # 감시 간격 2.0초 ±20% 변동 + 최근 정상 응답으로 한 번 생략되는 경우 최대 약 4.4초마다 풀을 사용하므로
+    # 그보다 넉넉히 길게 잡아 감시가 도는 동안에는 keep-alive 연결을 계속 재사용 (감시가 멈췄거나 끊긴 동안만 만료)
+    POOL_IDLE_LIMIT = 6.0
+    
+    def __init__(self, status_manager=None, host=None, healthy_window=5.0):
         """
         초기화
         :param status_manager: 상태 관리자 인스턴스 (선택 사항)
+        :param host: ESP32 주소 (기본: ESP32_IP, 테스트 서버면 "127.0.0.1:8080" 형식)
+        :param healthy_window: 마지막 정상 응답 후 이 시간(초) 안이면 명령 전 연결 확인 생략
         """
         self.status_manager = status_manager
+        self.host = host or self.ESP32_IP
+        self.healthy_window = healthy_window
         self.is_connected = False
         self.last_command_time = 0
+        self.last_healthy = None  # 마지막 정상 응답 시각 (time.monotonic)
+        self.last_checked = None  # 마지막으로 연결 상태를 확인한 시각 (응답 성공/실패 모두)
+        self.state_lock = threading.Lock()  # 연결 상태 비교-갱신 보호 (감시 스레드와 명령 스레드가 동시에 갱신)
+        
+        # 백그라운드 연결 감시 (heartbeat)
+        self.heartbeat_thread = None
+        self.heartbeat_stop = threading.Event()
+        self.heartbeat_wake = threading.Event()  # 다음 확인을 앞당기는 신호
+        self.in_flight = 0        # 전송 중인 명령 수 (전송 중에는 연결 확인 생략)
+        self.in_flight_lock = threading.Lock()
+        
+        # 연결을 재사용하는 HTTP 세션 (첫 요청 때 생성)
+        self.session = None
+        self.session_lock = threading.Lock()
+        self.last_used = None     # 연결 풀로 마지막 요청을 마친 시각 (time.monotonic)
+        
+        # 통계 카운터
+        self.probes = 0
+        self.probes_skipped = 0
+        self.commands = 0
+        self.failures = 0
+        self.probe_retries = 0
+        self.pool_expired = 0
+    
+    def _get_session(self):
+        """keep-alive 연결 풀을 쓰는 HTTP 세션 (매 요청마다 TCP 연결을 새로 맺지 않음)"""
+        if self.session is None:
+            with self.session_lock:
+                if self.session is None:
+                    session = requests.Session()
+                    # 연결 실패만 한 번 재시도 (명령이 이미 전달됐을 수 있는 응답 오류는 재시도하지 않음 - 술이 두 번 나옴)
+                    retry = adapters.Retry(total=1, read=0, redirect=0, status=0)
+                    adapter = adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry)
+                    session.mount("http://", adapter)
+                    self.session = session
+        return self.session
+    
+    def _expire_idle_connections(self):
+        """
+        오래 쉰 풀 연결을 닫음 (명령은 재시도하지 않으므로 ESP32가 이미 닫은 소켓으로 보내지 않도록)
+        세션은 그대로 쓰고 다음 요청이 새 연결을 맺음
+        """
+        last_used = self.last_used
+        if self.session is not None and last_used is not None and time.monotonic() - last_used > self.POOL_IDLE_LIMIT:
+            self.session.close()
+            self.pool_expired += 1
+    
+    def _set_connected(self, connected):
+        """
+        연결 상태 갱신 (실제로 바뀔 때만 상태 관리자에 알림)
+        비교와 갱신은 잠금 안에서 하고 알림은 잠금을 푼 뒤 호출 (여러 스레드가 같은 전환을 중복 알리지 않도록)
+        """
+        with self.state_lock:
+            self.last_checked = time.monotonic()
+            if connected:
+                self.last_healthy = self.last_checked
+            if connected == self.is_connected:
+                return
+            self.is_connected = connected
+        
+        if connected:
+            print(f"✅ ESP32 연결 확인됨")
+            if self.status_manager:
+                self.status_manager.on_connection_established()
+        else:
+            print("⚠️ ESP32 연결 실패")
+            if self.status_manager:
+                self.status_manager.on_connection_lost()
+    
+    def is_recently_healthy(self, window=None):
+        """
+        최근 정상 응답 여부
+        :param window: 기준 시간 (초, None이면 healthy_window)
+        :return: 기준 시간 안에 정상 응답을 받았으면 True
+        """
+        window = self.healthy_window if window is None else window
+        return (self.is_connected and self.last_healthy is not None and
+                time.monotonic() - self.last_healthy < window)
+    
+    def get_link_state(self):
+        """
+        마지막으로 확인한 연결 상태 (네트워크 요청 없이 바로 반환)
+        :return: (연결 여부, 확인 후 경과 시간 초 - 확인한 적 없으면 None)
+        """
+        last_checked = self.last_checked
+        age = time.monotonic() - last_checked if last_checked is not None else None
+        return self.is_connected, age
+    
+    def start_heartbeat(self, interval=2.0, jitter=0.2, max_backoff=10.0):
+        """
+        백그라운드 연결 감시 시작 (첫 확인은 바로 수행, 결과는 상태 관리자 콜백으로 전달)
+        :param interval: 연결된 동안 확인 간격 (초)
+        :param jitter: 확인 간격 무작위 변동 비율 (0-1, 여러 장치의 요청이 몰리지 않도록)
+        :param max_backoff: 연결이 끊긴 동안 늘어나는 확인 간격의 최대값 (초)
+        """
+        if self.heartbeat_thread and self.heartbeat_thread.is_alive():
+            return
+        
+        self.heartbeat_stop.clear()
+        self.heartbeat_thread = threading.Thread(target=self._heartbeat, args=(interval, jitter, max_backoff),
+                                                 name="esp32-heartbeat")
+        self.heartbeat_thread.daemon = True
+        self.heartbeat_thread.start()
+    
+    def stop_heartbeat(self):
+        """백그라운드 연결 감시 중지"""
+        self.heartbeat_stop.set()
+        self.heartbeat_wake.set()
+        if self.heartbeat_thread:
+            self.heartbeat_thread.join(timeout=3.0)
+            self.heartbeat_thread = None
+    
+    def probe_soon(self):
+        """다음 연결 확인을 바로 수행하도록 감시 스레드를 깨움 (기다리지 않고 바로 반환)"""
+        self.heartbeat_wake.set()
+    
+    def heartbeat_running(self):
+        """백그라운드 연결 감시 실행 여부"""
+        return self.heartbeat_thread is not None and self.heartbeat_thread.is_alive()
+    
+    def _heartbeat(self, interval, jitter, max_backoff):
+        """연결 감시 스레드 함수 (끊긴 동안은 지수적으로 간격을 늘림)"""
+        failures = 0
+        while not self.heartbeat_stop.is_set():
+            # 확인 전에 깨우기 신호를 지움 (확인 중에 들어온 probe_soon()은 다음 대기를 바로 깨움)
+            self.heartbeat_wake.clear()
+            
+            # 명령 전송 중이거나 방금 정상 응답을 받았으면 그 결과로 대신함
+            if self.in_flight == 0 and not self.is_recently_healthy(interval):
+                self.check_connection()
+            
+            failures = 0 if self.is_connected else failures + 1
+            delay = min(max_backoff, interval * 2 ** min(failures, 10))
+            self.heartbeat_wake.wait(delay * random.uniform(1 - jitter, 1 + jitter))
         
     def check_connection(self):
         """
         ESP32와의 연결 상태 확인
         :return: 연결 상태 (True/False)
         """
-        try:
-            # 간단한 HTTP 요청으로 연결 확인
-            response = requests.get(f"http://{self.ESP32_IP}", timeout=2)
-            if response.status_code == 200:
-                if not self.is_connected:
-                    print(f"✅ ESP32 연결 확인됨")
-                    self.is_connected = True
-                    if self.status_manager:
-                        self.status_manager.on_connection_established()
-                return True
-        except requests.exceptions.RequestException:
-            if self.is_connected:
-                print("⚠️ ESP32 연결 실패")
-                self.is_connected = False
-                if self.status_manager:
-                    self.status_manager.on_connection_lost()
-            return False
-            
-        return self.is_connected
+        self.probes += 1
+        for attempt in range(2):
+            try:
+                # 간단한 HTTP 요청으로 연결 확인 (200이 아닌 응답은 ESP32가 정상 동작하지 않는 것으로 봄)
+                response = self._get_session().get(f"http://{self.host}", timeout=self.PROBE_TIMEOUT)
+                connected = response.status_code == 200
+                self.last_used = time.monotonic()
+                break
+            except requests.exceptions.ConnectTimeout:
+                connected = False  # 연결 시간 초과는 세션이 이미 한 번 재시도함
+                break
+            except requests.exceptions.ConnectionError:
+                # ESP32가 닫은 풀 연결로 보냈을 수 있음 - 연결 확인 GET은 반복해도 안전하므로 한 번 더 시도
+                connected = False
+                if attempt == 0:
+                    self.probe_retries += 1
+            except requests.exceptions.RequestException:
+                connected = False
+                break
+        
+        self._set_connected(connected)
+        return connected
     
+    @instrument("send_command")
     def send_command(self, command):
         """
         ESP32에 명령 전송
         :param command: 'A'(반잔), 'B'(한잔), 'C'(풀잔), 'D'(연속), 'STOP'(정지)
         :return: 명령 전송 시도 여부
         """
-        # 연결 확인 (선택적)
-        self.check_connection()
+        # 연결 확인 (백그라운드 감시 중이거나 최근에 정상 응답을 받았으면 생략)
+        if self.heartbeat_running() or self.is_recently_healthy():
+            self.probes_skipped += 1
+        else:
+            self.check_connection()
         
         # 명령 전송 시도
+        self.commands += 1
+        with self.in_flight_lock:
+            self.in_flight += 1
         try:
-            url = f"http://{self.ESP32_IP}/motor?cup={command}"
-            requests.get(url, timeout=3)
+            url = f"http://{self.host}/motor"
+            self._expire_idle_connections()
+            self._get_session().get(url, params={"cup": command}, timeout=self.COMMAND_TIMEOUT)
+            self.last_used = time.monotonic()
             self.last_command_time = time.time()
+            self._set_connected(True)  # 응답이 왔으면 연결 확인과 같은 효과
             print(f"✅ 명령 전송: {command}")
             return True
         except requests.exceptions.RequestException as e:
+            self.failures += 1
+            self._set_connected(False)
             print(f"🚨 명령 전송 실패: {e}")
             return False
+        finally:
+            with self.in_flight_lock:
+                self.in_flight -= 1
+    
+    def get_stats(self):
+        """
+        통신 통계 반환
+        :return: 연결 확인/생략/재시도, 명령/실패, 만료된 풀 연결 정리 횟수 딕셔너리
+        """
+        return {
+            "probes": self.probes,
+            "probes_skipped": self.probes_skipped,
+            "probe_retries": self.probe_retries,
+            "commands": self.commands,
+            "failures": self.failures,
+            "pool_expired": self.pool_expired,
+        }
+    
+    def close(self):
+        """연결 감시 중지 및 HTTP 세션 종료 (풀에 남은 연결 정리)"""
+        self.stop_heartbeat()
+        if self.session is not None:
+            self.session.close()
+            self.session = None
     
     def get_random_cup(self):
         """
@@ -76,8 +76,7 @@ class MainApp:
 
                     decoded_objects = self.scanner.decode_qr(frame)
                     for obj in decoded_objects:
-                        qr_data = obj.data.decode('utf-8')
-                        self.data_manager.add_data(qr_data)
+                        self.data_manager.add_data(obj.text)
 
                     self.scanner.display_frame(frame, decoded_objects)
                     cv2.waitKey(1)  # 화면 업데이트